@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Benchmark] BASESSHV2.command receive loop against output size.
+A fake shell replays a `display current-configuration` of the given size in 4 KB
+reads, with a More page every 50 lines. The time per MB of the incremental matcher
+stays flat, the full-buffer rescan done before grows with the size.
+
+    python benchmarks/benchCommand.py [sizeMB ...]
+"""
+
+from __future__ import print_function
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+CHUNK = 4096
+PROMPT = {"success": "[\r\n]+\S+(>|\]) ?$", "error": "Unrecognized command[\s\S]+"}
+
+
+class FakeShell(object):
+    """Send the whole output in CHUNK reads, page by page."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.pending = ''
+        self.offset = 0
+
+    def send(self, data):
+        if self.pages:
+            self.pending, self.offset = self.pages.pop(0), 0
+
+    def recv(self, size):
+        data = self.pending[self.offset:self.offset + min(size, CHUNK)]
+        self.offset += len(data)
+        return data
+
+    def recv_ready(self):
+        return False
+
+    def settimeout(self, timeout):
+        pass
+
+
+def makePages(size):
+    lines = []
+    total = 0
+    while total < size:
+        line = ' interface GigabitEthernet0/0/%d\r\n  description uplink-%d\r\n' % (len(lines), len(lines))
+        lines.append(line)
+        total += len(line)
+    pages = []
+    for i in range(0, len(lines), 50):
+        pages.append(''.join(lines[i:i + 50]) + '  ---- More ----')
+    pages[0] = 'display current-configuration\r\n' + pages[0]
+    pages[-1] = pages[-1][:-len('  ---- More ----')] + '<HUAWEI>'
+    return pages
+
+
+def fullRescan(dev, prompt):
+    # The receive loop of BASESSHV2.command before the incremental matcher.
+    content = ''
+    while True:
+        content = re.sub("\x08", "", content)
+        dev.getMore(content)
+        content += dev.shell.recv(204800)
+        for key in prompt:
+            if re.search(prompt[key], re.sub(dev.moreFlag, "", content)):
+                return key
+
+
+def bench(size, legacy):
+    dev = BASESSHV2('127.0.0.1', 'admin', 'admin')
+    dev.isLogin = True
+    dev.shell = FakeShell(makePages(size))
+    start = time.time()
+    if legacy:
+        dev.shell.send('display current-configuration\r')
+        state = fullRescan(dev, dict(PROMPT))
+    else:
+        state = dev.command('display current-configuration', prompt=dict(PROMPT))['state']
+    assert state == 'success'
+    return time.time() - start
+
+
+def main(sizes):
+    print('%8s %14s %14s %14s %14s' % ('MB', 'matcher(s)', 's/MB', 'rescan(s)', 's/MB'))
+    for mb in sizes:
+        size = int(mb * 1024 * 1024)
+        new = bench(size, False)
+        # The rescan is quadratic, skip it for big outputs.
+        old = bench(size, True) if mb <= 0.5 else float('nan')
+        print('%8.2f %14.3f %14.3f %14.3f %14.3f' % (mb, new, new / mb, old, old / mb))
+
+
+if __name__ == '__main__':
+    main([float(x) for x in sys.argv[1:]] or [0.25, 0.5, 1, 2, 4, 8])
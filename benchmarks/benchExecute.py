@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Benchmark] Per-command latency of BASESSHV2.execute against the latency of the device.
+A FakeSSHServer of the cisco profile answers after the given latency. The commands are
+run with the carriage return probe before every command (quiescence None), then with
+the QuiescenceDetector of BASECISCO: the probe round trip is replaced by an idle time
+derived from the measured round trip.
+
+    python benchmarks/benchExecute.py [commands] [latencyMs ...]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from forward.utils.fakeDevice import FakeSSHServer
+from forward.devclass.baseCisco import BASECISCO
+
+
+def bench(port, commands, probe):
+    dev = BASECISCO('127.0.0.1', 'admin', 'admin', port=port, timeout=30)
+    assert dev.login()['status']
+    if probe:
+        dev.quiescence = None
+    start = time.time()
+    for i in range(commands):
+        assert dev.execute('show clock')['status']
+    elapsed = time.time() - start
+    idle = dev.quiescence.idle if dev.quiescence is not None else float('nan')
+    dev.logout()
+    return elapsed / commands, idle
+
+
+def main(commands, latencies):
+    logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+    print('%10s %14s %14s %12s' % ('latency', 'probe(ms)', 'quiet(ms)', 'idle(ms)'))
+    for ms in latencies:
+        server = FakeSSHServer('cisco', latency=ms / 1000.0)
+        port = server.start()
+        try:
+            old, _ = bench(port, commands, True)
+            new, idle = bench(port, commands, False)
+        finally:
+            server.stop()
+        print('%8.1fms %14.2f %14.2f %12.2f' % (ms, old * 1000, new * 1000, idle * 1000))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50, [float(x) for x in args[1:]] or [0, 5, 20, 50])
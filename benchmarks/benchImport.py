@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Benchmark] Start time of the forward package.
+Every statement runs in a new interpreter, the median of the runs is reported
+with the transport modules already loaded at the end: `import forward` and the
+import of a device class must not load paramiko, pexpect or telnetlib.
+The second table is the class resolution of getInstances for N targets, by the
+model registry against an import_module() per target.
+
+    python benchmarks/benchImport.py [runs] [targets]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import subprocess
+import importlib
+
+LIB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+sys.path.insert(0, LIB)
+from forward.utils.modelRegistry import getDeviceClass
+
+STATEMENTS = [
+    ('python', 'pass'),
+    ('import forward', 'import forward'),
+    ('huawei class', 'from forward.devclass.s9312 import S9312'),
+    ('cisco class', 'from forward.devclass.c6506 import C6506'),
+    ('ssh login path', 'import forward.utils.sshv2, paramiko'),
+]
+PROBE = ("import sys, time\nstart = time.time()\n%s\nend = time.time()\n"
+         "print('%%f %%s' %% (end - start, ','.join(m for m in ('paramiko', 'pexpect', 'telnetlib') "
+         "if m in sys.modules)))")
+
+
+def startTime(statement, runs):
+    samples = []
+    loaded = ''
+    env = dict(os.environ, PYTHONPATH=LIB)
+    for i in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', PROBE % statement], env=env)
+        seconds, _, loaded = output.decode('utf-8').strip().partition(' ')
+        samples.append(float(seconds))
+    samples.sort()
+    return samples[len(samples) // 2], loaded or '-'
+
+
+def resolve(models, targets, registry):
+    start = time.time()
+    for i in range(targets):
+        model = models[i % len(models)]
+        if registry:
+            getDeviceClass(model)
+        else:
+            getattr(importlib.import_module('forward.devclass.%s' % model), model.upper())
+    return time.time() - start
+
+
+def main(runs, targets):
+    print('%-16s %12s  %s' % ('statement', 'median(ms)', 'transports loaded'))
+    for name, statement in STATEMENTS:
+        seconds, loaded = startTime(statement, runs)
+        print('%-16s %12.1f  %s' % (name, seconds * 1000, loaded))
+    models = ['s9312', 'c6506', 'm9006']
+    # Modules imported once before, only the lookup per target is measured.
+    resolve(models, len(models), False)
+    print()
+    print('%-16s %12s %12s' % ('targets', 'registry(ms)', 'import(ms)'))
+    print('%-16d %12.1f %12.1f' % (targets, resolve(models, targets, True) * 1000,
+                                   resolve(models, targets, False) * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5, int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
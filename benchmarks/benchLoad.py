@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Benchmark] Load test against the simulated devices of forward.utils.fakeDevice.
+The fake server runs in a child process, the sessions are opened by a LoginScheduler:
+every session logs in, runs the commands of its profile by command() and logs out.
+Reports the throughput, p50/p99 of login and command latency, CPU and max RSS of
+the client process (and CPU of the server process).
+
+    python benchmarks/benchLoad.py --profile huawei --sessions 2000 --concurrency 200 \
+        --latency 0.005 --output-size 262144
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import logging
+import argparse
+import resource
+import importlib
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from forward.utils.fakeDevice import FakeSSHServer, FakeTelnetServer, getHostKey
+from forward.utils.loginScheduler import LoginScheduler
+
+# profile -> (devclass model, commands of a session)
+SCENARIOS = {
+    'cisco': ('c6506', ['show version', 'show vlan', 'show running-config']),
+    'huawei': ('s9312', ['display version', 'display vlan', 'display current-configuration']),
+    'h3c': ('m9006', ['display version', 'display clock', 'display current-configuration']),
+    'linux': ('bclinux7', ['uptime', 'hostname']),
+}
+PROMPT = {"success": r"[\r\n]+[^\r\n]*(>|#|\]|\$) *$"}
+
+
+def serve(options, ports, stop):
+    # Child process: run the fake server until stop is set.
+    # The server side of paramiko logs every connection reset by a logout.
+    logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+    serverClass = FakeTelnetServer if options.transport == 'telnet' else FakeSSHServer
+    server = serverClass(options.profile, latency=options.latency, outputSize=options.output_size,
+                         pageLines=options.page_lines)
+    if options.transport == 'ssh':
+        getHostKey()
+    ports.put(server.start())
+    stop.wait()
+    server.stop()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    ports.put((usage.ru_utime, usage.ru_stime))
+
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100.0), len(values) - 1)]
+
+
+def session(instance, commands, noPaging):
+    # Task of the scheduler: login, commands, logout; latencies in the content.
+    timings = {'login': None, 'commands': []}
+    result = {'status': False, 'content': timings, 'errLog': ''}
+    if not noPaging:
+        instance.noPaging = []
+    start = time.time()
+    login = instance.login()
+    timings['login'] = time.time() - start
+    if not login['status']:
+        result['errLog'] = login['errLog']
+        return result
+    for cmd in commands:
+        start = time.time()
+        data = instance.command(cmd, prompt=PROMPT, timeout=instance.timeout)
+        if data['state'] is None:
+            result['errLog'] = data['errLog']
+            instance.logout()
+            return result
+        timings['commands'].append((time.time() - start, len(data['content'])))
+    instance.logout()
+    result['status'] = True
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', default='huawei', choices=sorted(SCENARIOS))
+    parser.add_argument('--transport', default='ssh', choices=['ssh', 'telnet'])
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before every answer of the device')
+    parser.add_argument('--output-size', type=int, default=64 * 1024, help='bytes of the running configuration')
+    parser.add_argument('--page-lines', type=int, default=24)
+    parser.add_argument('--no-paging', action='store_true', help='run the noPaging commands at login')
+    options = parser.parse_args()
+
+    ports, stop = multiprocessing.Queue(), multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(options, ports, stop))
+    server.start()
+    port = ports.get(timeout=60)
+
+    model, commands = SCENARIOS[options.profile]
+    deviceClass = getattr(importlib.import_module('forward.devclass.%s' % model), model.upper())
+    instances = [deviceClass('127.0.0.1', 'admin', 'admin', port=port, timeout=30)
+                 for i in range(options.sessions)]
+    scheduler = LoginScheduler(maxWorkers=options.concurrency)
+
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.time()
+    logins, latencies, failures, received = [], [], [], 0
+    for instance, result in scheduler.imap(instances, task=session, args=(commands, options.no_paging)):
+        if result['status']:
+            logins.append(result['content']['login'])
+            for latency, size in result['content']['commands']:
+                latencies.append(latency)
+                received += size
+        else:
+            failures.append(result['errLog'])
+    wall = time.time() - start
+    after = resource.getrusage(resource.RUSAGE_SELF)
+
+    stop.set()
+    serverCpu = ports.get(timeout=60)
+    server.join()
+
+    print('profile %s over %s, %d sessions, concurrency %d, latency %.3fs, config %d bytes' % (
+        options.profile, options.transport, options.sessions, options.concurrency, options.latency,
+        options.output_size))
+    print('%-22s %d ok, %d failed' % ('sessions', len(logins), len(failures)))
+    if failures:
+        print('%-22s %s' % ('first failure', failures[0]))
+    print('%-22s %.2f s' % ('wall time', wall))
+    print('%-22s %.1f sessions/s, %.1f commands/s, %.2f MB/s' % (
+        'throughput', len(logins) / wall, len(latencies) / wall, received / wall / 1024.0 / 1024.0))
+    print('%-22s p50 %.1f ms, p99 %.1f ms' % ('login latency', percentile(logins, 50) * 1000,
+                                              percentile(logins, 99) * 1000))
+    print('%-22s p50 %.1f ms, p99 %.1f ms' % ('command latency', percentile(latencies, 50) * 1000,
+                                              percentile(latencies, 99) * 1000))
+    print('%-22s user %.2f s, sys %.2f s' % ('client cpu', after.ru_utime - before.ru_utime,
+                                             after.ru_stime - before.ru_stime))
+    print('%-22s user %.2f s, sys %.2f s' % ('server cpu', serverCpu[0], serverCpu[1]))
+    # ru_maxrss is in KB on linux, in bytes on macOS.
+    rss = after.ru_maxrss / 1024.0 if sys.platform != 'darwin' else after.ru_maxrss / 1024.0 / 1024.0
+    print('%-22s %.1f MB' % ('client max rss', rss))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
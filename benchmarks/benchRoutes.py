@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Benchmark] Peak memory of a big routing table, read whole by command() and split
+in a dict per route as showRoute does, against showRouteStream()/saveRoutes().
+The fake huawei server runs in a child process. Needs python 3 (tracemalloc).
+
+    python benchmarks/benchRoutes.py [MB of output]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import logging
+import tracemalloc
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from forward.utils.fakeDevice import FakeSSHServer
+from forward.utils.routeParser import HuaweiRouteParser
+from forward.devclass.baseHuawei import BASEHUAWEI
+
+
+def serve(size, ports, stop):
+    # Child process: run the fake server until stop is set.
+    logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+    server = FakeSSHServer('huawei', outputSize=size)
+    ports.put(server.start())
+    stop.wait()
+    server.stop()
+
+
+def whole(dev):
+    # The output is kept, then a dict per route.
+    result = dev.command(cmd=dev.routeCommand, prompt=dev.routePrompt, timeout=120)
+    parser = HuaweiRouteParser()
+    routes = []
+    for line in result['content'].split('\r\n'):
+        routes.extend(dict(route._asdict()) for route in parser.feed(line))
+    return len(routes)
+
+
+def stream(dev):
+    with open(os.devnull, 'w') as output:
+        return dev.saveRoutes(output)['content']
+
+
+def main(megabytes):
+    ports, stop = multiprocessing.Queue(), multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(int(megabytes * 1048576), ports, stop))
+    server.start()
+    try:
+        port = ports.get(timeout=60)
+        print('%-16s %10s %12s %10s' % ('method', 'routes', 'peak MB', 'seconds'))
+        for name, method in (('command+dicts', whole), ('saveRoutes', stream)):
+            dev = BASEHUAWEI('127.0.0.1', 'admin', 'admin', port=port, timeout=30)
+            dev.login()
+            tracemalloc.start()
+            start = time.time()
+            count = method(dev)
+            seconds = time.time() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            dev.logout()
+            print('%-16s %10d %12.1f %10.2f' % (name, count, peak / 1048576.0, seconds))
+    finally:
+        stop.set()
+        server.join()
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20)
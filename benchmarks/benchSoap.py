@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Benchmark] BASEDEPP object changes against the latency of the web services.
+A FakeSoapServer answers after the given latency. createIPObject is run with a suds
+Client built for every operation, as done before, then with the cached clients of
+a SoapClientCache: the WSDL is fetched once and the operations share one kept
+connection.
+
+    python benchmarks/benchSoap.py [operations] [latencyMs ...]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from suds.client import Client
+from forward.utils.fakeSoapServer import FakeSoapServer
+from forward.utils.soapClient import SoapClientCache
+from forward.devclass.baseDepp import BASEDEPP
+
+WSDL = '/func/web_main/wsdl/netaddr/netaddr.wsdl'
+
+
+def legacy(server, operations):
+    # The client of every method before the cache.
+    for i in range(operations):
+        client = Client(server.base + WSDL, username='admin', password='admin')
+        client.service.addAddrObj(name='web%d' % i, ip='10.0.%d.%d' % (i // 250, i % 250 + 1))
+
+
+def cached(server, operations):
+    clients = SoapClientCache(cacheDir=None)
+    dev = BASEDEPP('127.0.0.1', 'admin', 'admin', soapBase=server.base, soapClients=clients)
+    result = dev.batch([('createIPObject', {'name': 'web%d' % i, 'ip': '10.0.%d.%d' % (i // 250, i % 250 + 1)})
+                        for i in range(operations)])
+    assert result['status'], result['errLog']
+    clients.close()
+
+
+def bench(run, operations, latency):
+    server = FakeSoapServer(latency=latency)
+    server.start()
+    try:
+        start = time.time()
+        run(server, operations)
+        return time.time() - start, server.connections, server.wsdlRequests
+    finally:
+        server.stop()
+
+
+def main(operations, latencies):
+    print('%10s %12s %8s %6s %12s %8s %6s' % ('latency', 'legacy(s)', 'conns', 'wsdl', 'cached(s)', 'conns', 'wsdl'))
+    for ms in latencies:
+        old = bench(legacy, operations, ms / 1000.0)
+        new = bench(cached, operations, ms / 1000.0)
+        print('%8.1fms %12.3f %8d %6d %12.3f %8d %6d' % ((ms,) + old + new))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200, [float(x) for x in args[1:]] or [0, 1, 5])
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+#
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Benchmark] Memory and time of Forward.targets for N targets.
+The list of [ip, model, user, pw, kwargs] lists against the TargetTable, with
+its lookup index built. Needs python 3 (tracemalloc).
+
+    python benchmarks/benchTargets.py [targets]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from forward.utils.ipRange import IpRanges, ipToNum, numToIp
+from forward.utils.targetTable import TargetTable
+
+
+def listOfLists(ranges):
+    kwargs = {'port': 22, 'timeout': 30}
+    return [[ip, 's9312', 'admin', 'admin_pw', kwargs] for ip in ranges]
+
+
+def table(ranges):
+    targets = TargetTable()
+    targets.addRanges(ranges, 's9312', 'admin', 'admin_pw', {'port': 22, 'timeout': 30})
+    # Build the index of get()/remove().
+    '10.0.0.1' in targets
+    return targets
+
+
+def measure(build, ranges):
+    tracemalloc.start()
+    start = time.time()
+    result = build(ranges)
+    seconds = time.time() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size, seconds
+
+
+def main(count):
+    # count addresses from 10.0.0.1, the .0 ones are skipped
+    ranges = IpRanges(['10.0.0.1-%s' % numToIp(ipToNum('10.0.0.0') + count * 256 // 255)])
+    count = len(ranges)
+    print('%-16s %12s %14s %10s' % ('targets', 'MB', 'bytes/target', 'seconds'))
+    for name, build in (('list of lists', listOfLists), ('TargetTable', table)):
+        size, seconds = measure(build, ranges)
+        print('%-16s %12.1f %14.1f %10.2f' % (name, size / 1048576.0, size / float(count), seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
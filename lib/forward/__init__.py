@@ -15,14 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import threading
-import importlib
 import six
 import forward.release
 from forward.utils.forwardError import ForwardError
-from forward.utils.loginThread import loginThread
-from forward.utils.paraCheck import paraCheck
+from forward.utils.loginScheduler import LoginScheduler
+from forward.utils.fleetRunner import FleetRunner
 from forward.utils.deviceListSplit import DEVICELIST
+from forward.utils.modelRegistry import getDeviceClass
+from forward.utils.targetTable import TargetTable
+from forward.utils.columnar import collectColumns
 
 __version__ = forward.release.__version__
 __author__ = forward.release.__author__
@@ -30,59 +31,52 @@ __author__ = forward.release.__author__
 
 class Forward(object):
     """Forward Module Main Class"""
-    def __init__(self, targets=None):
+    def __init__(self, targets=None, scheduler=None):
         # target: [[ip,model,user,pw,{port},{timeout}],...]
+        # scheduler: any object with a run(instances) method, default is LoginScheduler()
         super(Forward, self).__init__()
         self.instances = {}
-        if (targets is None):
-            self.targets = []
-        elif paraCheck(targets):
-            self.targets = targets
-        else:
+        self.scheduler = scheduler
+        # targets: TargetTable, one profile per (model, user, pw, kwargs) checked once
+        if not isinstance(targets, (list, type(None))):
+            raise ForwardError('[Forward Init Failed]: parameters type error')
+        try:
+            self.targets = TargetTable(targets)
+        except ForwardError:
             raise ForwardError('[Forward Init Failed]: parameters type error')
 
     def addTargets(self, iplist, model, username, password, **kwargs):
         # iplist,model,username,password,port=??,timeout=??
-        ipAdds = DEVICELIST(iplist).getIpList()
-        targetList = []
-
-        for ip in ipAdds:
-            if paraCheck([[ip, model, username, password, kwargs]]):
-                targetList.append([ip, model, username, password, kwargs])
-            else:
-                six.print_("[Add Targets Error]: %s parameters type error, please check." % ip)
-
-        self.targets.extend(targetList)
-
-    def getInstances(self, preLogin=True):
-        # thread init
-        threads = []
+        # iplist: ['1.1.1.1', '2.2.2.2-2.2.3.4', '3.3.0.0/16'], kept as integer ranges until iterated
+        ipRanges = DEVICELIST(iplist, kwargs.pop('exclude', ())).getIpRanges()
+        # Only the ip differs between the targets of a call, the parameters are checked once.
+        try:
+            self.targets.addRanges(ipRanges, model, username, password, kwargs)
+        except ForwardError:
+            six.print_("[Add Targets Error]: %s parameters type error, please check." % iplist)
 
+    def getInstances(self, preLogin=True, scheduler=None):
         # init instances
-        if preLogin:
-            for target in self.targets:
-                model = target[1]
-                className = model.upper()
-                self.instances[target[0]] = getattr(
-                    importlib.import_module('forward.devclass.%s' % (model)),
-                    className
-                )(target[0], target[2], target[3], **target[4])
-
-                threadNode = threading.Thread(target=loginThread, args=(self.instances[target[0]],))
-                threadNode.start()
-                threads.append(threadNode)
-        else:
-            for target in self.targets:
-                model = target[1]
-                className = model.upper()
-                self.instances[target[0]] = getattr(
-                    importlib.import_module('forward.devclass.%s' % (model)),
-                    className
-                )(target[0], target[2], target[3], **target[4])
+        instances = []
+        for target in self.targets:
+            # The module of a model is imported on its first target only.
+            self.instances[target[0]] = getDeviceClass(target[1])(target[0], target[2], target[3], **target[4])
+            instances.append(self.instances[target[0]])
 
-        # pre login thread join
+        # pre login by a bounded worker pool, instead of one thread per target
         if preLogin:
-            for t in threads:
-                t.join()
+            scheduler = scheduler or self.scheduler or LoginScheduler()
+            scheduler.run(instances)
 
         return self.instances
+
+    def runFleet(self, method, args=(), kwargs=None, timeout=None, scheduler=None):
+        # Run a method name or callable across all instances with bounded parallelism,
+        # yield (ip, {status, content, errLog}) as soon as each device is finished.
+        runner = FleetRunner(scheduler=scheduler or self.scheduler, timeout=timeout)
+        return runner.imap(list(self.instances.values()), method, *args, **(kwargs or {}))
+
+    def collectColumns(self, method, args=(), kwargs=None, timeout=None, scheduler=None, fields=()):
+        # runFleet of an inventory method (showInterface, showVlan...), the results as one
+        # ColumnTable with a 'deviceIp' column, see forward.utils.columnar
+        return collectColumns(self.runFleet(method, args, kwargs, timeout, scheduler), fields)
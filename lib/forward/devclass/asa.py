@@ -23,12 +23,19 @@
 import re
 from forward.devclass.baseCisco import BASECISCO
 from forward.utils.forwardError import ForwardError
+from forward.utils.patterns import compilePattern
 
 
 class ASA(BASECISCO):
     """The device model belongs to the cisco series
     so the attributes and methods of BASECISCO are inherited.
     """
+    def __init__(self, *args, **kws):
+        """The asa disables the paging by `terminal pager`, not `terminal length`.
+        """
+        BASECISCO.__init__(self, *args, **kws)
+        self.noPaging = ["terminal pager 0"]
+
     def cleanBuffer(self):
         """Since the device is inconsistent with the details
         of the other Cisco series, the method needs to be rewritten
@@ -40,7 +47,7 @@ class ASA(BASECISCO):
         buff = ''
         """ When after switching mode, the prompt will change,
         it should be based on basePromptto check and at last line"""
-        while not re.search(self.basePrompt, buff.split('\n')[-1]):
+        while not compilePattern(self.basePrompt).search(buff.split('\n')[-1]):
             try:
                 # Cumulative return result
                 buff += self.shell.recv(1024).decode()
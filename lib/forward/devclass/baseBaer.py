@@ -20,6 +20,7 @@
 [Core][forward] Device class for Baer.
 """
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, BAER_MODES
 import re
 
 
@@ -27,6 +28,12 @@ class BASEBAER(BASESSHV2):
     """This is a manufacturer of baer, using the
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
     """
+    def __init__(self, *args, **kws):
+        """Track the mode of the session by its prompts.
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.modeTracker = ModeTracker(BAER_MODES)
+
     def commit(self):
         result = {
             "status": False,
@@ -56,6 +63,8 @@ class BASEBAER(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, njInfo):
+            return njInfo
         """
         *A:XXX-XXC-X-XXX-1# configure
         *A:XXX-XXX-X-XXX-1>config# service
@@ -79,6 +88,8 @@ class BASEBAER(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, njInfo):
+            return njInfo
         tmp = self.privilegeMode()
         if tmp["status"] is False:
             return tmp
@@ -23,6 +23,10 @@
 
 import re
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, CISCO_MODES
+from forward.utils import patterns
+from forward.utils.routeParser import CiscoRouteParser
+from forward.utils.quiescence import QuiescenceDetector
 from forward.utils.forwardError import ForwardError
 from forward.utils.paraCheck import checkIP
 
@@ -31,6 +35,23 @@ class BASECISCO(BASESSHV2):
     """This is a manufacturer of cisco, using the
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
     """
+    def __init__(self, *args, **kws):
+        """Disable the paging of the terminal after login.
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.noPaging = ["terminal length 0"]
+        # Routing table of showRouteStream(), same command and prompts as showRoute()
+        self.routeCommand = "show routing"
+        self.routePrompt = {
+            "success": "[\r\n]+\S+(#|>) ?$",
+            "error": "Invalid command[\s\S]+",
+        }
+        self.routeParser = CiscoRouteParser
+        self.modeTracker = ModeTracker(CISCO_MODES)
+        self.configError = patterns.CISCO_CONFIG_ERROR
+        # execute() completes by idle time after the prompt, no carriage return probe
+        self.quiescence = QuiescenceDetector()
+
     def commit(self):
         result = {
             "status": False,
@@ -60,6 +81,8 @@ class BASECISCO(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # Program need to go from privileged mode to configuration mode anyway,Becauseof
         # you might be in interface mode, but you don't have a marks value of the mode
         _result = self.privilegeMode()
@@ -86,6 +109,8 @@ class BASECISCO(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -357,6 +382,15 @@ class BASECISCO(BASESSHV2):
             njInfo["errLog"] = result["errLog"]
         return njInfo
 
+    def showRouteStream(self):
+        """The routing table is shown in privilege mode.
+        """
+        tmp = self.privilegeMode()
+        if not tmp["status"]:
+            raise ForwardError('[Route Error]: %s: %s' % (self.ip, tmp["errLog"]))
+        for route in BASESSHV2.showRouteStream(self):
+            yield route
+
     def showInterface(self):
         njInfo = {
             'status': False,
@@ -781,9 +815,10 @@ thus can't create interface-vlan.".format(vlan_id=vlan_id)
         tmp = self.privilegeMode()
         runningDate = -1
         if tmp["status"]:
+            # Read-only commands, on parallel exec channels in execMode.
+            result, connResult = self.readCommands([cmd, "show conn"], prompt)
             # Find uptime of the devices.
-            result = self.command(cmd=cmd, prompt=prompt)
-            if result["state"] == "success":
+            if result["status"]:
                 dataLine = re.search(" [Uu]ptime:? .+(day|year|week).*", result["content"])
                 if dataLine is not None:
                     tmp = re.search("([0-9]+) year", dataLine.group())
@@ -811,8 +846,8 @@ thus can't create interface-vlan.".format(vlan_id=vlan_id)
                 # That forwarder execute the command is failed.
                 pass
             # Find information of firewall-connection.
-            result = self.command(cmd="show conn", prompt=prompt)
-            if result["state"] == "success":
+            result = connResult
+            if result["status"]:
                 dataLine = re.search("([0-9]+) in use", result["content"])
                 if dataLine is not None:
                     njInfo["content"]["firewallConnection"]["status"] = True
@@ -20,14 +20,33 @@
 [Core][forward] Device class for Depp.
 """
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.patterns import compilePattern
+from forward.utils.ipRange import IpSet, ipToNum
+from forward.utils.forwardError import ForwardError
+from forward.utils.soapClient import getSoapClientCache, soapFaultCode
 import re
 import os
+import six
 
 
 class BASEDEPP(BASESSHV2):
     """This is a manufacturer of depp, using the
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
+    The objects, NAT and policies are configured by the web services of the device.
     """
+    def __init__(self, *args, **kws):
+        """Accept soapBase ([ex] 'https://10.0.0.1:8443', http://ip by default) and
+        soapClients (SoapClientCache, the process-wide one by default) as extra parameters
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.soapBase = kws['soapBase'] if 'soapBase' in kws else "http://%s" % self.ip
+        self.soapClients = kws['soapClients'] if 'soapClients' in kws else getSoapClientCache()
+
+    def soapClient(self, url):
+        """The suds client of a WSDL url, built once and shared by the instances of the device
+        """
+        return self.soapClients.client(url, self.username, self.password)
+
     def showNtp(self):
         njInfo = {
             "status": False,
@@ -298,13 +317,23 @@ class BASEDEPP(BASESSHV2):
         # if check buffer data has 'more' flag, at last line.
         # if re.search(self.moreFlag, bufferData.split('\n')[-1]):
         # can't used to \n and ' \r' ,because produce extra enter character
-        if re.search(self.moreFlag, bufferData.split('\n')[-1]):
+        if compilePattern(self.moreFlag).search(bufferData.split('\n')[-1]):
             self.shell.send(' ')
 
+    def ipObjectAddress(self, ip):
+        """The address of an ip object as the device takes it, checked and normalized by IpSet:
+        '10.0.0.1/24' -> '10.0.0.1/32', '10.0.0.200-10.0.0.100' -> '10.0.0.100-10.0.0.200'
+        """
+        if not isinstance(ip, six.string_types):
+            raise ForwardError("[Forward Error] Please specify the value of the ip")
+        if "/" in ip:
+            # for 10.0.0.1/32
+            return "{ip}/32".format(ip=IpSet(ip.split("/")[0]).ranges()[0])
+        bounds = ip.split("-")
+        return IpSet(ip if len(bounds) < 2 else "-".join(sorted(bounds, key=ipToNum))).ranges()[0]
+
     def updateIPObject(self, name, oldName, ip=None, vsysName="PublicSystem",
                        applyTime=None):
-        # load module of suds.
-        from suds.client import Client
         # create a ip or ip-range
         """
         parameter oldName : str type, originally name
@@ -319,17 +348,16 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        url = "http://" + self.ip + "/func/web_main/wsdl/netaddr/netaddr.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/netaddr/netaddr.wsdl"
         # parameters check
-        if re.search("\/", ip):
-            # for 10.0.0.1/32
-            ip = "{ip}/32".format(ip.split("/")[0])
-        elif re.search("\-", ip):
-            # The other one is 10.0.0.100-10.0.200,remove mask
-            ip = re.sub("\/[0-9]+", "", ip)
+        try:
+            ip = self.ipObjectAddress(ip)
+        except ForwardError as e:
+            result["errLog"] = str(e)
+            return result
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -338,7 +366,7 @@ class BASEDEPP(BASESSHV2):
             client.service.modAddrObj(**{"oldname": oldName, "name": name, "ip": ip})
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -348,9 +376,7 @@ class BASEDEPP(BASESSHV2):
         return result
 
     def deleteIPObject(self, name, vsysName="PublicSystem"):
-        # load module of suds.
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/netaddr/netaddr.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/netaddr/netaddr.wsdl"
         # delete ip object
         """
         parameter name    : str type, any
@@ -366,7 +392,7 @@ class BASEDEPP(BASESSHV2):
         }
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -375,7 +401,7 @@ class BASEDEPP(BASESSHV2):
             client.service.delAddrObj(name=name)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -386,8 +412,6 @@ class BASEDEPP(BASESSHV2):
 
     def createIPObject(self, name, ip=None, vsysName="PublicSystem",
                        applyTime=None):
-        # load module of suds.
-        from suds.client import Client
         # create a ip or ip-range
         """
         parameter name    : str type, any
@@ -401,17 +425,16 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        url = "http://" + self.ip + "/func/web_main/wsdl/netaddr/netaddr.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/netaddr/netaddr.wsdl"
         # parameters check
-        if re.search("\/", ip):
-            # for 10.0.0.1/32
-            ip = "{ip}/32".format(ip.split("/")[0])
-        elif re.search("\-", ip):
-            # The other one is 10.0.0.100-10.0.200,remove mask
-            ip = re.sub("\/[0-9]+", "", ip)
+        try:
+            ip = self.ipObjectAddress(ip)
+        except ForwardError as e:
+            result["errLog"] = str(e)
+            return result
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -420,7 +443,7 @@ class BASEDEPP(BASESSHV2):
             client.service.addAddrObj(**{"name": name, "ip": ip})
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -431,8 +454,6 @@ class BASEDEPP(BASESSHV2):
 
     def updateServiceObject(self, name, protocol=None, sRange=None,
                             dRange=None, vsysName="PublicSystem", applyTime=None):
-        # load module of suds.
-        from suds.client import Client
         """
         create a service object
         parameter name: str type, any
@@ -449,7 +470,7 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        url = "http://" + self.ip + "/func/web_main/wsdl/netservice/netservice.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/netservice/netservice.wsdl"
         # parameters check.
         if protocol is None or sRange is None or dRange is None:
             raise IOError("Specify url,protocol,url,sRange and dRange parameters.")
@@ -465,7 +486,7 @@ class BASEDEPP(BASESSHV2):
             return result
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -478,7 +499,7 @@ class BASEDEPP(BASESSHV2):
             client.service.updateServerObject(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -489,8 +510,6 @@ class BASEDEPP(BASESSHV2):
 
     def deleteServiceObject(self, name, protocol=None, sRange=None,
                             dRange=None, vsysName="PublicSystem"):
-        # load module of suds.
-        from suds.client import Client
         """
         delete a service object
         parameter name: str type, any
@@ -507,7 +526,7 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        url = "http://" + self.ip + "/func/web_main/wsdl/netservice/netservice.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/netservice/netservice.wsdl"
         # parameters check.
         if protocol is None or sRange is None or dRange is None:
             raise IOError("Specify url,protocol,url,sRange and dRange parameters.")
@@ -523,7 +542,7 @@ class BASEDEPP(BASESSHV2):
             return result
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -536,7 +555,7 @@ class BASEDEPP(BASESSHV2):
             client.service.deleteServerObject(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -548,8 +567,6 @@ class BASEDEPP(BASESSHV2):
     def createServiceObject(self, name, protocol=None, sRange=None,
                             dRange=None, vsysName="PublicSystem",
                             applyTime=None, **kws):
-        # load module of suds.
-        from suds.client import Client
         """
         create a service object
         parameter name: str type, any
@@ -566,7 +583,7 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        url = "http://" + self.ip + "/func/web_main/wsdl/netservice/netservice.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/netservice/netservice.wsdl"
         # parameters check.
         if protocol is None or sRange is None or dRange is None:
             raise IOError("Specify url,protocol,url,sRange and dRange parameters.")
@@ -582,7 +599,7 @@ class BASEDEPP(BASESSHV2):
             return result
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -595,7 +612,7 @@ class BASEDEPP(BASESSHV2):
             client.service.createServerObject(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -612,8 +629,7 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/nat/NatManager.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/nat/NatManager.wsdl"
         if interface is None:
             result["errLog"] = "[Forward Error] Please specify the value of the interface."
             return result
@@ -622,7 +638,7 @@ class BASEDEPP(BASESSHV2):
         if globalAddress is None:
             result["errLog"] = "[Forward Error] Please specify the value of the globalAddress"
         try:
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -637,7 +653,7 @@ class BASEDEPP(BASESSHV2):
             client.service.updateStaticNat(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -654,8 +670,7 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/nat/NatManager.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/nat/NatManager.wsdl"
         if interface is None:
             result["errLog"] = "[Forward Error] Please specify the value of the interface."
             return result
@@ -664,7 +679,7 @@ class BASEDEPP(BASESSHV2):
         if globalAddress is None:
             result["errLog"] = "[Forward Error] Please specify the value of the globalAddress"
         try:
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -679,7 +694,7 @@ class BASEDEPP(BASESSHV2):
             client.service.deleteStaticNat(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -696,8 +711,7 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/nat/NatManager.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/nat/NatManager.wsdl"
         if interface is None:
             result["errLog"] = "[Forward Error] Please specify the value of the interface."
             return result
@@ -706,7 +720,7 @@ class BASEDEPP(BASESSHV2):
         if globalAddress is None:
             result["errLog"] = "[Forward Error] Please specify the value of the globalAddress"
         try:
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -721,7 +735,7 @@ class BASEDEPP(BASESSHV2):
             client.service.createStaticNat(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -742,15 +756,14 @@ class BASEDEPP(BASESSHV2):
             'status': False,
             'content': '',
             'errLog': ''}
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/nat/NatManager.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/nat/NatManager.wsdl"
         if interface is None:
             result["errLog"] = "[Forward Error] Please specify the value of the interface."
             return result
         if not re.search("\-", localAddress):
             result["errLog"] = "[Forward Error] Please specify the value of the localAddress as a address range."
         try:
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -765,7 +778,7 @@ class BASEDEPP(BASESSHV2):
             client.service.deleteDnat(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -780,15 +793,14 @@ class BASEDEPP(BASESSHV2):
             'status': False,
             'content': '',
             'errLog': ''}
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/nat/NatManager.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/nat/NatManager.wsdl"
         if interface is None:
             result["errLog"] = "[Forward Error] Please specify the value of the interface."
             return result
         if not re.search("\-", localAddress):
             result["errLog"] = "[Forward Error] Please specify the value of the localAddress as a address range."
         try:
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -803,7 +815,7 @@ class BASEDEPP(BASESSHV2):
             client.service.createDnat(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -824,13 +836,12 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/nat/NatManager.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/nat/NatManager.wsdl"
         if interface is None:
             result["errLog"] = "[Forward Error] Please specify the value of the interface."
             return result
         try:
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -844,7 +855,7 @@ class BASEDEPP(BASESSHV2):
             client.service.deleteSnat(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -877,13 +888,12 @@ class BASEDEPP(BASESSHV2):
             'content': '',
             'errLog': ''
         }
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/nat/NatManager.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/nat/NatManager.wsdl"
         if interface is None:
             result["errLog"] = "[Forward Error] Please specify the value of the interface."
             return result
         try:
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -900,7 +910,7 @@ class BASEDEPP(BASESSHV2):
             client.service.createSnat(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -916,8 +926,7 @@ class BASEDEPP(BASESSHV2):
                              serviceType=None, serviceName=None,
                              vsysName="PublicSystem",
                              applyTime=None):
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/pf_policy/pf_policy/pf_policy.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/pf_policy/pf_policy/pf_policy.wsdl"
         result = {
             'status': False,
             'content': '',
@@ -992,7 +1001,7 @@ class BASEDEPP(BASESSHV2):
             serviceTypeCode = "1"
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -1028,7 +1037,7 @@ class BASEDEPP(BASESSHV2):
             client.service.updateSecurityPolicy(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -1043,8 +1052,7 @@ class BASEDEPP(BASESSHV2):
                              dIPType=None, dIPName=None,
                              serviceType=None, serviceName=None,
                              vsysName="PublicSystem"):
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/pf_policy/pf_policy/pf_policy.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/pf_policy/pf_policy/pf_policy.wsdl"
         result = {
             'status': False,
             'content': '',
@@ -1119,7 +1127,7 @@ class BASEDEPP(BASESSHV2):
             serviceTypeCode = "1"
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -1155,7 +1163,7 @@ class BASEDEPP(BASESSHV2):
             client.service.deleteSecurityPolicy(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -1170,8 +1178,7 @@ class BASEDEPP(BASESSHV2):
                              dIPType=None, dIPName=None,
                              serviceType=None, serviceName=None,
                              vsysName="PublicSystem", applyTime=None):
-        from suds.client import Client
-        url = "http://" + self.ip + "/func/web_main/wsdl/pf_policy/pf_policy/pf_policy.wsdl"
+        url = self.soapBase + "/func/web_main/wsdl/pf_policy/pf_policy/pf_policy.wsdl"
         result = {
             'status': False,
             'content': '',
@@ -1246,7 +1253,7 @@ class BASEDEPP(BASESSHV2):
             serviceTypeCode = "1"
         try:
             # connect to url
-            client = Client(url, username=self.username, password=self.password)
+            client = self.soapClient(url)
         except Exception as e:
             result["errLog"] = "[Forward Error] Connected to {url} was\
                                 failure, reason: {err}".format(err=str(e), url=url)
@@ -1282,7 +1289,7 @@ class BASEDEPP(BASESSHV2):
             client.service.createSecurityPolicy(p)
             result["status"] = True
         except Exception as e:
-            num = e.message[0]
+            num = soapFaultCode(e)
             if num == 401:
                 result["errLog"] = "username or password invalid."
             elif num == 506:
@@ -1291,6 +1298,37 @@ class BASEDEPP(BASESSHV2):
                 result["errLog"] = "Unknow error."
         return result
 
+    def batch(self, operations, stopOnError=False):
+        """Run object, NAT and policy changes one after the other over the cached clients
+        and the connection of the device.
+        [ex] batch([('createIPObject', {'name': 'web', 'ip': '10.0.0.1'}),
+                    ('createSecurityPolicy', {'name': 'p1', 'action': 'allow', ...})])
+        - parameter stopOnError: do not run the operations after a failed one
+        Return the njInfo with the result of every operation run in content.
+        """
+        njInfo = {
+            'status': False,
+            'content': [],
+            'errLog': ''
+        }
+        for index, (method, kwargs) in enumerate(operations):
+            if not method.startswith(('create', 'update', 'delete')) or not hasattr(self, method):
+                njInfo['errLog'] += '[Batch Error]: operation %d: unknown method %s. ' % (index, method)
+                result = {'status': False, 'content': '', 'errLog': 'unknown method %s' % method}
+            else:
+                try:
+                    result = getattr(self, method)(**kwargs)
+                except Exception as e:
+                    # [ex] IOError of missing parameters, the results of the operations run are kept.
+                    result = {'status': False, 'content': '', 'errLog': str(e)}
+                if not result['status']:
+                    njInfo['errLog'] += '[Batch Error]: operation %d %s: %s ' % (index, method, result['errLog'])
+            njInfo['content'].append(result)
+            if stopOnError and not result['status']:
+                break
+        njInfo['status'] = not njInfo['errLog']
+        return njInfo
+
     def basicInfo(self, cmd="show version"):
         njInfo = {"status": True,
                   "content": {"noRestart": {"status": None, "content": ""},
@@ -20,6 +20,9 @@
 [Core][forward] Device class for Fortinet.
 """
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, FORTINET_MODES
+from forward.utils import patterns
+from forward.utils.routeParser import FortinetRouteParser
 from forward.utils.paraCheck import int_to_mask
 import re
 
@@ -28,6 +31,20 @@ class BASEFORTINET(BASESSHV2):
     """This is a manufacturer of foritinet, using the
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
     """
+    def __init__(self, *args, **kws):
+        """Disable the paging of the console after login.
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.noPaging = ["config system console", "set output standard", "end"]
+        # Routing table of showRouteStream(), same command and prompts as showRoute()
+        self.routeCommand = "get router  info routing-table  all"
+        self.routePrompt = {
+            "success": "[\r\n]+\S+(#|>) ?$",
+            "error": "Unrecognized[\s\S]+[\r\n]+[\S]+.+(#|>) ?$",
+        }
+        self.routeParser = FortinetRouteParser
+        self.modeTracker = ModeTracker(FORTINET_MODES)
+        self.configError = patterns.FORTINET_CONFIG_ERROR
 
     def privilegeMode(self):
         njInfo = {
@@ -35,6 +52,8 @@ class BASEFORTINET(BASESSHV2):
             'content': "",
             'errLog': ''
         }
+        if self._alreadyIn(2, njInfo):
+            return njInfo
         cmd = '''end'''
         prompt = {
             "success": "end\r\r\n\r\n\S+(#|>) ?$",
@@ -25,15 +25,35 @@ import logging
 import time
 import random
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, HUAWEI_MODES
+from forward.utils import patterns
+from forward.utils.routeParser import HuaweiRouteParser
 from forward.utils.forwardError import ForwardError
 from forward.utils.paraCheck import checkIP
-from forward.utils.deviceListSplit import DEVICELIST
+from forward.utils.ipRange import IpSet, parseAddress
 
 
 class BASEH3C(BASESSHV2):
     """This is a manufacturer of h3c, using the
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
     """
+    def __init__(self, *args, **kws):
+        """Disable the paging of the terminal after login, `screen-length 0 temporary` is the huawei form.
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.noPaging = ["screen-length disable"]
+        # Routing table of showRouteStream(), same command and prompts as showRoute()
+        self.routeCommand = "display  ip routing-table"
+        self.routePrompt = {
+            "success": "[\r\n]+\S+(>|\]) ?$",
+            "error": "Unrecognized command[\s\S]+",
+        }
+        self.routeParser = HuaweiRouteParser
+        self.modeTracker = ModeTracker(HUAWEI_MODES)
+        self.configError = patterns.H3C_CONFIG_ERROR
+        # Members -> name of the ip object-groups, None until loadObjectGroupIPAddress()
+        self.objectGroupIndex = None
+
     def commit(self):
         result = {
             "status": False,
@@ -76,6 +96,8 @@ class BASEH3C(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(1, result):
+            return result
         # Get the current position before switch to general mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode > 1:
@@ -98,6 +120,8 @@ class BASEH3C(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -721,6 +745,8 @@ thus can't create interface-vlan.".format(vlan_id=vlan_id)
                 raise IOError("hosts's value should not be empty.")
         else:
             raise IOError("host's formate is incorrect.")
+        # The device changes from here, the index is loaded again on the next lookup.
+        self.objectGroupIndex = None
         tmp = self.privilegeMode()
         if tmp["status"] is False:
             raise IOError(tmp["errLog"])
@@ -851,19 +877,16 @@ thus can't create interface-vlan.".format(vlan_id=vlan_id)
             njInfo = {"status": True, "content": ruleID}
         return njInfo
 
-    def isExistObjectGroupIPAddress(self, hostList=[]):
-        """
-        @param hostList: ['10.0.0.1','10.0.0.2-10.0.0.3']
-        njInfo = {"status":True,"content":"object-group-name"}
+    def loadObjectGroupIPAddress(self):
+        """Index the ip object-groups of the device by their members, from one display command.
+        The index is kept for the next isExistObjectGroupIPAddress() calls, until a group is created.
+        Groups with other members than hosts, ranges and subnets ([ex] a nested group) are not indexed.
+        njInfo = {"status":True,"content":{IpSet: "object-group-name"}}
         """
-        if not isinstance(hostList, list):
-            raise IOError("The parameter's formate is incorrect.Its formate should is ['10.,0.0.1','192.168.1.1','192.168.2.100-192.168.2.200']")
-        hostList = DEVICELIST(hostList).getIpList()
-        hostList = sorted(hostList)
         njInfo = {
             "status": False,
-            "content": "",
-            "errLog": "The object-group ip is not exist."
+            "content": {},
+            "errLog": ""
         }
         prompt = {
             "success": "[\r\n]+\S+(>|\]) ?$",
@@ -872,58 +895,63 @@ thus can't create interface-vlan.".format(vlan_id=vlan_id)
         tmp = self.privilegeMode()
         if tmp["status"] is False:
             raise IOError(tmp["errLog"])
-        cmd = '''dis object-group ip address | include "Ip address object group"'''
-        result = self.command(cmd, prompt)
+        result = self.command("display object-group ip address", prompt)
         if not result["state"] == "success":
-            return result
-        allGroups = []
-        # Getting all groups of object.
-        for line in result["content"].split("\r\n"):
-            tmp = re.search("Ip address object group (\S+):", line)
-            if tmp:
-                allGroups.append(tmp.group(1))
-        # Enter a mode of object-group,and then get hosts of all.
-        # example: {"object-group-a":["10.0.0.1","10.0.0.2"]}
-        allObjectIP = {}
-        for group in allGroups:
-            cmdA = "object-group ip address {objectGroup}".format(objectGroup=group)
-            prompt = {
-                "success": "[\r\n]+\S+{objectGroup}\] ?$".format(objectGroup="-obj-grp-ip-" + group)
-            }
-            # Enter a mode of object-group
-            tmp = self.command(cmd=cmdA, prompt=prompt)
-            if not tmp["state"] == "success":
-                raise IOError(tmp["errLog"])
-            cmdB = "dis this"
-            # Get datas of object-group
-            tmp = self.command(cmd=cmdB, prompt=prompt)
-            if not tmp["state"] == "success":
-                raise IOError(tmp["errLog"])
-            hosts = []
-            for line in tmp["content"].split("\r\n"):
-                # Get single ip.
-                info = re.search("[0-9]+ network host address ([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})", line)
-                if info:
-                    hosts.append(info.group(1))
-                    continue
-                # Get ip range.
-                info = re.search("[0-9]+ network range ([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}) ([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})", line)
-                if info:
-                    iplist = [info.group(1) + "-" + info.group(2)]
-                    hosts.append(DEVICELIST(iplist).getIpList())
-            cmdC = "quit"
-            promptC = {
-                "success": "[\r\n]+\S+\] ?$"
-            }
-            tmp = self.command(cmd=cmdC, prompt=promptC)
-            if not tmp["state"] == "success":
-                raise IOError(tmp["errLog"])
-            allObjectIP[group] = hosts
-        # Match whether there are existing object-group.
-        for group, value in allObjectIP.items():
-            if hostList == sorted(value):
-                njInfo = {"status": True, "content": group}
-                break
+            njInfo["errLog"] = result["errLog"]
+            return njInfo
+        index = {}
+        group = None
+        members = []
+        # A None after the lines closes the last group.
+        for line in result["content"].splitlines() + [None]:
+            info = None if line is None else re.search(r"Ip address object group (\S+):", line)
+            if line is None or info:
+                if group is not None and members is not None:
+                    # The first of the groups with the same members, as the device lists them.
+                    index.setdefault(IpSet(members), group)
+                group = info.group(1) if info else None
+                members = []
+                continue
+            info = re.search(r"^\s*[0-9]+ network (.*)", line)
+            if not info or group is None or members is None:
+                continue
+            member = info.group(1).split()
+            try:
+                if member[:2] == ["host", "address"] and len(member) == 3:
+                    members.append(parseAddress(member[2]))
+                elif member[0] == "range" and len(member) == 3:
+                    members.append(parseAddress(member[1] + "-" + member[2]))
+                elif member[0] == "subnet" and len(member) == 3:
+                    members.append(parseAddress(member[1] + " " + member[2]))
+                else:
+                    members = None
+            except ForwardError:
+                members = None
+        self.objectGroupIndex = index
+        njInfo = {"status": True, "content": index, "errLog": ""}
+        return njInfo
+
+    def isExistObjectGroupIPAddress(self, hostList=[]):
+        """
+        @param hostList: ['10.0.0.1','10.0.0.2-10.0.0.3']
+        njInfo = {"status":True,"content":"object-group-name"}
+        The groups are looked up in the index of loadObjectGroupIPAddress(), loaded on the first call.
+        """
+        if not isinstance(hostList, list):
+            raise IOError("The parameter's formate is incorrect.Its formate should is ['10.,0.0.1','192.168.1.1','192.168.2.100-192.168.2.200']")
+        members = IpSet(hostList)
+        njInfo = {
+            "status": False,
+            "content": "",
+            "errLog": "The object-group ip is not exist."
+        }
+        if self.objectGroupIndex is None:
+            result = self.loadObjectGroupIPAddress()
+            if not result["status"]:
+                return result
+        group = self.objectGroupIndex.get(members)
+        if group is not None:
+            njInfo = {"status": True, "content": group}
         return njInfo
 
     def addObjectPolicyIP(self, policyName, configuration, comment):
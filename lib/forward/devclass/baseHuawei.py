@@ -23,6 +23,9 @@
 import re
 import logging
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, HUAWEI_MODES
+from forward.utils import patterns
+from forward.utils.routeParser import HuaweiRouteParser
 from forward.utils.forwardError import ForwardError
 from forward.utils.paraCheck import checkIP
 
@@ -31,6 +34,21 @@ class BASEHUAWEI(BASESSHV2):
     """This is a manufacturer of huawei, using the
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
     """
+    def __init__(self, *args, **kws):
+        """Disable the paging of the terminal after login.
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.noPaging = ["screen-length 0 temporary"]
+        # Routing table of showRouteStream(), same command and prompts as showRoute()
+        self.routeCommand = "display  ip routing-table"
+        self.routePrompt = {
+            "success": "[\r\n]+\S+(>|\]) ?$",
+            "error": "Unrecognized command[\s\S]+",
+        }
+        self.routeParser = HuaweiRouteParser
+        self.modeTracker = ModeTracker(HUAWEI_MODES)
+        self.configError = patterns.HUAWEI_CONFIG_ERROR
+
     def commit(self):
         result = {
             "status": False,
@@ -71,6 +89,8 @@ class BASEHUAWEI(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(1, result):
+            return result
         # Get the current position before switch to general mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode > 1:
@@ -93,6 +113,8 @@ class BASEHUAWEI(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -20,6 +20,7 @@
 """
 import re
 from forward.devclass.baseTELNET import BASETELNET
+from forward.utils.cliMode import ModeTracker, JUNIPER_MODES
 from forward.utils.forwardError import ForwardError
 
 
@@ -30,6 +31,8 @@ class BASEJUNIPER(BASETELNET):
     def __init__(self, *args, **kws):
         BASETELNET.__init__(self, *args, **kws)
         self.basePrompt = r"(>|#) *$"
+        self.noPaging = ["set cli screen-length 0"]
+        self.modeTracker = ModeTracker(JUNIPER_MODES)
 
     def _recv(self, _prompt):
         """The user receives the message returned by the device.
@@ -230,6 +233,8 @@ class BASEJUNIPER(BASETELNET):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(1, result):
+            return result
         # Get the current position before switch to general mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode > 1:
@@ -265,6 +270,8 @@ class BASEJUNIPER(BASETELNET):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # If value of the mode is 2,start switching to configure-mode.
         sendConfig = self.command("configure", prompt={"success": "[\r\n]+\S+# ?$",
                                                        "error": "unknown command[\s\S]+\S+> ?$"})
@@ -23,6 +23,7 @@
 import re
 from forward.devclass.baseSSHV2 import BASESSHV2
 from forward.utils.forwardError import ForwardError
+from forward.utils.patterns import compilePattern
 
 
 class BASELINUX(BASESSHV2):
@@ -79,19 +80,19 @@ class BASELINUX(BASESSHV2):
                     # set passwd
                     self.shell.send(commandPw)
                     buff = ''
-                    while not (re.search(self.basePrompt, buff) or re.search('New password:', buff)):
+                    while not (compilePattern(self.basePrompt).search(buff) or re.search('New password:', buff)):
                         buff += self.shell.recv(256)
                     if re.search('New password:', buff):
                         # send password
                         self.shell.send(password + '\n')
                         buff = ''
-                        while not (re.search(self.basePrompt, buff) or re.search('Retype new password:', buff)):
+                        while not (compilePattern(self.basePrompt).search(buff) or re.search('Retype new password:', buff)):
                             buff += self.shell.recv(256)
                         if re.search('Retype new password:', buff):
                             # Confirm password
                             self.shell.send(password + '\n')
                             buff = ''
-                            while not re.search(self.prompt, buff):
+                            while not compilePattern(self.prompt).search(buff):
                                 buff += self.shell.recv(256)
                             # successed.
                             if re.search('updated successfully', buff):
@@ -20,6 +20,7 @@
 [Core][forward] Device class for Maipu.
 """
 from forward.devclass.baseSSHV1 import BASESSHV1
+from forward.utils.cliMode import ModeTracker, CISCO_MODES
 import re
 
 
@@ -34,6 +35,7 @@ class BASEMAIPU(BASESSHV1):
         BASESSHV1.__init__(self, *args, **kws)
         self.moreFlag = re.escape('....press ENTER to next \
 line, Q to quit, other key to next page....')
+        self.modeTracker = ModeTracker(CISCO_MODES)
 
     def privilegeMode(self):
         # Switch to privilege mode.
@@ -42,6 +44,8 @@ line, Q to quit, other key to next page....')
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -89,6 +93,8 @@ line, Q to quit, other key to next page....')
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # Program need to go from privileged mode to configuration mode anyway,Becauseof
         # you might be in interface mode, but you don't have a marks value of the mode
         _result = self.privilegeMode()
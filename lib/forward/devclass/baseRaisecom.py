@@ -20,6 +20,7 @@
 [Core][forward] Device class for Raisecom.
 """
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, CISCO_MODES
 import re
 
 
@@ -28,6 +29,12 @@ class BASERAISECOM(BASESSHV2):
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
     """
 
+    def __init__(self, *args, **kws):
+        """Track the mode of the session by its prompts.
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.modeTracker = ModeTracker(CISCO_MODES)
+
     def commit(self):
         result = {
             "status": False,
@@ -57,6 +64,8 @@ class BASERAISECOM(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # Program need to go from privileged mode to configuration mode anyway,Becauseof
         # you might be in interface mode, but you don't have a marks value of the mode
         _result = self.privilegeMode()
@@ -83,6 +92,8 @@ class BASERAISECOM(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -20,7 +20,9 @@
 """
 import re
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, CISCO_MODES
 from forward.utils.forwardError import ForwardError
+from forward.utils.patterns import compilePattern
 
 
 class BASERUIJIE(BASESSHV2):
@@ -33,6 +35,8 @@ class BASERUIJIE(BASESSHV2):
         """
         BASESSHV2.__init__(self, *args, **kws)
         self.basePrompt = r'(>|#) *$'
+        self.noPaging = ["terminal length 0"]
+        self.modeTracker = ModeTracker(CISCO_MODES)
 
     def commit(self):
         result = {
@@ -64,6 +68,8 @@ class BASERUIJIE(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # Program need to go from privileged mode to configuration mode anyway,Becauseof
         # you might be in interface mode, but you don't have a marks value of the mode
         _result = self.privilegeMode()
@@ -92,6 +98,8 @@ class BASERUIJIE(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -435,7 +443,7 @@ class BASERUIJIE(BASESSHV2):
         self.shell.send(' \n')
         buff = ''
         # When after switching mode, the prompt will change, it should be based on basePrompt to check and at last line
-        while not re.search(self.basePrompt, buff.split('\n')[-1]):
+        while not compilePattern(self.basePrompt).search(buff.split('\n')[-1]):
             try:
                 # Accumulative results
                 buff += self.shell.recv(1024).decode()
@@ -22,6 +22,7 @@
 import re
 import pexpect
 from forward.devclass.baseSSHV1 import BASESSHV1
+from forward.utils.cliMode import ModeTracker, CISCO_MODES
 from forward.utils.forwardError import ForwardError
 
 
@@ -36,6 +37,8 @@ class BASERUIJIE(BASESSHV1):
         """
         BASESSHV1.__init__(self, *args, **kws)
         self.basePrompt = r'(>|#) *$'
+        self.noPaging = ["terminal length 0"]
+        self.modeTracker = ModeTracker(CISCO_MODES)
 
     def commit(self):
         result = {
@@ -67,6 +70,8 @@ class BASERUIJIE(BASESSHV1):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # Program need to go from privileged mode to configuration mode anyway,Becauseof
         # you might be in interface mode, but you don't have a marks value of the mode
         _result = self.privilegeMode()
@@ -95,6 +100,8 @@ class BASERUIJIE(BASESSHV1):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -23,6 +23,11 @@ Author: Azrael, Cheung Kei-Chuen
 """
 import re
 from forward.utils.sshv1 import sshv1
+from forward.utils.resultCache import getResultCache
+from forward.utils import patterns
+from forward.utils.patterns import compilePattern
+from forward.utils.sanitizer import TELNET_SANITIZER, TELNET_EXECUTE_SANITIZER
+from forward.utils.cliMode import ModeTracker
 from forward.utils.forwardError import ForwardError
 import pexpect
 
@@ -38,6 +43,12 @@ class BASESSHV1(object):
         self.port = kwargs['port'] if 'port' in kwargs else 22
         self.timeout = kwargs['timeout'] if 'timeout' in kwargs else 30
         self.privilegePw = kwargs['privilegePw'] if 'privilegePw' in kwargs else ''
+        # Cache the results of the show methods by a ResultCache, True for the process-wide cache
+        self.resultCache = kwargs['resultCache'] if 'resultCache' in kwargs else None
+        if self.resultCache is True:
+            self.resultCache = getResultCache()
+        if self.resultCache is not None:
+            self.resultCache.attach(self)
 
         self.isLogin = False
         self.isEnable = False
@@ -49,6 +60,14 @@ class BASESSHV1(object):
         self.basePrompt = r"(>|#|\]|\$) *$"
         self.prompt = ''
         self.moreFlag = '(< *)?(\-)+( |\()?[Mm]ore.*(\)| )?(\-)+( *>)?|\(Q to quit\)'
+        # Removes More markers and terminal characters from the output
+        self.sanitizer = TELNET_SANITIZER
+        # Same for execute(), which cleans less
+        self.executeSanitizer = TELNET_EXECUTE_SANITIZER
+        # Commands disabling the paging of the device, run once after login
+        self.noPaging = []
+        # CLI mode shown by the last prompt, vendors give their mode prompts, see forward.utils.cliMode
+        self.modeTracker = ModeTracker()
         self.mode = 1
 
         """
@@ -83,6 +102,9 @@ class BASESSHV1(object):
             self.isLogin = True
             # Get host prompt.
             self.getPrompt()
+            # The host name of the mode prompts, from the login prompt only: getPrompt() runs in sub-views too.
+            self.modeTracker.setHostname(self.modeTracker.prompt)
+            self.sessionInit()
             # Clear legacy characters
             self.cleanBuffer()
         else:
@@ -137,7 +159,8 @@ class BASESSHV1(object):
             # [ex] when send('ls\r'),get 'ls\r\nroot base etc \r\n[wangzhe@cloudlab100 ~]$ '
             # [ex] data should be 'root base etc '
             self.channel.send(cmd + '\n')
-            i = self.channel.expect([r'%s' % self.moreFlag, r"%s" % self.prompt, pexpect.TIMEOUT], timeout=self.timeout)
+            i = self.channel.expect([compilePattern(self.moreFlag), compilePattern(self.prompt), pexpect.TIMEOUT],
+                                    timeout=self.timeout)
             result = ''
             if i == 0:
                 """If the data received by the program contains the last line of information
@@ -156,21 +179,37 @@ class BASESSHV1(object):
             data['content'] += result
             data["status"] = True
             try:
-                tmp = re.search(dataPattern, data['content']).group(1)
+                tmp = compilePattern(dataPattern).search(data['content']).group(1)
                 # Delete special characters caused by More split screen.
-                tmp = re.sub("<--- More --->\\r +\\r", "", tmp)
-                tmp = re.sub('(\x00|\x08){0,}', "", tmp)
-                tmp = re.sub(re.escape("--More(CTRL+Cbreak)--"), "", tmp)
-                data['content'] = tmp
+                data['content'] = self.executeSanitizer.sanitize(tmp)
+                self.modeTracker.observe(self.channel.after if i == 1 else '')
             except Exception as e:
                 # Unable to find the host prompt, command execution failed.
                 data['status'] = False
+                self.modeTracker.observe('')
                 data['errLog'] = data['errLog'] + "not fond host prompt:Error(%s)" % str(e)
         else:
             data['status'] = False
             data['errLog'] = 'ERROR:device not login'
         return data
 
+    def sessionInit(self):
+        """Disable the paging of the device by self.noPaging, so long outputs come in one stream.
+        A failed command is ignored, More is still handled by getMore.
+        """
+        result = {
+            'status': True,
+            'content': '',
+            'errLog': ''
+        }
+        for cmd in self.noPaging:
+            self.channel.send(cmd + '\r')
+            i = self.channel.expect([compilePattern(self.basePrompt), pexpect.TIMEOUT], timeout=self.timeout)
+            if i == 1:
+                result['status'] = False
+                result['errLog'] += '[Session Init Error]: %s: %s receive timeout.' % (self.ip, cmd)
+        return result
+
     def getMore(self):
         # Applies to the execute method
         """Automatically get the current system prompt by sending a carriage return
@@ -179,7 +218,8 @@ class BASESSHV1(object):
         while True:
             # The return message is received until there is no More character like More.
             self.channel.send(' ')
-            i = self.channel.expect([r'%s' % self.moreFlag, r"%s" % self.prompt, pexpect.TIMEOUT], timeout=self.timeout)
+            i = self.channel.expect([compilePattern(self.moreFlag), compilePattern(self.prompt), pexpect.TIMEOUT],
+                                    timeout=self.timeout)
             if i == 0:
                 result += self.channel.before
                 # After the encounter `moreFlag`, need to get the message
@@ -200,7 +240,8 @@ class BASESSHV1(object):
         while True:
             if not continueRecv:
                 self.channel.send('\r')
-            i = self.channel.expect([r'%s' % self.moreFlag, r"%s" % self.basePrompt, pexpect.TIMEOUT], timeout=timeout)
+            i = self.channel.expect([compilePattern(self.moreFlag), compilePattern(self.basePrompt), pexpect.TIMEOUT],
+                                    timeout=timeout)
             if i == 0:
                 result += self.channel.before
                 # After the encounter `moreFlag`, need to get the message
@@ -211,7 +252,7 @@ class BASESSHV1(object):
                 for section in prompt:
                     # section.values() is : [ [p1,p2,p3] ]
                     for _prompt in section.values()[0]:
-                        if re.search(_prompt, result.split("\n")[-1]):
+                        if compilePattern(_prompt).search(result.split("\n")[-1]):
                             state = section.keys()[0]
                             break
                     # Find the specified state type
@@ -237,7 +278,7 @@ class BASESSHV1(object):
             """The host base prompt is the end of the received flag, and if the data is
             not received at the set time, the timeout is exceeded.
             """
-            self.channel.expect([r"%s" % self.basePrompt, pexpect.TIMEOUT], timeout=self.timeout)
+            self.channel.expect([compilePattern(self.basePrompt), pexpect.TIMEOUT], timeout=self.timeout)
             # select last line character,[ex]' >[localhost@labstill019~]$ '
             # [ex]'>[localhost@labstill019~]$'
             # self.prompt=self.prompt.split()[0]
@@ -247,12 +288,13 @@ class BASESSHV1(object):
             self.prompt = self.channel.before.split('\n')[-1] + self.channel.after
         else:
             raise ForwardError('[Get Prompt Error]: %s: Not login yet.' % self.ip)
-        if re.search("> ?$", self.prompt):
+        if patterns.GENERAL_MODE.search(self.prompt):
             # If last character of host prompt of the device ens in '>', the command line of device in gneral mode.
             self.mode = 1
-        elif re.search("(#|\]) ?$", self.prompt):
+        elif patterns.PRIVILEGE_MODE.search(self.prompt):
             # If last character of host prompt of the device ens in '#', the command line of device in enable mode.
             self.mode = 2
+        self.modeTracker.observe(self.prompt)
         return self.prompt
 
     def cleanBuffer(self):
@@ -263,21 +305,26 @@ class BASESSHV1(object):
             """When after switching mode, the prompt will change, it should be based
             on basePrompt to check and at last line
             """
-            return self.channel.expect(self.basePrompt, timeout=self.timeout)
+            return self.channel.expect(compilePattern(self.basePrompt), timeout=self.timeout)
         except pexpect.TIMEOUT:
             # No legacy data.
             return ''
 
+    def _alreadyIn(self, mode, result):
+        """Return True if the prompt shows the mode already, nothing to send: self.mode and
+        the status of the result dict are set
+        """
+        if self.modeTracker.mode() != mode:
+            return False
+        self.mode = mode
+        result['status'] = True
+        return True
+
     def command(self, cmd=None, prompt=None, timeout=30):
         """execute a command line, powerful and suitable for any scene,
         but need to define whole prompt dict list
         """
-        # regx compile
-        """_promptKey = prompt.keys()
-        for key in _promptKey:
-            prompt[key] = re.compile(prompt[key])
-        In SSHV1, regular expressions cannot be compiled
-        """
+        # The prompt dict of the caller is left as it is, patterns are compiled once by forward.utils.patterns
         result = {
             'status': False,
             'content': '',
@@ -302,11 +349,11 @@ class BASESSHV1(object):
             return result
 
         while True:
-            i = self.channel.expect([r'%s' % self.moreFlag,
+            i = self.channel.expect([compilePattern(self.moreFlag),
                                      # prompt-1
-                                     r"%s" % prompt.items()[0][1],
+                                     compilePattern(prompt.items()[0][1]),
                                      # prompt-2
-                                     r"%s" % prompt.items()[1][1],
+                                     compilePattern(prompt.items()[1][1]),
                                      pexpect.TIMEOUT], timeout=timeout)
             result["content"] += self.channel.before
             if i == 3:
@@ -314,12 +361,13 @@ class BASESSHV1(object):
                 and you need to set it like that.
                 """
                 result["errLog"] = '[Forward Error]: receive timeout,prompt is invalid.'
+                self.modeTracker.observe('')
                 return result
             if i == 1:
                 # Find the prompt-1
                 result["state"] = prompt.items()[0][0]
                 # Matching page break
-                if re.search(self.moreFlag, result["content"].split("\r\n")[-1]):
+                if compilePattern(self.moreFlag).search(result["content"].split("\r\n")[-1]):
                     continue
                 else:
                     break
@@ -327,7 +375,7 @@ class BASESSHV1(object):
                 # Find the prompt-2
                 result["state"] = prompt.items()[1][0]
                 # Matching page break
-                if re.search(self.moreFlag, result["content"].split("\r\n")[-1]):
+                if compilePattern(self.moreFlag).search(result["content"].split("\r\n")[-1]):
                     continue
                 else:
                     break
@@ -337,13 +385,7 @@ class BASESSHV1(object):
         result["status"] = True
         # Replenish prompt
         result["content"] += self.channel.after
-        # Delete page break
-        result["content"] = re.sub("\r\n.*?\r *?\r", "\r\n", result["content"])
-        # Delete special characters caused by More split screen.
-        result["content"] = re.sub("<--- More --->\\r +\\r", "", result["content"])
-        # remove the More charactor
-        result["content"] = re.sub(' \-\-More\(CTRL\+C break\)\-\- (\x00|\x08){0,} +(\x00|\x08){0,}', "",
-                                   result["content"])
-        # remove the space key
-        result["content"] = re.sub("(\x08)+ +", "", result["content"])
+        # Delete page break and special characters
+        result["content"] = self.sanitizer.sanitize(result["content"])
+        self.modeTracker.observe(result["content"])
         return result
@@ -23,7 +23,19 @@ Author: Azrael, Cheung Kei-Chuen
 """
 
 import re
+import time
+import threading
 from forward.utils.sshv2 import sshv2
+from forward.utils.sessionPool import getSessionPool
+from forward.utils.instrumentation import getInstrumentation, redactCommand
+from forward.utils.resultCache import getResultCache
+from forward.utils.recvBuffer import RecvBuffer
+from forward.utils.promptMatcher import PromptMatcher
+from forward.utils import patterns
+from forward.utils.patterns import compilePattern
+from forward.utils.sanitizer import SSHV2_SANITIZER
+from forward.utils.routeParser import writeRoutes
+from forward.utils.cliMode import ModeTracker
 from forward.utils.forwardError import ForwardError
 
 
@@ -38,6 +50,18 @@ class BASESSHV2(object):
         self.port = kwargs['port'] if 'port' in kwargs else 22
         self.timeout = kwargs['timeout'] if 'timeout' in kwargs else 30
         self.privilegePw = kwargs['privilegePw'] if 'privilegePw' in kwargs else ''
+        # Share the connection of the device by a SessionPool, True for the process-wide pool
+        self.sessionPool = kwargs['sessionPool'] if 'sessionPool' in kwargs else None
+        if self.sessionPool is True:
+            self.sessionPool = getSessionPool()
+        # Login and command events go to the sinks of an Instrumentation, the process-wide one by default
+        self.instrumentation = kwargs['instrumentation'] if 'instrumentation' in kwargs else getInstrumentation()
+        # Cache the results of the show methods by a ResultCache, True for the process-wide cache
+        self.resultCache = kwargs['resultCache'] if 'resultCache' in kwargs else None
+        if self.resultCache is True:
+            self.resultCache = getResultCache()
+        if self.resultCache is not None:
+            self.resultCache.attach(self)
 
         self.isLogin = False
         self.isEnable = False
@@ -49,6 +73,25 @@ class BASESSHV2(object):
         self.basePrompt = "(>|#|\]|\$) *$"
         self.prompt = ''
         self.moreFlag = '(< *)?(\-)+( |\()?[Mm]ore.*(\)| )?(\-)+( *>)?|\(Q to quit\)'
+        # Removes More markers and terminal characters from the output
+        self.sanitizer = SSHV2_SANITIZER
+        # Commands disabling the paging of the device, run once after login
+        self.noPaging = []
+        # CLI mode shown by the last prompt, vendors give their mode prompts, see forward.utils.cliMode
+        self.modeTracker = ModeTracker()
+        # Run read-only commands of readCommands() on ssh exec channels, concurrently
+        self.execMode = kwargs['execMode'] if 'execMode' in kwargs else False
+        # Max exec channels opened at the same time on the transport
+        self.maxChannels = kwargs['maxChannels'] if 'maxChannels' in kwargs else 4
+        # Routing table command, its prompt dict and its parser class of showRouteStream()
+        self.routeCommand = None
+        self.routePrompt = None
+        self.routeParser = None
+        # Completion of execute() by idle time, None for the carriage return probe, see forward.utils.quiescence
+        self.quiescence = None
+        # Error of a rejected line and max lines sent ahead of the device, of pushConfig()
+        self.configError = patterns.CONFIG_ERROR
+        self.configWindow = kwargs['configWindow'] if 'configWindow' in kwargs else 32
         self.mode = 1
 
         """
@@ -72,39 +115,63 @@ class BASESSHV2(object):
             'status': False,
             'errLog': ''
         }
-        # sshv2(ip,username,password,timeout,port=22)
-        sshChannel = sshv2(self.ip, self.username, self.password, self.timeout, self.port)
+        start = time.time()
+        if self.sessionPool:
+            # Reuse the connected client of the device, only a new shell is opened.
+            sshChannel = self.sessionPool.acquire(self.ip, self.username, self.password, self.timeout, self.port)
+        else:
+            # sshv2(ip,username,password,timeout,port=22)
+            sshChannel = sshv2(self.ip, self.username, self.password, self.timeout, self.port)
+        # Phase timings of the login event.
+        timings = dict(sshChannel.get('timings', {}))
         if sshChannel['status']:
             # Login succeed, init shell
             try:
                 result['status'] = True
                 self._channel = sshChannel['content']
+                phase = time.time()
                 # resize virtual console window size to 10000*10000
                 self.shell = self._channel.invoke_shell(width=10000, height=10000)
                 self.channel = self.shell
-                tmpBuffer = ''
+                tmpBuffer = RecvBuffer()
+                basePrompt = compilePattern(self.basePrompt)
                 while (
-                    not re.search(self.basePrompt, tmpBuffer.split('\n')[-1])
+                    not basePrompt.search(tmpBuffer.tail)
                 ) and (
-                    not re.search('(new +password)|(password.*change)', tmpBuffer.split('\n')[-1], flags=re.IGNORECASE)
+                    not patterns.PASSWORD_EXPIRED.search(tmpBuffer.tail)
                 ):
-                    tmpBuffer += self.shell.recv(1024)
+                    tmpBuffer.recv(self.shell)
                 # if prompt is 'New Password' ,raise Error.
-                if re.search('(new +password)|(password.*change)', tmpBuffer.split('\n')[-1], flags=re.IGNORECASE):
+                if patterns.PASSWORD_EXPIRED.search(tmpBuffer.tail):
                     raise ForwardError(
                         '[Login Error]: %s: Password expired, needed to be updated!' % self.ip
                     )
                 self.shell.settimeout(self.timeout)
+                timings['shell'] = time.time() - phase
                 # Record login status to True.
                 self.isLogin = True
+                phase = time.time()
                 self.getPrompt()
+                # The host name of the mode prompts, from the login prompt only: getPrompt() runs in sub-views too.
+                self.modeTracker.setHostname(self.modeTracker.prompt)
+                timings['prompt'] = time.time() - phase
+                phase = time.time()
+                self.sessionInit()
+                timings['init'] = time.time() - phase
             except Exception as e:
                 result['status'] = False
                 result['errLog'] = str(e)
+                self.isLogin = False
+                if self.sessionPool:
+                    self._discardSession()
         else:
             # Login failed
             self.isLogin = False
             result['errLog'] = sshChannel['errLog']
+        if self.instrumentation.sinks:
+            timings.update(event='login', ip=self.ip, model=self.__class__.__name__, status=result['status'],
+                           reused=sshChannel.get('reused', False), total=time.time() - start)
+            self.instrumentation.emit(timings)
         return result
 
     def logout(self):
@@ -116,8 +183,12 @@ class BASESSHV2(object):
             'errLog': ''
         }
         try:
-            # Close SSH
-            self._channel.close()
+            if self.sessionPool:
+                # Close the shell only, the connection stays in the pool.
+                self._releaseSession()
+            else:
+                # Close SSH
+                self._channel.close()
             # Modify login status to False.
             self.isLogin = False
             result['status'] = True
@@ -126,6 +197,27 @@ class BASESSHV2(object):
             result['errLog'] = str(e)
         return result
 
+    def _releaseSession(self):
+        # Give the client back to the pool once, a second logout() does nothing.
+        client, self._channel = self._channel, None
+        if client is None:
+            raise ForwardError('[Logout Error]: %s: Not login yet.' % self.ip)
+        try:
+            if self.shell:
+                self.shell.close()
+        finally:
+            self.sessionPool.release(client)
+
+    def _discardSession(self):
+        # The shell failed to start, the transport may be half initialised or timed out: not reused.
+        client, self._channel = self._channel, None
+        try:
+            if self.shell:
+                self.shell.close()
+        except Exception:
+            pass
+        self.sessionPool.discard(client)
+
     def execute(self, cmd):
         """execute a command line, only suitable for the scene when
         the prompt is equal before and after execution
@@ -135,32 +227,56 @@ class BASESSHV2(object):
             'content': '',
             'errLog': ''
         }
-        self.cleanBuffer()
+        quiescence = self.quiescence
+        if quiescence is None:
+            self.cleanBuffer()
+        else:
+            # No probe carriage return, the pending data is dropped.
+            quiescence.drain(self.shell)
         if self.isLogin:
             # check login status
             # [ex] when send('ls\r'),get 'ls\r\nroot base etc \r\n[wangzhe@cloudlab100 ~]$ '
             # [ex] data should be 'root base etc '
+            start = time.time()
             self.shell.send(cmd + "\r")
-            resultPattern = re.compile('[\r\n]+([\s\S]*)[\r\n]+(\x1b\[m)?' + self.prompt)
+            resultPattern = compilePattern('[\r\n]+([\s\S]*)[\r\n]+(\x1b\[m)?' + self.prompt)
+            prompt = compilePattern(self.prompt)
+            # Only the last line is checked for prompt and More flag,
+            # the whole output is joined once at the end.
+            buff = RecvBuffer()
+            pages = 0
+            regexTime = 0
             try:
-                while not re.search(self.prompt, result['content'].split('\n')[-1]):
-                    self.getMore(result['content'])
-                    result['content'] += self.shell.recv(1024)
+                while True:
+                    phase = time.time()
+                    found = prompt.search(buff.tail)
+                    regexTime += time.time() - phase
+                    # Complete at the prompt, or at the prompt followed by idle time.
+                    if found and (quiescence is None or quiescence.quiet(self.shell)):
+                        break
+                    if self.getMore(buff.tail):
+                        pages += 1
+                    buff.recv(self.shell)
+                    if quiescence is not None and buff.recvCount == 1:
+                        # The echo of the command comes after a round trip.
+                        quiescence.sample(time.time() - start)
+                result['content'] = buff.getvalue()
                 # try to extract the return data
-                tmp = re.search(resultPattern, result['content']).group(1)
+                phase = time.time()
+                tmp = resultPattern.search(result['content']).group(1)
+                regexTime += time.time() - phase
                 # Delete special characters caused by More split screen.
-                tmp = re.sub("<--- More --->\\r +\\r", "", tmp)
-                tmp = re.sub(" *---- More ----\x1b\[42D                                          \x1b\[42D", "", tmp)
-                # remove the More charactor
-                tmp = re.sub(' \-\-More\(CTRL\+C break\)\-\- (\x00|\x08){0,} +(\x00|\x08){0,}', "", tmp)
-                # remove the space key
-                tmp = re.sub("(\x08)+ +", "", tmp)
-                result['content'] = tmp
+                result['content'] = self.sanitizer.sanitize(tmp)
                 result["status"] = True
+                self.modeTracker.observe(buff.tail)
             except Exception as e:
                 # pattern not match
+                self.modeTracker.observe('')
+                result['content'] = result['content'] or buff.getvalue()
                 result['status'] = False
                 result['errLog'] = str(e)
+            if self.instrumentation.sinks:
+                self._emitCommand('execute', cmd, 'success' if result['status'] else None, buff, pages, regexTime, start)
         else:
             # not login
             result['status'] = False
@@ -171,10 +287,6 @@ class BASESSHV2(object):
         """execute a command line, powerful and suitable for any scene,
         but need to define whole prompt dict list
         """
-        # regx compile
-        _promptKey = prompt.keys()
-        for key in _promptKey:
-            prompt[key] = re.compile(prompt[key])
         result = {
             'status': False,
             'content': '',
@@ -196,6 +308,7 @@ class BASESSHV2(object):
         # Clean buffer data.
         while self.shell.recv_ready():
             self.shell.recv(1024)
+        start = time.time()
         try:
             # send a command
             self.shell.send("{cmd}\r".format(cmd=cmd))
@@ -203,52 +316,319 @@ class BASESSHV2(object):
             # break, if faild
             result["errLog"] = "That forwarder has sent a command is failed."
             return result
-        isBreak = False
+        # Only the new data and a small window before it are scanned on every read,
+        # special characters and More markers are removed once as the data arrives.
+        buff = RecvBuffer(minSize=204800, maxSize=204800, strip='\x08')
+        matcher = PromptMatcher(prompt, self.moreFlag, self.basePrompt)
+        pages = 0
+        regexTime = 0
         while True:
-            # Remove special characters.
-            result["content"] = re.sub("", "", result["content"])
-            self.getMore(result["content"])
+            if self.getMore(buff.tail):
+                pages += 1
             try:
-                result["content"] += self.shell.recv(204800)
+                data = buff.recv(self.shell)
             except Exception:
+                result["content"] = buff.getvalue()
                 result["errLog"] = "Forward had recived data timeout. [%s]" % result["content"]
+                self.modeTracker.observe('')
+                if self.instrumentation.sinks:
+                    self._emitCommand('command', cmd, None, buff, pages, regexTime, start)
                 return result
             # Mathing specify key
-            for key in prompt:
-                if re.search(prompt[key], re.sub(self.moreFlag, "", result["content"])):
-                    # Found it
-                    result["state"] = key
-                    isBreak = True
-                    break
+            phase = time.time()
+            result["state"] = matcher.feed(data)
+            regexTime += time.time() - phase
             # Keywords have been captured.
-            if isBreak is True:
+            if result["state"] is not None:
                 break
-        # Delete page break
-        result["content"] = re.sub("\r\n.*?\r +?\r", "\r\n", result["content"])
-        # Clearing special characters
-        result["content"] = re.sub(" *---- More ----\x1b\[42D                                          \x1b\[42D",
-                                   "",
-                                   result["content"])
-        result["content"] = re.sub("<--- More --->\\r +\\r", "", result["content"])
-        # remove the More charactor
-        result["content"] = re.sub(' \-\-More\(CTRL\+C break\)\-\- (\x00|\x08){0,} +(\x00|\x08){0,}', "",
-                                   result["content"])
-        # remove the space key
-        result["content"] = re.sub("(\x08)+ +", "", result["content"])
+        # Delete page break and special characters
+        result["content"] = self.sanitizer.sanitize(buff.getvalue())
         result["status"] = True
+        self.modeTracker.observe(result["content"])
+        if self.instrumentation.sinks:
+            self._emitCommand('command', cmd, result["state"], buff, pages, regexTime, start)
+        return result
+
+    def streamCommand(self, cmd, prompt, timeout=30):
+        """Execute a command like command(), yield the lines of the output as they arrive.
+        Only the incomplete last line and the prompt window are kept, for outputs too big
+        to hold, [ex] the routing table of a core router. Raise ForwardError on failure.
+        """
+        if self.isLogin is False:
+            raise ForwardError('[Execute Error]: %s: device not login.' % self.ip)
+        self.shell.settimeout(timeout)
+        while self.shell.recv_ready():
+            self.shell.recv(1024)
+        start = time.time()
+        try:
+            self.shell.send("{cmd}\r".format(cmd=cmd))
+        except Exception:
+            raise ForwardError('[Execute Error]: %s: sending %s failed.' % (self.ip, cmd))
+        buff = RecvBuffer(strip='\x08')
+        matcher = PromptMatcher(prompt, self.moreFlag, self.basePrompt, keep=False)
+        pages = 0
+        state = None
+        # Received data not yielded yet, from the line break before the last line.
+        pending = ''
+        while state is None:
+            if self.getMore(buff.tail):
+                pages += 1
+            try:
+                buff.recv(self.shell)
+            except Exception:
+                self.modeTracker.observe('')
+                if self.instrumentation.sinks:
+                    self._emitCommand('stream', cmd, None, buff, pages, None, start)
+                raise ForwardError('[Execute Error]: %s: receive timeout of %s.' % (self.ip, cmd))
+            data = buff.drain()
+            state = matcher.feed(data)
+            pending += data
+            position = pending.rfind('\n')
+            if position > 0 and state is None:
+                # Page breaks start at the line break before the More marker, it stays pending.
+                if pending[position - 1] == '\r':
+                    position -= 1
+                ready, pending = pending[:position], pending[position:]
+                for line in self._splitLines(ready):
+                    yield line
+        self.modeTracker.observe(pending)
+        for line in self._splitLines(pending):
+            yield line
+        if self.instrumentation.sinks:
+            self._emitCommand('stream', cmd, state, buff, pages, None, start)
+        if state != 'success':
+            raise ForwardError('[Execute Error]: %s: %s failed, state %s.' % (self.ip, cmd, state))
+
+    def _splitLines(self, text):
+        # Sanitized lines of a piece of the output, the piece starts at a line break.
+        text = self.sanitizer.sanitize(text)
+        if text.startswith('\r\n'):
+            text = text[2:]
+        elif text.startswith('\n'):
+            text = text[1:]
+        return [line.rstrip('\r') for line in text.split('\n')] if text else []
+
+    def showRouteStream(self):
+        """Yield the routes of the routing table as Route tuples while it is received,
+        see forward.utils.routeParser
+        """
+        if self.routeParser is None:
+            raise ForwardError('[Route Error]: %s has no routing table parser.' % self.__class__.__name__)
+        parser = self.routeParser()
+        for line in self.streamCommand(self.routeCommand, self.routePrompt):
+            for route in parser.feed(line):
+                yield route
+        for route in parser.close():
+            yield route
+
+    def saveRoutes(self, output):
+        """Write the routing table to a file as tab separated routes, without holding it
+        - parameter output: path of the file or a file-like object
+        """
+        njInfo = {
+            'status': False,
+            'content': 0,
+            'errLog': ''
+        }
+        try:
+            njInfo['content'] = writeRoutes(self.showRouteStream(), output)
+            njInfo['status'] = True
+        except ForwardError as e:
+            njInfo['errLog'] = str(e)
+        return njInfo
+
+    def pushConfig(self, lines, window=None, timeout=None):
+        """Send a block of configuration lines in config mode, without waiting for the
+        prompt of a line before sending the next: at most window lines are ahead of the
+        device. The output of every line is checked by self.configError, the lines are
+        counted by the host prompts echoing them. The session stays in config mode.
+        [ex] pushConfig(['acl number 3000', 'rule 5 permit ip', ...])
+        Return the njInfo with 'errors': [{'index', 'line', 'error'}] of the rejected lines.
+        """
+        njInfo = {
+            'status': False,
+            'content': '',
+            'errLog': '',
+            'errors': []
+        }
+        if self.isLogin is False:
+            njInfo['errLog'] = '[Push Config Error]: device not login.'
+            return njInfo
+        lines = list(lines)
+        window = window or self.configWindow
+        if not lines:
+            njInfo['status'] = True
+            return njInfo
+        # Huawei-like devices configure in the system view of privilegeMode().
+        data = getattr(self, 'configMode', self.privilegeMode)()
+        if not data['status']:
+            njInfo['errLog'] = '[Push Config Error]: %s' % data['errLog']
+            return njInfo
+        linePrompt = self.modeTracker.linePrompt
+        if linePrompt is None:
+            njInfo['errLog'] = '[Push Config Error]: %s: host prompt unknown.' % self.ip
+            return njInfo
+        self.shell.settimeout(timeout or self.timeout)
+        while self.shell.recv_ready():
+            self.shell.recv(1024)
+        start = time.time()
+        buff = RecvBuffer(strip='\x08')
+        output = []
+        sent = prompts = pages = 0
+        # Received data after the last line break.
+        pending = ''
+        while True:
+            tail = self.sanitizer.sanitize(pending).strip()
+            match = linePrompt.match(tail)
+            done = prompts + (1 if match and match.end() >= len(tail) else 0)
+            if done >= len(lines):
+                break
+            if sent < len(lines) and sent - done < window:
+                batch = lines[sent:done + window]
+                try:
+                    self.shell.send(''.join('%s\r' % line for line in batch))
+                except Exception:
+                    njInfo['errLog'] = '[Push Config Error]: %s: sending failed.' % self.ip
+                    break
+                sent += len(batch)
+            if self.getMore(buff.tail):
+                pages += 1
+            try:
+                buff.recv(self.shell)
+            except Exception:
+                njInfo['errLog'] = '[Push Config Error]: %s: receive timeout, %d of %d lines done.' % (
+                    self.ip, done, len(lines))
+                break
+            pending += buff.drain()
+            position = pending.rfind('\n')
+            if position < 0:
+                continue
+            ready, pending = pending[:position], pending[position + 1:]
+            for line in self.sanitizer.sanitize(ready).split('\n'):
+                line = line.rstrip('\r')
+                output.append(line)
+                if linePrompt.match(line.strip()):
+                    # Echo of the next line after the prompt.
+                    prompts += 1
+                elif self.configError.search(line):
+                    index = min(prompts, len(lines) - 1)
+                    njInfo['errors'].append({'index': index, 'line': lines[index], 'error': line.strip()})
+        tail = self.sanitizer.sanitize(pending)
+        output.append(tail)
+        njInfo['content'] = '\n'.join(output)
+        self.modeTracker.observe(tail if not njInfo['errLog'] else '')
+        for error in njInfo['errors']:
+            njInfo['errLog'] += '[Push Config Error]: line %d %s: %s ' % (error['index'], error['line'], error['error'])
+        njInfo['status'] = not njInfo['errLog']
+        if self.instrumentation.sinks:
+            self._emitCommand('pushConfig', '%d lines' % len(lines), 'success' if njInfo['status'] else None,
+                              buff, pages, None, start)
+        return njInfo
+
+    def _emitCommand(self, method, cmd, state, buff, pages, regexTime, start):
+        # Command event of the instrumentation, see forward.utils.instrumentation.
+        self.instrumentation.emit({
+            'event': 'command', 'ip': self.ip, 'model': self.__class__.__name__, 'method': method,
+            'cmd': redactCommand(cmd), 'state': state, 'bytes': buff.size, 'recvs': buff.recvCount, 'pages': pages,
+            'regexTime': regexTime, 'wallTime': time.time() - start})
+
+    def execCommand(self, cmd, timeout=None):
+        """Run a read-only command on a new ssh exec channel of the logged in transport,
+        the output is read until EOF, no prompt and no More to handle. An output line
+        matching self.configError means the device rejected the command, a failure.
+        """
+        result = {
+            'status': False,
+            'content': '',
+            'errLog': ''
+        }
+        if self.isLogin is False:
+            result['errLog'] = '[Execute Error]: device not login.'
+            return result
+        timeout = self.timeout if timeout is None else timeout
+        start = time.time()
+        buff = RecvBuffer()
+        channel = None
+        try:
+            channel = self._channel.get_transport().open_session(timeout=timeout)
+            channel.settimeout(timeout)
+            channel.set_combine_stderr(True)
+            channel.exec_command(cmd)
+            while True:
+                data = channel.recv(buff.readSize)
+                buff.recvCount += 1
+                if not data:
+                    # EOF, the command is finished.
+                    break
+                buff.feed(data)
+            result['content'] = self.sanitizer.sanitize(buff.getvalue())
+            errors = [line.strip() for line in result['content'].split('\n') if self.configError.search(line)]
+            if errors:
+                result['errLog'] = '[Exec Error]: %s: %s rejected. %s' % (self.ip, cmd, errors[0])
+            else:
+                result['status'] = True
+        except Exception as e:
+            result['content'] = buff.getvalue()
+            result['errLog'] = '[Exec Error]: %s: %s failed. %s' % (self.ip, cmd, str(e))
+        finally:
+            if channel is not None:
+                channel.close()
+        if self.instrumentation.sinks:
+            self._emitCommand('exec', cmd, 'success' if result['status'] else None, buff, 0, 0, start)
         return result
 
+    def execCommands(self, cmds, timeout=None, maxChannels=None):
+        """Run read-only commands concurrently on exec channels of one transport,
+        return the results in the order of cmds
+        """
+        maxChannels = maxChannels or self.maxChannels
+        results = [None] * len(cmds)
+        pending = list(range(len(cmds)))
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    index = pending.pop(0)
+                results[index] = self.execCommand(cmds[index], timeout=timeout)
+
+        workers = [threading.Thread(target=worker) for i in range(min(maxChannels, len(cmds)))]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return results
+
+    def readCommands(self, cmds, prompt, timeout=30):
+        """Collect the output of read-only commands, on exec channels in execMode,
+        else one after another by command() with the given prompt dict
+        [ex] basicInfo
+        """
+        if self.execMode:
+            return self.execCommands(cmds, timeout=timeout)
+        results = []
+        for cmd in cmds:
+            data = self.command(cmd=cmd, prompt=prompt, timeout=timeout)
+            data['status'] = data['state'] == 'success'
+            results.append(data)
+        return results
+
     def getPrompt(self):
         """Automatically get the current system prompt by sending a carriage return
         """
         if self.isLogin:
             # login status True
-            result = ''
             self.cleanBuffer()
             self.shell.send('\n')
             # set recv timeout to self.timeout/10 fot temporary
-            while not re.search(self.basePrompt, result):
-                result += self.shell.recv(1024)
+            buff = RecvBuffer()
+            basePrompt = compilePattern(self.basePrompt)
+            while not basePrompt.search(buff.tail):
+                buff.recv(self.shell)
+            result = buff.getvalue()
             if result:
                 # recv() get something
                 # select last line character,[ex]' >[localhost@labstill019~]$ '
@@ -258,14 +638,15 @@ class BASESSHV2(object):
                 # [ex]'[localhost@labstill019~]'
                 # self.prompt=self.prompt[1:-1]
                 # [ex]'\\[localhost\\@labstill019\\~\\]$'
-                if re.search("> ?$", self.prompt):
+                if patterns.GENERAL_MODE.search(self.prompt):
                     # If last character of host prompt of the device ens in '>',
                     # the command line of device in gneral mode.
                     self.mode = 1
-                elif re.search("(#|\]) ?$", self.prompt):
+                elif patterns.PRIVILEGE_MODE.search(self.prompt):
                     # If last character of host prompt of the device ens in '#',
                     # the command line of device in enable mode.
                     self.mode = 2
+                self.modeTracker.observe(self.prompt)
                 self.prompt = re.escape(self.prompt)
                 return self.prompt
             else:
@@ -275,13 +656,34 @@ class BASESSHV2(object):
             # login status failed
             raise ForwardError('[Get Prompt Error]: %s: Not login yet.' % self.ip)
 
+    def sessionInit(self):
+        """Disable the paging of the device by self.noPaging, so long outputs come in one stream.
+        A failed command is ignored, More is still handled by getMore.
+        """
+        result = {
+            'status': True,
+            'content': '',
+            'errLog': ''
+        }
+        for cmd in self.noPaging:
+            try:
+                data = self.command(cmd, prompt={"success": self.basePrompt}, timeout=self.timeout)
+            except Exception as e:
+                data = {'state': None, 'errLog': str(e)}
+            if data['state'] is None:
+                result['status'] = False
+                result['errLog'] += '[Session Init Error]: %s: %s failed. %s' % (self.ip, cmd, data['errLog'])
+        return result
+
     def getMore(self, bufferData):
         """Automatically get more echo infos by sending a blank symbol
         """
         # if check buffer data has 'more' flag, at last line.
-        if re.search(self.moreFlag, bufferData.split('\n')[-1].strip("\x00")):
+        if compilePattern(self.moreFlag).search(bufferData.split('\n')[-1].strip("\x00")):
             # can't used to \n and ' \r' ,because product enter character
             self.shell.send(' ')
+            return True
+        return False
 
     def cleanBuffer(self):
         """Clean the shell buffer whatever they are, by sending a carriage return
@@ -289,10 +691,21 @@ class BASESSHV2(object):
         if self.shell.recv_ready():
             self.shell.recv(4096)
         self.shell.send('\n')
-        buff = ''
+        buff = RecvBuffer()
+        basePrompt = compilePattern(self.basePrompt)
         # When after switching mode, the prompt will change, it should be based on basePrompt to check and at last line
-        while not re.search(self.basePrompt, buff.split('\n')[-1]):
+        while not basePrompt.search(buff.tail):
             try:
-                buff += self.shell.recv(1024)
+                buff.recv(self.shell)
             except Exception:
-                raise ForwardError('[Clean Buffer Error]: %s: Receive timeout [%s]' % (self.ip, buff))
+                raise ForwardError('[Clean Buffer Error]: %s: Receive timeout [%s]' % (self.ip, buff.getvalue()))
+
+    def _alreadyIn(self, mode, result):
+        """Return True if the prompt shows the mode already, nothing to send: self.mode and
+        the status of the result dict are set
+        """
+        if self.modeTracker.mode() != mode:
+            return False
+        self.mode = mode
+        result['status'] = True
+        return True
@@ -21,7 +21,13 @@
 [Core][forward] Base device class for telnet method, by using telnetlib module.
 """
 import re
-from forward.utils.telnet import telnet
+import time
+from forward.utils.instrumentation import getInstrumentation, redactCommand
+from forward.utils.resultCache import getResultCache
+from forward.utils import patterns
+from forward.utils.patterns import compilePattern
+from forward.utils.sanitizer import TELNET_SANITIZER, TELNET_EXECUTE_SANITIZER
+from forward.utils.cliMode import ModeTracker
 from forward.utils.forwardError import ForwardError
 
 
@@ -36,6 +42,14 @@ class BASETELNET(object):
         self.port = kwargs['port'] if 'port' in kwargs else 23
         self.timeout = kwargs['timeout'] if 'timeout' in kwargs else 30
         self.privilegePw = kwargs['privilegePw'] if 'privilegePw' in kwargs else ''
+        # Login and command events go to the sinks of an Instrumentation, the process-wide one by default
+        self.instrumentation = kwargs['instrumentation'] if 'instrumentation' in kwargs else getInstrumentation()
+        # Cache the results of the show methods by a ResultCache, True for the process-wide cache
+        self.resultCache = kwargs['resultCache'] if 'resultCache' in kwargs else None
+        if self.resultCache is True:
+            self.resultCache = getResultCache()
+        if self.resultCache is not None:
+            self.resultCache.attach(self)
 
         self.isLogin = False
         self.isEnable = False
@@ -47,6 +61,14 @@ class BASETELNET(object):
         self.basePrompt = r"(>|#|\]|\$) *$"
         self.prompt = ''
         self.moreFlag = '(\-)+( |\()?[Mm]ore.*(\)| )?(\-)+|\(Q to quit\)'
+        # Removes More markers and terminal characters from the output
+        self.sanitizer = TELNET_SANITIZER
+        # Same for execute(), which cleans less
+        self.executeSanitizer = TELNET_EXECUTE_SANITIZER
+        # Commands disabling the paging of the device, run once after login
+        self.noPaging = []
+        # CLI mode shown by the last prompt, vendors give their mode prompts, see forward.utils.cliMode
+        self.modeTracker = ModeTracker()
         self.mode = 1
 
         """
@@ -67,22 +89,38 @@ class BASETELNET(object):
             'status': False,
             'errLog': ''
         }
+        start = time.time()
+        # telnetlib is imported on the first login, not at import of the device classes.
+        from forward.utils.telnet import telnet
         # telnet(ip,username,password,port=23,timeout)
         sshChannel = telnet(ip=self.ip,
                             username=self.username,
                             password=self.password,
                             port=self.port,
                             timeout=self.timeout)
+        # Phase timings of the login event, the shell of telnet is the connection itself.
+        timings = dict(sshChannel.get('timings', {}))
         if sshChannel['status']:
             # Login succeed, init shell
             self.channel = sshChannel['content']
             # Record login status to True.
             self.isLogin = True
             # Get host prompt.
+            phase = time.time()
             self.getPrompt()
+            # The host name of the mode prompts, from the login prompt only: getPrompt() runs in sub-views too.
+            self.modeTracker.setHostname(self.modeTracker.prompt)
+            timings['prompt'] = time.time() - phase
+            phase = time.time()
+            self.sessionInit()
+            timings['init'] = time.time() - phase
             result['status'] = True
         else:
             result['errLog'] = sshChannel['errLog']
+        if self.instrumentation.sinks:
+            timings.update(event='login', ip=self.ip, model=self.__class__.__name__, status=result['status'],
+                           reused=False, total=time.time() - start)
+            self.instrumentation.emit(timings)
         return result
 
     def __del__(self):
@@ -122,8 +160,9 @@ class BASETELNET(object):
             # [ex] when send('ls\r'),get 'ls\r\nroot base etc \r\n[wangzhe@cloudlab100 ~]$ '
             # [ex] data should be 'root base etc '
             self.cleanBuffer()
+            start = time.time()
             self.channel.write(cmd + "\n")
-            i = self.channel.expect([r'%s' % self.moreFlag, r"%s" % self.prompt], timeout=self.timeout)
+            i = self.channel.expect([compilePattern(self.moreFlag), compilePattern(self.prompt)], timeout=self.timeout)
             # Get result
             result = i[-1]
             try:
@@ -136,26 +175,47 @@ class BASETELNET(object):
                 data['content'] += result
                 try:
                     # Intercept command result
-                    tmp = re.search(dataPattern, data['content']).group(1)
+                    tmp = compilePattern(dataPattern).search(data['content']).group(1)
                     # Delete special characters caused by More split screen.
-                    tmp = re.sub("<--- More --->\\r +\\r", "", tmp)
-                    tmp = re.sub('(\x00|\x08){0,}', "", tmp)
-                    tmp = re.sub(re.escape("--More(CTRL+Cbreak)--"), "", tmp)
-                    data['content'] = tmp
+                    data['content'] = self.executeSanitizer.sanitize(tmp)
                     data['status'] = True
+                    self.modeTracker.observe(result)
                 except Exception as e:
                     # Not found host prompt
                     raise ForwardError('not found host prompt Errorr(%s)' % str(e))
             except Exception as e:
                 # Not found host prompt
                 data['status'] = False
+                self.modeTracker.observe('')
                 data['errLog'] = data['errLog'] + 'not found host prompt Errorr(%s)' % str(e)
+            if self.instrumentation.sinks:
+                # Every More page is one more expect().
+                pages = len(compilePattern(self.moreFlag).findall(result))
+                self._emitCommand('execute', cmd, 'success' if data['status'] else None, result, pages + 1, pages,
+                                  start)
         else:
             # Not login
             data['status'] = False
             data['content'] = 'ERROR:device not login'
         return data
 
+    def sessionInit(self):
+        """Disable the paging of the device by self.noPaging, so long outputs come in one stream.
+        A failed command is ignored, More is still handled by getMore.
+        """
+        result = {
+            'status': True,
+            'content': '',
+            'errLog': ''
+        }
+        for cmd in self.noPaging:
+            self.channel.write(cmd + "\n")
+            i = self.channel.expect([compilePattern(self.basePrompt)], timeout=self.timeout)
+            if i[0] == -1:
+                result['status'] = False
+                result['errLog'] += '[Session Init Error]: %s: %s receive timeout.' % (self.ip, cmd)
+        return result
+
     def getMore(self):
         # Apply to the execute method
         """Automatically get more echo infos by sending a blank symbol
@@ -164,7 +224,7 @@ class BASETELNET(object):
         while True:
             # The return message is received until there is no More character like More.
             self.channel.send(' ')
-            i = self.channel.expect([r'%s' % self.moreFlag, self.prompt], timeout=self.timeout)
+            i = self.channel.expect([compilePattern(self.moreFlag), compilePattern(self.prompt)], timeout=self.timeout)
             # Get result
             result += i[-1]
             if i[0] == 1:
@@ -182,7 +242,7 @@ class BASETELNET(object):
             # If the acceptance is not complete, you cannot send a space
             if not continueRecv:
                 self.channel.send(' ')
-            i = self.channel.expect([r'%s' % self.moreFlag, self.basePrompt], timeout=timeout)
+            i = self.channel.expect([compilePattern(self.moreFlag), compilePattern(self.basePrompt)], timeout=timeout)
             # Get result
             result += i[-1]
             if i[0] == 0:
@@ -193,7 +253,7 @@ class BASETELNET(object):
                 for section in prompt:
                     # section.values() is : [ [p1,p2,p3] ]
                     for _prompt in section.values()[0]:
-                        if re.search(_prompt, result.split("\n")[-1]):
+                        if compilePattern(_prompt).search(result.split("\n")[-1]):
                             state = section.keys()[0]
                             break
                     # Find the specified state type
@@ -213,7 +273,7 @@ class BASETELNET(object):
         """Automatically get the current system prompt by sending a carriage return
         """
         self.channel.send('\n')
-        i = self.channel.expect([r"%s" % self.basePrompt], timeout=self.timeout)
+        i = self.channel.expect([compilePattern(self.basePrompt)], timeout=self.timeout)
         # select last line character,[ex]' >[localhost@labstill019~]$ '
         # [ex]'>[localhost@labstill019~]$'
         # self.prompt=self.prompt.split()[0]
@@ -221,12 +281,13 @@ class BASETELNET(object):
         # self.prompt=self.prompt[1:-1]
         # [ex]'\\[localhost\\@labstill019\\~\\]$'
         self.prompt = i[-1].split('\n')[-1]
-        if re.search("> ?$", self.prompt):
+        if patterns.GENERAL_MODE.search(self.prompt):
             # If last character of host prompt of the device ens in '>', the command line of device in gneral mode.
             self.mode = 1
-        elif re.search("(#|\]) ?$", self.prompt):
+        elif patterns.PRIVILEGE_MODE.search(self.prompt):
             # If last character of host prompt of the device ens in '#', the command line of device in enable mode.
             self.mode = 2
+        self.modeTracker.observe(self.prompt)
         self.prompt = re.escape(self.prompt)
         return self.prompt
 
@@ -234,21 +295,25 @@ class BASETELNET(object):
         """Clean the shell buffer whatever they are, by sending a carriage return
         """
         self.channel.send('\n')
-        i = self.channel.expect([r"%s" % self.prompt], timeout=self.timeout)
+        i = self.channel.expect([compilePattern(self.prompt)], timeout=self.timeout)
         result = i[-1]
         return result
 
+    def _alreadyIn(self, mode, result):
+        """Return True if the prompt shows the mode already, nothing to send: self.mode and
+        the status of the result dict are set
+        """
+        if self.modeTracker.mode() != mode:
+            return False
+        self.mode = mode
+        result['status'] = True
+        return True
+
     def command(self, cmd=None, prompt=None, timeout=30):
         """execute a command line, powerful and suitable for any scene,
         but need to define whole prompt dict list
         """
-        # regx compile
-        """
-        _promptKey = prompt.keys()
-        for key in _promptKey:
-            prompt[key] = re.compile(prompt[key])
-        In Telnet, regular expressions cannot be compiled
-        """
+        # The prompt dict of the caller is left as it is, patterns are compiled once by forward.utils.patterns
         result = {
             'status': False,
             'content': '',
@@ -264,6 +329,9 @@ class BASETELNET(object):
         }
         if (cmd is None) or (not isinstance(prompt, dict)) or (not isinstance(timeout, int)):
             raise ForwardError("You should given a parameter for prompt such as: %s" % (str(parameterFormat)))
+        start = time.time()
+        recvs = 0
+        pages = 0
         try:
             # send a command
             self.channel.write("{cmd}\r".format(cmd=cmd))
@@ -272,20 +340,22 @@ class BASETELNET(object):
             result["errLog"] = "Forward had sent a command failure."
             return result
         while True:
-            i = self.channel.expect([r'%s' % self.moreFlag,
+            recvs += 1
+            i = self.channel.expect([compilePattern(self.moreFlag),
                                      # prompt-1
-                                     r"%s" % prompt.items()[0][1],
+                                     compilePattern(prompt.items()[0][1]),
                                      # prompt-2
-                                     r"%s" % prompt.items()[1][1]], timeout=timeout)
+                                     compilePattern(prompt.items()[1][1])], timeout=timeout)
             result["content"] += i[-1]
             if i[0] == 0:
                 # Get more
+                pages += 1
                 self.channel.write(" ".format(cmd=cmd))
             elif i[0] == 1:
                 # Find the prompt-1
                 result["state"] = prompt.items()[0][0]
                 # Matching page break
-                if re.search(self.moreFlag, result["content"].split("\r\n")[-1]):
+                if compilePattern(self.moreFlag).search(result["content"].split("\r\n")[-1]):
                     continue
                 else:
                     break
@@ -293,21 +363,29 @@ class BASETELNET(object):
                 # Find the prompt-2
                 result["state"] = prompt.items()[1][0]
                 # Matching page break
-                if re.search(self.moreFlag, result["content"].split("\r\n")[-1]):
+                if compilePattern(self.moreFlag).search(result["content"].split("\r\n")[-1]):
                     continue
                 else:
                     break
             elif i[0] == -1:
                 # Timeout
                 result["errLog"] = '[Forward Error]: receive timeout,prompt is invalid.'
+                self.modeTracker.observe('')
+                if self.instrumentation.sinks:
+                    self._emitCommand('command', cmd, None, result["content"], recvs, pages, start)
                 return result
         result["status"] = True
-        # Delete page break
-        result["content"] = re.sub("\r\n.*?\r *?\r", "\r\n", result["content"])
-        result["content"] = re.sub("<--- More --->\\r +\\r", "", result["content"])
-        # remove the More charactor
-        result["content"] = re.sub(' \-\-More\(CTRL\+C break\)\-\- (\x00|\x08){0,} +(\x00|\x08){0,}', "",
-                                   result["content"])
-        # remove the space key
-        result["content"] = re.sub("(\x08)+ +", "", result["content"])
+        if self.instrumentation.sinks:
+            self._emitCommand('command', cmd, result["state"], result["content"], recvs, pages, start)
+        # Delete page break and special characters
+        result["content"] = self.sanitizer.sanitize(result["content"])
+        self.modeTracker.observe(result["content"])
         return result
+
+    def _emitCommand(self, method, cmd, state, content, recvs, pages, start):
+        # Command event of the instrumentation, see forward.utils.instrumentation.
+        # The patterns are matched inside telnetlib.expect(), no regexTime of its own.
+        self.instrumentation.emit({
+            'event': 'command', 'ip': self.ip, 'model': self.__class__.__name__, 'method': method,
+            'cmd': redactCommand(cmd), 'state': state, 'bytes': len(content), 'recvs': recvs, 'pages': pages,
+            'regexTime': None, 'wallTime': time.time() - start})
@@ -20,6 +20,7 @@
 [Core][forward] Device class for Venustech.
 """
 from forward.devclass.baseTELNET import BASETELNET
+from forward.utils.cliMode import ModeTracker, CISCO_MODES
 import re
 
 
@@ -27,6 +28,12 @@ class BASEVENUSTECH(BASETELNET):
     """This is a manufacturer of venustech, using the
     telnet version of the protocol, so it is integrated with BASETELNET library.
     """
+    def __init__(self, *args, **kws):
+        """Track the mode of the session by its prompts.
+        """
+        BASETELNET.__init__(self, *args, **kws)
+        self.modeTracker = ModeTracker(CISCO_MODES)
+
     def privilegeMode(self):
         # Switch to privilege mode.
         result = {
@@ -34,6 +41,8 @@ class BASEVENUSTECH(BASETELNET):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
@@ -107,6 +116,8 @@ class BASEVENUSTECH(BASETELNET):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # Program need to go from privileged mode to configuration mode anyway,Becauseof
         # you might be in interface mode, but you don't have a marks value of the mode
         _result = self.privilegeMode()
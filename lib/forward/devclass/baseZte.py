@@ -19,6 +19,7 @@
 [Core][forward] Device class for zte,zhong-xing.
 """
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.utils.cliMode import ModeTracker, CISCO_MODES
 import re
 
 
@@ -26,6 +27,13 @@ class BASEZTE(BASESSHV2):
     """This is a manufacturer of zte, using the
     SSHV2 version of the protocol, so it is integrated with BASESSHV2 library.
     """
+    def __init__(self, *args, **kws):
+        """Disable the paging of the terminal after login.
+        """
+        BASESSHV2.__init__(self, *args, **kws)
+        self.noPaging = ["terminal length 0"]
+        self.modeTracker = ModeTracker(CISCO_MODES)
+
     def commit(self):
         result = {
             "status": False,
@@ -55,6 +63,8 @@ class BASEZTE(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(3, result):
+            return result
         # Program need to go from privileged mode to configuration mode anyway,Becauseof
         # you might be in interface mode, but you don't have a marks value of the mode
         _result = self.privilegeMode()
@@ -81,6 +91,8 @@ class BASEZTE(BASESSHV2):
             "content": "",
             "errLog": ""
         }
+        if self._alreadyIn(2, result):
+            return result
         # Get the current position Before switch to privileged mode.
         # Demotion,If device currently mode-level greater than 2, It only need to execute `end`.
         if self.mode >= 2:
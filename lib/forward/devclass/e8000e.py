@@ -20,13 +20,25 @@
 [Core][forward] Device class for E8000E.
 """
 from forward.devclass.baseHuawei import BASEHUAWEI
+from forward.utils.ipRange import IpSet, parseAddress
+from forward.utils.forwardError import ForwardError
 import re
 import string
 
 
+def serviceItem(protocol, sStart, sEnd, dStart, dEnd):
+    # Service of a service-set, the key of the object catalog.
+    return (protocol, int(sStart), int(sEnd), int(dStart), int(dEnd))
+
+
 class E8000E(BASEHUAWEI):
     """This is a manufacturer of huawei, it is integrated with BASEHUAWEI library.
     """
+    def __init__(self, *args, **kws):
+        BASEHUAWEI.__init__(self, *args, **kws)
+        # Address-sets and service-sets by their items, None until loadObjectCatalog()
+        self.objectCatalog = None
+
     def showVlan(self):
         njInfo = {
             'status': False,
@@ -390,14 +402,22 @@ class E8000E(BASEHUAWEI):
         if mask is None:
             njInfo["errLog"] = "[Forward Error] Please specify a parameter for the mask."
             return njInfo
+        try:
+            members = IpSet('%s %s' % (ip, mask))
+        except ForwardError:
+            njInfo['errLog'] = 'Not correct ip.'
+            return njInfo
+        if self.objectCatalog is not None:
+            return self._catalogObject('address', members)
         cmd = 'display ip address-set address %s mask %s type object' % (ip, mask)
         result = self.command(cmd=cmd, prompt=prompt)
         if not result['status'] or result['state'] != 'success':
             njInfo['errLog'] = result['errLog']
             return njInfo
-        if re.search('Item\(s\)\:\r\n address \d+ %s mask %s' % (ip, mask), result):
+        name = self._findAddressSet(result['content'], members)
+        if name is not None:
             njInfo['status'] = True
-            njInfo['content'] = re.findall('Address-set: (.*%s)' % ip, result)[0]
+            njInfo['content'] = name
         return njInfo
 
     def showIpRangeObject(self, sIP=None, eIP=None):
@@ -424,25 +444,138 @@ class E8000E(BASEHUAWEI):
         if eIP is None:
             njInfo["errLog"] = "[Forward Error] Please specify a parameter for the eIP."
             return njInfo
-        preIP = re.search('(\d+\.\d+\.\d+\.)(\d+)', sIP)
-        lastIP = re.search('\d+\.\d+\.\d+\.(\d+)', eIP)
-        if not preIP or not lastIP:
+        try:
+            members = IpSet('%s-%s' % (sIP, eIP))
+        except ForwardError:
             njInfo['errLog'] = 'Not correct ip.'
             return njInfo
-        else:
-            preIP = preIP.groups()
-            lastIP = lastIP.groups()
-        multiIP = preIP[0] + '[' + preIP[1] + '_' + lastIP[0] + ']'
+        if self.objectCatalog is not None:
+            return self._catalogObject('address', members)
         cmd = 'display ip address-set address range %s %s type object' % (sIP, eIP)
         result = self.command(cmd=cmd, prompt=prompt)
         if not result['status'] or result['state'] != 'success':
             njInfo['errLog'] = result['errLog']
             return njInfo
-        if multiIP in result['content']:
+        name = self._findAddressSet(result['content'], members)
+        if name is not None:
             njInfo['status'] = True
-            njInfo['content'] = re.findall('Address-set: ([a-z|\_]+%s)' % re.escape(multiIP), result['content'])[0]
+            njInfo['content'] = name
+        return njInfo
+
+    def _findAddressSet(self, content, members):
+        '''Name of the first address-set of a display ip address-set output holding the addresses
+        of members (an IpSet) and no other, None if there is none
+        '''
+        for name, addresses in self._parseAddressSets(content):
+            if addresses == members:
+                return name
+        return None
+
+    def _parseAddressSets(self, content):
+        '''Yield (name, IpSet) of the address-sets of a display ip address-set output, compared as
+        intervals whatever their names. Sets with other items ([ex] a nested set) are skipped:
+            Address-set: addr_10.0.0.[1_5]
+             Item(s):
+              address 0 range 10.0.0.1 10.0.0.5
+              address 1 10.0.0.9 mask 32
+        '''
+        name = None
+        items = []
+        # A None after the lines closes the last set.
+        for line in content.splitlines() + [None]:
+            tmp = None if line is None else re.search(r'Address-set: (\S+)', line)
+            if line is None or tmp:
+                if name is not None and items is not None:
+                    yield name, IpSet(items)
+                name = tmp.group(1) if tmp else None
+                items = []
+                continue
+            tmp = re.search(r'^\s*address \d+ (.*)', line)
+            if not tmp or name is None or items is None:
+                continue
+            item = tmp.group(1).split()
+            try:
+                if item[0] == 'range' and len(item) == 3:
+                    items.append(parseAddress('%s-%s' % (item[1], item[2])))
+                elif len(item) == 3 and item[1] == 'mask':
+                    items.append(parseAddress('%s %s' % (item[0], item[2])))
+                else:
+                    items = None
+            except ForwardError:
+                items = None
+
+    def _parseServiceSets(self, content):
+        '''Yield (name, items) of the service-sets of a display ip service-set output, items is the
+        sorted tuple of (protocol, source start, source end, destination start, destination end):
+            Service-set Name: tcp_any_[80_90]
+              service 0 protocol tcp source-port 0-65535 destination-port 80-90
+        '''
+        name = None
+        items = []
+        for line in content.splitlines() + [None]:
+            tmp = None if line is None else re.search(r'Service-set Name: (\S+)', line)
+            if line is None or tmp:
+                if name is not None and items is not None:
+                    yield name, tuple(sorted(items))
+                name = tmp.group(1) if tmp else None
+                items = []
+                continue
+            if name is None or items is None or not re.search(r'^\s*service \d+ ', line):
+                continue
+            tmp = re.search(r'protocol (\S+) source-port (\d+)(?:-(\d+))? destination-port (\d+)(?:-(\d+))?\s*$', line)
+            if tmp:
+                protocol, sStart, sEnd, dStart, dEnd = tmp.groups()
+                items.append(serviceItem(protocol, sStart, sEnd or sStart, dStart, dEnd or dStart))
+            else:
+                items = None
+
+    def loadObjectCatalog(self):
+        '''Load every address-set and service-set of the firewall at once, indexed by their items.
+        Until the instance is logged out the show*Object() methods answer from the catalog without
+        a device query, and the create*Object() methods add the objects they create.
+        njInfo = {'status': True, 'content': {'address': {IpSet: name}, 'service': {items: name}}}
+        '''
+        njInfo = {
+            'status': False,
+            'content': {},
+            'errLog': ''
+        }
+        prompt = {
+            "success": "[\r\n]+\S+(>|\]) ?$",
+            "error": "Unrecognized command[\s\S]+",
+        }
+        catalog = {'address': {}, 'service': {}}
+        for kind, cmd, parse in [('address', 'display ip address-set verbose all', self._parseAddressSets),
+                                 ('service', 'display ip service-set verbose all', self._parseServiceSets)]:
+            result = self.command(cmd=cmd, prompt=prompt)
+            if not result['status'] or result['state'] != 'success':
+                njInfo['errLog'] = result['errLog']
+                return njInfo
+            for name, key in parse(result['content']):
+                catalog[kind].setdefault(key, name)
+        self.objectCatalog = catalog
+        njInfo['status'] = True
+        njInfo['content'] = catalog
         return njInfo
 
+    def logout(self):
+        self.objectCatalog = None
+        return BASEHUAWEI.logout(self)
+
+    def _addCatalogObject(self, kind, key, name):
+        # A created object goes to the loaded catalog, key() makes its key, an illegal value is left out.
+        if self.objectCatalog is None:
+            return
+        try:
+            self.objectCatalog[kind][key()] = name
+        except (ForwardError, ValueError):
+            pass
+
+    def _catalogObject(self, kind, key):
+        # njInfo of a show*Object() answered by the catalog
+        name = self.objectCatalog[kind].get(key)
+        return {'status': name is not None, 'content': [] if name is None else name, 'errLog': ''}
+
     def showPortObject(self, pType, port):
         '''show port whether defind
         Argv:
@@ -466,14 +599,23 @@ class E8000E(BASEHUAWEI):
         if port is None:
             njInfo["errLog"] = "[Forward Error] Please specify a parameter for the port."
             return njInfo
+        try:
+            items = (serviceItem(pType, 0, 65535, port, port),)
+        except ValueError:
+            njInfo['errLog'] = 'Not correct port.'
+            return njInfo
+        if self.objectCatalog is not None:
+            return self._catalogObject('service', items)
         cmd = 'display ip service-set verbose %s_any_%s item' % (pType, port)
         result = self.command(cmd=cmd, prompt=prompt)
         if not result['status'] or result['state'] != 'success':
             njInfo['errLog'] = result['errLog']
             return njInfo
-        if re.search('protocol %s source-port 0-65535 destination-port %s' % (pType, port), result['conent']):
-            njInfo['status'] = True
-            njInfo['content'] = re.findall('Service-set Name: (.*)\r', result['conent'])[0]
+        for name, services in self._parseServiceSets(result['content']):
+            if services == items:
+                njInfo['status'] = True
+                njInfo['content'] = name
+                break
         return njInfo
 
     def showPortRangeObject(self, pType, pStart, pEnd):
@@ -503,17 +645,23 @@ class E8000E(BASEHUAWEI):
         if pEnd is None:
             njInfo["errLog"] = "[Forward Error] Please specify a parameter for the pEnd."
             return njInfo
+        try:
+            items = (serviceItem(pType, 0, 65535, pStart, pEnd),)
+        except ValueError:
+            njInfo['errLog'] = 'Not correct port.'
+            return njInfo
+        if self.objectCatalog is not None:
+            return self._catalogObject('service', items)
         cmd = 'display ip service-set verbose %s_any_[%s_%s] item' % (pType, pStart, pEnd)
         result = self.command(cmd=cmd, prompt=prompt)
         if not result['status'] or result['state'] != 'success':
             njInfo['errLog'] = result['errLog']
             return njInfo
-        if result == '':
-            return njInfo
-        if re.search('protocol %s source-port 0-65535 destination-port %s-%s' % (pType,
-                                                                                 pStart, pEnd), result['content']):
-            njInfo['status'] = True
-            njInfo['content'] = re.findall('Service-set Name: (.*)\r', result['content'])[0]
+        for name, services in self._parseServiceSets(result['content']):
+            if services == items:
+                njInfo['status'] = True
+                njInfo['content'] = name
+                break
         return njInfo
 
     def showPolicy(self, sZone, dZone, bound, sourceAddress, destAddress, service):
@@ -616,6 +764,7 @@ address-set %s service-set %s' % (sZone, dZone, bound, sourceAddress, destAddres
         if resultIP['status'] and resultMask['status'] and len(result) > 0:
             njInfo['status'] = True
             njInfo['content'] = 'create ip success'
+            self._addCatalogObject('address', lambda: IpSet('%s %s' % (ip, mask)), '%s_%s' % (description, ip))
         return njInfo
 
     def createIpRangeObject(self, startIP, endIP, description):
@@ -675,6 +824,8 @@ address-set %s service-set %s' % (sZone, dZone, bound, sourceAddress, destAddres
         if resultIP['status'] and resultMask['status'] and len(result) > 0:
             njInfo['status'] = True
             njInfo['content'] = 'ip create success'
+            self._addCatalogObject('address', lambda: IpSet('%s-%s' % (startIP, endIP)),
+                                   '%s_%s' % (description, pointIP))
         return njInfo
 
     def createPortObject(self, pType, port):
@@ -719,6 +870,8 @@ address-set %s service-set %s' % (sZone, dZone, bound, sourceAddress, destAddres
         if resultIP['status'] and resultPort['status'] and len(result) > 0:
             njInfo['status'] = True
             njInfo['content'] = 'port create success'
+            self._addCatalogObject('service', lambda: (serviceItem(pType, 0, 65535, port, port),),
+                                   '%s_any_%s' % (pType, port))
         return njInfo
 
     def createPortRangeObject(self, pType, portStart, portEnd):
@@ -769,6 +922,8 @@ address-set %s service-set %s' % (sZone, dZone, bound, sourceAddress, destAddres
         if resultIP['status'] and resultPort['status'] and len(result) > 0:
             njInfo['status'] = True
             njInfo['content'] = 'port create success'
+            self._addCatalogObject('service', lambda: (serviceItem(pType, 0, 65535, portStart, portEnd),),
+                                   '%s_any_[%s_%s]' % (pType, portStart, portEnd))
         return njInfo
 
     def createSecurityPolicy(self, sZone, dZone, srcAddress, descAddress, portService, description):
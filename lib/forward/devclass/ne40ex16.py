@@ -21,6 +21,7 @@
 import re
 from forward.devclass.baseHuawei import BASEHUAWEI
 from forward.utils.sshv2 import sshv2
+from forward.utils.patterns import compilePattern
 
 
 class NE40EX16(BASEHUAWEI):
@@ -41,9 +42,11 @@ class NE40EX16(BASEHUAWEI):
             if self.isConfigMode:
                 self._exitConfigMode()
                 # exit config mode
+                # Sent past command(), the mode tracker forgets the prompt until the next getPrompt().
                 self.shell.send('%s\n' % (saveCommand))
+                self.modeTracker.observe('')
                 # save setup to system
-                while not re.search(self.prompt, data['content'].split('\n')[-1]):
+                while not compilePattern(self.prompt).search(data['content'].split('\n')[-1]):
                     data['content'] += self.shell.recv(1024).decode()
                     # When prompted, reply Y,Search range at last line
                     if re.search(re.escape('Are you sure to continue?[Y/N]'), data['content'].split('\n')[-1]):
@@ -79,7 +82,7 @@ class NE40EX16(BASEHUAWEI):
                 # resize virtual console window size to 10000*10000
                 self.shell = self.channel.invoke_shell(width=1000, height=1000)
                 tmpBuffer = ''
-                while not re.search(self.basePrompt, tmpBuffer.split('\n')[-1]):
+                while not compilePattern(self.basePrompt).search(tmpBuffer.split('\n')[-1]):
                     tmpBuffer += self.shell.recv(1024).decode()
                     # When prompted, reply N
                     if re.search('\[Y/N\]:', tmpBuffer):
@@ -90,6 +93,8 @@ class NE40EX16(BASEHUAWEI):
                 self.isLogin = True
                 # Get host prompt.
                 self.getPrompt()
+                self.modeTracker.setHostname(self.modeTracker.prompt)
+                self.sessionInit()
                 njInfo["status"] = True
             except Exception as e:
                 njInfo['status'] = False
@@ -20,6 +20,7 @@
 """
 from forward.devclass.baseFenghuo import BASEFENGHUO
 from forward.utils.forwardError import ForwardError
+from forward.utils.patterns import compilePattern
 import re
 
 
@@ -80,9 +81,11 @@ t link-type (access|trunk)[\s\S]*port .* vlan .*{vlan}".format(vlan=vlan, port=p
             # else ,successed
             # switch to port mode
             info["content"] = ""
+            # Sent past command(), the mode tracker forgets the prompt until the next getPrompt().
             self.shell.send("interface gigaethernet {port}\n".format(port=port))
+            self.modeTracker.observe('')
             # Host prompt is modified
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # release host prompt
             self.getPrompt()
@@ -107,8 +110,9 @@ t link-type (access|trunk)[\s\S]*port .* vlan .*{vlan}".format(vlan=vlan, port=p
                 raise ForwardError(tmp["errLog"])
             # quit port mode
             self.shell.send("quit\n")
+            self.modeTracker.observe('')
             info["content"] = ""
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             self.getPrompt()
             # save configuration
@@ -185,8 +189,9 @@ t link-type (access|trunk)[\s\S]*port .* vlan .*{vlan}".format(vlan=vlan, port=p
             # else ,successed
             # switch to port mode
             self.shell.send("interface eth-trunk {port}\n".format(port=port))
+            self.modeTracker.observe('')
             # Host prompt is modified
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # release host prompt
             self.getPrompt()
@@ -204,8 +209,9 @@ t link-type (access|trunk)[\s\S]*port .* vlan .*{vlan}".format(vlan=vlan, port=p
                                         result is [%s] ' % tmp["content"])
             # quit port mode
             self.shell.send("quit\n")
+            self.modeTracker.observe('')
             info["content"] = ""
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # save configuration
             self.getPrompt()
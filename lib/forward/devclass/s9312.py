@@ -21,6 +21,7 @@
 """
 from forward.devclass.baseHuawei import BASEHUAWEI
 from forward.utils.forwardError import ForwardError
+from forward.utils.patterns import compilePattern
 import re
 
 
@@ -71,8 +72,10 @@ class S9312(BASEHUAWEI):
         try:
             # enter vlan
             info["content"] = ""
+            # Sent past command(), the mode tracker forgets the prompt until the next getPrompt().
             self.shell.send("vlan {vlan}\n".format(vlan=vlan))
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            self.modeTracker.observe('')
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # Get host prompt
             self.getPrompt()
@@ -82,7 +85,8 @@ class S9312(BASEHUAWEI):
             info["content"] = ""
             # Send command.
             self.shell.send("name {ascription}\n".format(ascription=ascription))
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            self.modeTracker.observe('')
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # Get host prompt.
             self.getPrompt()
@@ -177,7 +181,8 @@ class S9312(BASEHUAWEI):
             info["content"] = ""
             # Send command.
             self.shell.send("interface Eth-Trunk {port}\n".format(port=port))
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            self.modeTracker.observe('')
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # Get new host prompt.
             self.getPrompt()
@@ -188,7 +193,8 @@ Eth-Trunk {port} [{info}]".format(port=port, info=info["content"]))
             # set vlan
             info["content"] = ""
             self.shell.send("{cmd}\n".format(cmd=cmd))
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            self.modeTracker.observe('')
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # Get new host prompt.
             self.getPrompt()
@@ -254,7 +260,8 @@ Eth-Trunk {port} [{info}]".format(port=port, info=info["content"]))
             info["content"] = ""
             # Send command.
             self.shell.send("interface Vlanif {vlan}\n".format(vlan=vlan))
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            self.modeTracker.observe('')
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode()
             # Get new host prompt.
             self.getPrompt()
@@ -263,7 +270,8 @@ Eth-Trunk {port} [{info}]".format(port=port, info=info["content"]))
             # set ascription
             info["content"] = ""
             self.shell.send("description {ascription}\n".format(ascription=ascription))
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            self.modeTracker.observe('')
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode
             # Get new host prompt.
             self.getPrompt()
@@ -271,7 +279,8 @@ Eth-Trunk {port} [{info}]".format(port=port, info=info["content"]))
             info["content"] = ""
             # Send command.
             self.shell.send("ip address {ip} 255.255.255.0\n".format(ip=ip))
-            while not re.search(self.basePrompt, info['content'].split('\n')[-1]):
+            self.modeTracker.observe('')
+            while not compilePattern(self.basePrompt).search(info['content'].split('\n')[-1]):
                 info['content'] += self.shell.recv(1024).decode
             # Check
             if re.search("Error: The specified IP address is invalid", info["content"]):
@@ -24,6 +24,7 @@ Author: wangzhe
 
 import re
 from forward.devclass.baseBrocade import BASEBROCADE
+from forward.utils.patterns import compilePattern
 
 
 class VLB(BASEBROCADE):
@@ -47,7 +48,9 @@ class VLB(BASEBROCADE):
         self.cleanBuffer()
         # Login status check.
         if self.isLogin:
+            # Sent past command(), the mode tracker forgets the prompt until the next getPrompt().
             self.shell.send(cmd)
+            self.modeTracker.observe('')
             try:
                 while not re.search(zcliPrompt, result["content"]):
                     result['content'] += self.shell.recv(1024).decode
@@ -81,10 +84,11 @@ class VLB(BASEBROCADE):
         if self.isLogin:
             if self.isZcliMode:
                 self.shell.send(cmd)
+                self.modeTracker.observe('')
                 # Restore the host prompt
                 self.prompt = self.oldPrompt
                 try:
-                    while not re.search(self.prompt, result["content"]):
+                    while not compilePattern(self.prompt).search(result["content"]):
                         result['content'] += self.shell.recv(1024).decode
                     # The switch mode status is False
                     self.isZcliMode = False
@@ -22,6 +22,7 @@
 """
 import re
 from forward.devclass.bclinux7 import BCLINUX7
+from forward.utils.patterns import compilePattern
 
 
 class VYOSLINUX(BCLINUX7):
@@ -58,7 +59,7 @@ class VYOSLINUX(BCLINUX7):
                             character1_4=re.escape('\x1b[m\r\n\x1b[m\r\n \x1b[m\r\n\r\x1b[K\x1b[?1l\x1b>'),
                             character2=self.prompt)
             try:
-                while not re.search(self.prompt, result['content'].split('\n')[-1]):
+                while not compilePattern(self.prompt).search(result['content'].split('\n')[-1]):
                     # Get more.
                     self.getMore(result['content'])
                     # Get result.
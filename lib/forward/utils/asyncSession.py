@@ -0,0 +1,375 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] asyncio session engine, alongside BASESSHV2/BASETELNET.
+One event loop drives many device sessions: reads never block a thread, only the
+SSH key exchange and the shell request run in an executor. Requires Python 3.5+.
+
+    ASYNCSSHV2 / ASYNCTELNET: async login/execute/command/logout, same njInfo results
+    AsyncDevice: thin adapter running an existing devclass instance (BASECISCO,
+                 BASEHUAWEI, ...) unchanged, one method call at a time, in an executor
+    gatherBounded: run many coroutines with a concurrency cap
+"""
+
+import re
+import codecs
+import asyncio
+import functools
+from collections import OrderedDict
+from forward.utils.sshv2 import sshv2
+from forward.utils.patterns import compilePattern
+from forward.utils.recvBuffer import RecvBuffer
+from forward.utils.promptMatcher import PromptMatcher
+from forward.utils.sanitizer import SSHV2_SANITIZER, Sanitizer
+from forward.utils.forwardError import ForwardError
+
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SGA, NAWS = 1, 3, 31
+
+
+class ASYNCBASE(object):
+    """Common prompt and More handling of the async sessions,
+    subclass provides _open/_send/_recv/_close.
+    """
+    def __init__(self, ip, username, password, **kwargs):
+        self.ip = ip
+        self.username = username
+        self.password = password
+
+        self.port = kwargs['port'] if 'port' in kwargs else self.defaultPort
+        self.timeout = kwargs['timeout'] if 'timeout' in kwargs else 30
+        self.privilegePw = kwargs['privilegePw'] if 'privilegePw' in kwargs else ''
+        self.executor = kwargs['executor'] if 'executor' in kwargs else None
+
+        self.isLogin = False
+        self.basePrompt = r"(>|#|\]|\$) *$"
+        self.prompt = ''
+        self.moreFlag = r'(< *)?(\-)+( |\()?[Mm]ore.*(\)| )?(\-)+( *>)?|\(Q to quit\)'
+        # Vendor More markers first, any other More marker last.
+        self.sanitizer = Sanitizer(SSHV2_SANITIZER.rules + [(self.moreFlag, "")])
+        self.mode = 1
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def _decode(self, data):
+        return self._decoder.decode(data)
+
+    async def _readUntil(self, patterns, timeout, getMore=True):
+        # Receive until one of the patterns matches, return (index, data).
+        # Only the new data is scanned, as in the command() loop of BASESSHV2.
+        buff = RecvBuffer()
+        matcher = PromptMatcher(OrderedDict(enumerate(patterns)), self.moreFlag, self.basePrompt)
+        moreFlag = compilePattern(self.moreFlag)
+        while True:
+            chunk = await asyncio.wait_for(self._recv(), timeout)
+            if not chunk:
+                raise ForwardError('[Receive Error]: %s: connection closed [%s]' % (self.ip, buff.getvalue()))
+            buff.feed(chunk)
+            index = matcher.feed(chunk)
+            if getMore and moreFlag.search(buff.tail):
+                await self._send(' ')
+                continue
+            if index is not None:
+                return index, buff.getvalue()
+
+    async def getPrompt(self):
+        """Automatically get the current system prompt by sending a carriage return
+        """
+        if not self.isLogin:
+            raise ForwardError('[Get Prompt Error]: %s: Not login yet.' % self.ip)
+        await self._send('\n')
+        index, data = await self._readUntil([self.basePrompt], self.timeout)
+        self.prompt = data.split('\n')[-1]
+        if re.search("> ?$", self.prompt):
+            self.mode = 1
+        elif re.search(r"(#|\]) ?$", self.prompt):
+            self.mode = 2
+        self.prompt = re.escape(self.prompt)
+        return self.prompt
+
+    async def login(self):
+        """Login method.
+        Creates a login session for the program to send commands to the target device.
+        """
+        result = {
+            'status': False,
+            'errLog': ''
+        }
+        try:
+            await self._open()
+            self.isLogin = True
+            await self.getPrompt()
+            result['status'] = True
+        except Exception as e:
+            self.isLogin = False
+            result['errLog'] = str(e) or e.__class__.__name__
+        return result
+
+    async def logout(self):
+        """Logout method
+        A session used to log out of a target device
+        """
+        result = {
+            'status': False,
+            'errLog': ''
+        }
+        try:
+            await self._close()
+            self.isLogin = False
+            result['status'] = True
+        except Exception as e:
+            result['errLog'] = str(e)
+        return result
+
+    async def execute(self, cmd):
+        """execute a command line, only suitable for the scene when
+        the prompt is equal before and after execution
+        """
+        result = {
+            'status': False,
+            'content': '',
+            'errLog': ''
+        }
+        if not self.isLogin:
+            result['errLog'] = '[Execute Error]: device not login'
+            return result
+        try:
+            await self._send(cmd + '\r')
+            index, data = await self._readUntil([self.prompt + '$'], self.timeout)
+            tmp = re.search(r'[\r\n]+([\s\S]*)[\r\n]+(\x1b\[m)?' + self.prompt, data)
+            if tmp is None:
+                raise ForwardError('not found host prompt')
+            result['content'] = self.sanitizer.sanitize(tmp.group(1))
+            result['status'] = True
+        except asyncio.TimeoutError:
+            result['errLog'] = '[Execute Error]: %s: receive timeout' % self.ip
+        except Exception as e:
+            result['errLog'] = str(e)
+        return result
+
+    async def command(self, cmd=None, prompt=None, timeout=30):
+        """execute a command line, powerful and suitable for any scene,
+        but need to define whole prompt dict list
+        """
+        result = {
+            'status': False,
+            'content': '',
+            'errLog': '',
+            "state": None
+        }
+        if self.isLogin is False:
+            result['errLog'] = '[Execute Error]: device not login.'
+            return result
+        parameterFormat = {
+            "success": "regular-expression-success",
+            "error": "regular-expression-error"
+        }
+        if (cmd is None) or (not isinstance(prompt, dict)) or (not isinstance(timeout, int)):
+            raise ForwardError("You should given a parameter for prompt such as: %s" % (str(parameterFormat)))
+        keys = list(prompt.keys())
+        try:
+            await self._send("{cmd}\r".format(cmd=cmd))
+            index, data = await self._readUntil([prompt[key] for key in keys], timeout)
+        except asyncio.TimeoutError:
+            result["errLog"] = "Forward had recived data timeout."
+            return result
+        except Exception as e:
+            result["errLog"] = str(e)
+            return result
+        result["state"] = keys[index]
+        result["content"] = self.sanitizer.sanitize(data)
+        result["status"] = True
+        return result
+
+
+class ASYNCSSHV2(ASYNCBASE):
+    """asyncio sshv2 session, by using paramiko module.
+    The key exchange and the shell request run in an executor, the shell channel is read from the event loop.
+    """
+    defaultPort = 22
+
+    def __init__(self, ip, username, password, **kwargs):
+        super(ASYNCSSHV2, self).__init__(ip, username, password, **kwargs)
+        self._channel = None
+        self.shell = None
+
+    async def _open(self):
+        loop = asyncio.get_event_loop()
+        sshChannel = await loop.run_in_executor(
+            self.executor,
+            functools.partial(sshv2, self.ip, self.username, self.password, self.timeout, self.port)
+        )
+        if not sshChannel['status']:
+            raise ForwardError(sshChannel['errLog'])
+        self._channel = sshChannel['content']
+        # resize virtual console window size to 10000*10000, the channel request waits for the server
+        self.shell = await loop.run_in_executor(
+            self.executor, functools.partial(self._channel.invoke_shell, width=10000, height=10000)
+        )
+        index, data = await self._readUntil(
+            [self.basePrompt, '(?i)(new +password)|(password.*change)'], self.timeout
+        )
+        if index == 1:
+            raise ForwardError('[Login Error]: %s: Password expired, needed to be updated!' % self.ip)
+
+    async def _send(self, data):
+        self.shell.sendall(data)
+
+    async def _recv(self):
+        # Wait on the channel pipe instead of blocking in recv().
+        loop = asyncio.get_event_loop()
+        while True:
+            if self.shell.recv_ready():
+                return self._decode(self.shell.recv(65535))
+            if self.shell.closed or self.shell.eof_received:
+                return ''
+            waiter = loop.create_future()
+            fd = self.shell.fileno()
+            loop.add_reader(fd, lambda: waiter.done() or waiter.set_result(None))
+            try:
+                await waiter
+            finally:
+                loop.remove_reader(fd)
+
+    async def _close(self):
+        if self._channel is not None:
+            self._channel.close()
+
+
+class ASYNCTELNET(ASYNCBASE):
+    """asyncio telnet session, by using asyncio streams.
+    Telnet options are refused except ECHO/SGA, window size is set to 10000*10000 (RFC1073).
+    """
+    defaultPort = 23
+
+    def __init__(self, ip, username, password, **kwargs):
+        super(ASYNCTELNET, self).__init__(ip, username, password, **kwargs)
+        self.reader = None
+        self.writer = None
+        self._iacBuffer = b''
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.ip, self.port), self.timeout
+        )
+        await self._readUntil([r"Username|login"], self.timeout, getMore=False)
+        await self._send('%s\n' % self.username)
+        await self._readUntil([r"assword"], self.timeout, getMore=False)
+        await self._send('%s\n' % self.password)
+        index, data = await self._readUntil([r"Login incorrect|assword", self.basePrompt], self.timeout, False)
+        if index == 0:
+            raise ForwardError('Username or Password wrong')
+
+    async def _send(self, data):
+        self.writer.write(data.encode('utf-8').replace(b'\xff', b'\xff\xff'))
+        await self.writer.drain()
+
+    def _negotiate(self, data):
+        # Strip telnet commands from data and answer the option negotiations.
+        data = self._iacBuffer + data
+        self._iacBuffer = b''
+        text = bytearray()
+        reply = bytearray()
+        i = 0
+        while i < len(data):
+            byte = data[i]
+            if byte != IAC:
+                text.append(byte)
+                i += 1
+                continue
+            if i + 1 >= len(data):
+                self._iacBuffer = data[i:]
+                break
+            verb = data[i + 1]
+            if verb == IAC:
+                text.append(IAC)
+                i += 2
+            elif verb in (DO, DONT, WILL, WONT):
+                if i + 2 >= len(data):
+                    self._iacBuffer = data[i:]
+                    break
+                option = data[i + 2]
+                if verb == DO and option == NAWS:
+                    reply += bytearray([IAC, WILL, NAWS, IAC, SB, NAWS, 39, 16, 39, 16, IAC, SE])
+                elif verb == DO:
+                    reply += bytearray([IAC, WONT, option])
+                elif verb == WILL:
+                    reply += bytearray([IAC, DO if option in (ECHO, SGA) else DONT, option])
+                i += 3
+            elif verb == SB:
+                end = data.find(bytes(bytearray([IAC, SE])), i)
+                if end == -1:
+                    self._iacBuffer = data[i:]
+                    break
+                i = end + 2
+            else:
+                i += 2
+        if reply:
+            self.writer.write(bytes(reply))
+        return bytes(text)
+
+    async def _recv(self):
+        while True:
+            data = await self.reader.read(65536)
+            if not data:
+                return ''
+            text = self._negotiate(data)
+            if text:
+                return self._decode(text)
+
+    async def _close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class AsyncDevice(object):
+    """Thin asyncio adapter for an existing devclass instance.
+    Every method becomes a coroutine running in an executor, calls on the same
+    device are serialized, so the vendor classes run unchanged:
+
+        device = AsyncDevice(S9312(ip, username, password))
+        await device.login()
+        version = await device.showVersion()
+    """
+    def __init__(self, instance, executor=None):
+        self.instance = instance
+        self.executor = executor
+        self._lock = None
+
+    def __getattr__(self, name):
+        attr = getattr(self.instance, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(self.executor, functools.partial(attr, *args, **kwargs))
+        return call
+
+
+async def gatherBounded(coros, limit=100):
+    """Run coroutines with at most `limit` of them at the same time,
+    return their results in the given order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+    return await asyncio.gather(*[bounded(coro) for coro in coros])
@@ -0,0 +1,86 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] CLI mode of a session, from the prompt the device last printed.
+Every command(), execute() and getPrompt() gives its output to the ModeTracker of
+the instance, which keeps the last line. mode() matches it against the mode prompts
+of the vendor, written with the host name of the login prompt: 1 general, 2 privilege,
+3 config, None for any other view ([ex] an interface view) or an unknown prompt.
+privilegeMode()/generalMode()/configMode() send nothing when the device is already
+in the mode, and switch as before when the mode is None. The host name is set once at
+login; a vendor method sending on the shell itself calls observe('') after the send.
+
+    tracker = ModeTracker(HUAWEI_MODES)
+    tracker.setHostname('<HUAWEI>')
+    tracker.observe('system-view\\r\\n[HUAWEI]')
+    tracker.mode()      # 2
+"""
+
+import re
+
+# (mode, pattern), the first matching wins, {hostname} is the escaped host name.
+CISCO_MODES = [(3, r'{hostname}\(config\)# ?$'), (2, r'{hostname}# ?$'), (1, r'{hostname}> ?$')]
+HUAWEI_MODES = [(2, r'\[{hostname}\] ?$'), (1, r'<{hostname}> ?$')]
+FORTINET_MODES = [(3, r'{hostname} \(\S+\) # ?$'), (2, r'{hostname} # ?$')]
+JUNIPER_MODES = [(3, r'{hostname}# ?$'), (1, r'{hostname}> ?$')]
+BAER_MODES = [(3, r'{hostname}>config# ?$'), (2, r'{hostname}# ?$')]
+
+# The host name starts the prompt or follows a non name character, [ex] not 'R1' in 'SR1#'.
+BOUNDARY = r'(?<![\w.-])'
+
+
+def hostnameOf(prompt):
+    """'<HUAWEI>' -> 'HUAWEI', 'R1#' -> 'R1', 'FGT # ' -> 'FGT'
+    """
+    return prompt.strip().rstrip('>#]$ ').lstrip('<[').strip()
+
+
+class ModeTracker(object):
+    def __init__(self, modes=()):
+        """
+        - parameter modes: [(mode, pattern)], no tracking if empty
+        """
+        self.modes = list(modes)
+        self.hostname = None
+        # Last line of the last output, '' if unknown
+        self.prompt = ''
+        self._patterns = []
+        # Host prompt at the start of an output line, [ex] '[HUAWEI-vlan10]' of '[HUAWEI-vlan10]description x'
+        self.linePrompt = None
+
+    def setHostname(self, prompt):
+        """Take the host name from the login prompt, the prompt is observed too
+        """
+        self.hostname = hostnameOf(prompt)
+        name = BOUNDARY + re.escape(self.hostname)
+        self._patterns = [(mode, re.compile(pattern.replace('{hostname}', name))) for mode, pattern in self.modes]
+        self.linePrompt = re.compile(r'[<\[]?%s(?:[^\s<>#\]]*| \([^)]*\))\s?[>#\]] ?' % re.escape(self.hostname))
+        self.observe(prompt)
+
+    def observe(self, output):
+        """Keep the last line of an output, '' after a failure
+        """
+        output = output or ''
+        self.prompt = output[output.rfind('\n') + 1:].strip()
+
+    def mode(self):
+        if not self.prompt:
+            return None
+        for mode, pattern in self._patterns:
+            if pattern.search(self.prompt):
+                return mode
+        return None
@@ -0,0 +1,197 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Columnar results of the inventory methods.
+The list of dicts of showInterface/showVlan/showRoute becomes one array of codes
+per field and one list of distinct values per field (dictionary encoding): the
+same 'up', 'Vlanif10' or 'full' of 10000 switches is stored once, a row costs 4
+bytes per field. A missing field is ''. Lists, [ex] the interfaces of a vlan, are
+kept as tuples.
+
+    table = toColumns(dev.showInterface())['content']
+    table.column('lineState')                  # ['up', 'down', ...]
+    routes = ColumnTable(Route._fields)
+    routes.extend(dev.showRouteStream())       # no dict per route
+    fleet = collectColumns(forward.runFleet('showVlan'))['content']   # with a 'deviceIp' column
+"""
+
+from array import array
+from forward.utils.ipRange import TYPECODE
+from forward.utils.forwardError import ForwardError
+
+
+class ColumnTable(object):
+    def __init__(self, fields=()):
+        """
+        - parameter fields: names of the columns, more are added by the rows given as dicts
+        """
+        self.fields = []
+        # field -> array of codes, field -> distinct values, values[field][0] is ''
+        self.codes = {}
+        self.values = {}
+        self._index = {}
+        self.size = 0
+        for field in fields:
+            self.addField(field)
+
+    def addField(self, field):
+        if field in self.codes:
+            return
+        self.fields.append(field)
+        self.values[field] = ['']
+        self._index[field] = {'': 0}
+        self.codes[field] = array(TYPECODE, [0]) * self.size
+
+    def encode(self, field, value):
+        """Return the code of a value in a field, the value is added on first use
+        """
+        if isinstance(value, list):
+            value = tuple(value)
+        index = self._index[field]
+        try:
+            code = index.get(value)
+        except TypeError:
+            # Unhashable, [ex] a dict, kept as its string.
+            value = str(value)
+            code = index.get(value)
+        if code is None:
+            code = len(self.values[field])
+            self.values[field].append(value)
+            index[value] = code
+        return code
+
+    def append(self, row):
+        """Add a row, a dict or a sequence in the order of the fields
+        """
+        if isinstance(row, dict):
+            for field in row:
+                if field not in self.codes:
+                    self.addField(field)
+            for field in self.fields:
+                self.codes[field].append(self.encode(field, row.get(field, '')))
+        else:
+            if len(row) != len(self.fields):
+                raise ForwardError('[Columnar Error]: %d values for %d fields' % (len(row), len(self.fields)))
+            for field, value in zip(self.fields, row):
+                self.codes[field].append(self.encode(field, value))
+        self.size += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def appendTable(self, table, key=None, keyField='deviceIp'):
+        """Add the rows of another table, its codes are mapped once per distinct value.
+        - parameter key: value of the keyField column for these rows, [ex] the ip of the device
+        """
+        if key is not None:
+            if keyField in table.codes:
+                raise ForwardError('[Columnar Error]: the rows already have a field %s' % keyField)
+            self.addField(keyField)
+            self.codes[keyField].extend(array(TYPECODE, [self.encode(keyField, key)]) * table.size)
+        for field in table.fields:
+            self.addField(field)
+            mapping = [self.encode(field, value) for value in table.values[field]]
+            self.codes[field].extend(array(TYPECODE, [mapping[code] for code in table.codes[field]]))
+        for field in self.fields:
+            if field in table.codes or (key is not None and field == keyField):
+                continue
+            # Missing in these rows.
+            self.codes[field].extend(array(TYPECODE, [0]) * table.size)
+        self.size += table.size
+
+    def column(self, field):
+        """Return the values of a field, one per row
+        """
+        values = self.values[field]
+        return [values[code] for code in self.codes[field]]
+
+    def columns(self):
+        return dict((field, self.column(field)) for field in self.fields)
+
+    def row(self, index):
+        return tuple(self.values[field][self.codes[field][index]] for field in self.fields)
+
+    def rows(self):
+        """Yield the rows as tuples in the order of the fields
+        """
+        columns = [self.column(field) for field in self.fields]
+        for row in zip(*columns):
+            yield row
+
+    def write(self, output):
+        """Write a header and the rows as tab separated lines, tuples joined by ',', return the number of rows
+        - parameter output: path of the file (overwritten) or a file-like object
+        """
+        if hasattr(output, 'write'):
+            stream, close = output, False
+        else:
+            stream, close = open(output, 'w'), True
+        try:
+            stream.write('\t'.join(self.fields) + '\n')
+            for row in self.rows():
+                stream.write('\t'.join(','.join(str(x) for x in value) if isinstance(value, tuple) else str(value)
+                                       for value in row) + '\n')
+        finally:
+            if close:
+                stream.close()
+        return self.size
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return 'ColumnTable(%d rows, fields %s)' % (self.size, ', '.join(self.fields))
+
+
+def toColumns(njInfo, fields=()):
+    """Return the njInfo of an inventory method with its list of dicts as a ColumnTable
+    """
+    table = ColumnTable(fields)
+    if njInfo['status']:
+        table.extend(njInfo['content'])
+    return {'status': njInfo['status'], 'content': table, 'errLog': njInfo['errLog']}
+
+
+def concat(tables, keys=None, keyField='deviceIp'):
+    """Concatenate tables, with a keyField column of keys[i] for the rows of tables[i] if keys are given
+    """
+    result = ColumnTable()
+    for i, table in enumerate(tables):
+        result.appendTable(table, None if keys is None else keys[i], keyField)
+    return result
+
+
+def collectColumns(results, fields=(), keyField='deviceIp'):
+    """Build one table of the (ip, njInfo) results of a fleet, [ex] Forward.runFleet('showInterface'),
+    the dicts of a device are encoded and dropped as soon as it is finished.
+    The errors of the failed devices are in errLog, their rows are missing.
+    """
+    njInfo = {
+        'status': True,
+        'content': ColumnTable(),
+        'errLog': ''
+    }
+    for ip, result in results:
+        if not result['status']:
+            njInfo['status'] = False
+            njInfo['errLog'] += '[%s]: %s ' % (ip, result['errLog'])
+            continue
+        table = ColumnTable(fields)
+        table.extend(result['content'])
+        njInfo['content'].appendTable(table, ip, keyField)
+    return njInfo
@@ -0,0 +1,547 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Simulated network devices, for tests and benchmarks without real equipment.
+FakeSSHServer (paramiko server, shell and exec requests) and FakeTelnetServer listen on
+127.0.0.1 and emulate a vendor CLI from PROFILES: host prompts, mode changes (enable,
+config t, system-view, ...), the More pager and its erase sequence, the no-paging
+commands and canned outputs. latency delays every answer, outputSize is the size of
+the running configuration. paramiko is imported by the first FakeSSHServer only.
+
+    server = FakeSSHServer('huawei', username='admin', password='admin', latency=0.01)
+    port = server.start()
+    dev = S9312('127.0.0.1', 'admin', 'admin', port=port)
+    ...
+    server.stop()
+"""
+
+import re
+import time
+import socket
+import threading
+from forward.utils.forwardError import ForwardError
+
+CISCO_VERSION = '''Cisco IOS Software, C3750E Software (C3750E-UNIVERSALK9-M), Version 15.0(2)SE5, RELEASE SOFTWARE (fc1)
+Technical Support: http://www.cisco.com/techsupport
+ROM: Bootstrap program is C3750E boot loader
+{hostname} uptime is 3 years, 12 weeks, 4 days, 2 hours, 10 minutes
+System returned to ROM by power-on
+System image file is "flash:c3750e-universalk9-mz.150-2.SE5.bin"'''
+
+HUAWEI_VERSION = '''Huawei Versatile Routing Platform Software
+VRP (R) software, Version 5.170 (S9300 V200R010C00SPC600)
+Copyright (C) 2000-2016 HUAWEI TECH CO., LTD
+HUAWEI S9312 Terminal uptime is 120 days, 3 hours, 23 minutes'''
+
+H3C_VERSION = '''H3C Comware Software, Version 7.1.064, Release 9141P16
+Copyright (c) 2004-2017 New H3C Technologies Co., Ltd. All rights reserved.
+H3C S12508X-AF uptime is 0 weeks, 3 days, 6 hours, 58 minutes'''
+
+H3C_OBJECT_GROUPS = '''Ip address object group web: 3 objects(in use)
+ 0 network host address 10.0.0.1
+ 10 network range 10.0.0.2 10.0.0.5
+ 20 network host address 10.0.0.9
+Ip address object group db: 1 object(out of use)
+ 0 network subnet 10.1.0.0 255.255.255.0
+Ip address object group nested: 2 objects(out of use)
+ 0 network host address 10.0.0.1
+ 10 network group-object web
+Ip address object group web-copy: 2 objects(out of use)
+ 0 network range 10.0.0.1 10.0.0.5
+ 10 network host address 10.0.0.9'''
+
+
+def table(header, rows):
+    # Output of a table command, header lines then rows.
+    return '\r\n'.join(list(header) + list(rows))
+
+
+# Vendor CLI emulations.
+#   prompts: host prompt of every mode, start: mode after login
+#   modes: [(command regex, from modes, to mode, output)], a None from means any mode
+#   more/erase: pager marker, and what the device prints over it after a space
+#   noPaging: commands disabling the pager, error: answer to an unknown command
+#   configModes: modes accepting any command silently, but the rejected ones answered with the error
+#   outputs: {command regex: output}, config: commands answered with the running configuration
+#   routes: commands answered with the routing table
+PROFILES = {
+    'cisco': {
+        'hostname': 'R1',
+        'prompts': {'general': '{hostname}>', 'privilege': '{hostname}#', 'config': '{hostname}(config)#'},
+        'start': 'general',
+        'modes': [
+            (r'en(able)?$', ('general',), 'privilege', ''),
+            (r'conf(ig(ure)?)? t(erm(inal)?)?$', ('privilege',), 'config',
+             'Enter configuration commands, one per line.  End with CNTL/Z.'),
+            (r'end$', ('config',), 'privilege', ''),
+            (r'exit$', ('config',), 'privilege', ''),
+            (r'disable$', ('privilege',), 'general', ''),
+        ],
+        'more': ' --More-- ',
+        'erase': '\x08' * 10 + ' ' * 10 + '\x08' * 10,
+        'noPaging': [r'terminal length 0$', r'terminal pager 0$'],
+        'error': "% Invalid input detected at '^' marker.",
+        'configModes': ('config',),
+        'rejected': [r'invalid\b'],
+        'outputs': {
+            r'show ver(sion)?$': CISCO_VERSION,
+            r'show clock$': '*10:20:30.123 UTC Mon Oct 19 2026',
+            r'show ntp status$': 'Clock is synchronized, stratum 3, reference is 10.0.0.1',
+            r'show snmp$': 'Chassis: FOC1234X0AB\r\n0 SNMP packets input',
+            r'show conn$': '1024 in use, 8192 most used',
+            r'show vlan( brief)?$': table(['VLAN Name                             Status    Ports',
+                                           '---- -------------------------------- --------- -------'],
+                                          ['%-4d VLAN%04d                         active' % (i, i)
+                                           for i in range(1, 101)]),
+            r'show ip int(erface)? br(ief)?$': table(
+                ['Interface              IP-Address      OK? Method Status                Protocol'],
+                ['GigabitEthernet1/0/%-4d unassigned      YES unset  up                    up' % i
+                 for i in range(1, 49)]),
+            r'copy running-config +startup-config$': 'Building configuration...\r\n[OK]\r\nCopy complete',
+            r'write( memory)?$': 'Building configuration...\r\n[OK]',
+        },
+        'config': [r'show run(ning-config)?$'],
+    },
+    'huawei': {
+        'hostname': 'HUAWEI',
+        'prompts': {'general': '<{hostname}>', 'privilege': '[{hostname}]', 'vlan': '[{hostname}-vlan10]'},
+        'start': 'general',
+        'modes': [
+            (r'sys(tem-view)?$', ('general',), 'privilege', 'Enter system view, return user view with Ctrl+Z.'),
+            (r'return$', None, 'general', ''),
+            (r'quit$', ('privilege',), 'general', ''),
+            (r'vlan 10$', ('privilege',), 'vlan', ''),
+            (r'quit$', ('vlan',), 'privilege', ''),
+        ],
+        'more': '  ---- More ----',
+        'erase': '\x1b[42D' + ' ' * 42 + '\x1b[42D',
+        'noPaging': [r'screen-length 0 temporary$'],
+        'error': "Error: Unrecognized command found at '^' position.",
+        'configModes': ('privilege',),
+        'rejected': [r'invalid\b'],
+        'outputs': {
+            r'dis(play)? ver(sion)?$': HUAWEI_VERSION,
+            r'dis(play)? clock$': '2026-10-19 10:20:30\r\nMonday\r\nTime Zone(Beijing) : UTC+08:00',
+            r'dis(play)? vlan$': table(['The total number of vlans is : 100', 'VID  Type    Ports'],
+                                       ['%-4d common  UT:GE0/0/%d(U)' % (i, i) for i in range(1, 101)]),
+            r'dis(play)? ip int(erface)? br(ief)?$': table(
+                ['Interface                         IP Address/Mask      Physical   Protocol'],
+                ['GigabitEthernet0/0/%-4d           unassigned           up         down' % i
+                 for i in range(1, 49)]),
+        },
+        'config': [r'dis(play)? cur(rent-configuration)?$'],
+        'routes': [r'dis(play)? ip rou(ting-table)?$'],
+    },
+    'h3c': {
+        'hostname': 'H3C',
+        'prompts': {'general': '<{hostname}>', 'privilege': '[{hostname}]'},
+        'start': 'general',
+        'modes': [
+            (r'sys(tem-view)?$', ('general',), 'privilege', 'System View: return to User View with Ctrl+Z.'),
+            (r'return$', None, 'general', ''),
+            (r'quit$', ('privilege',), 'general', ''),
+        ],
+        'more': '  ---- More ----',
+        'erase': '\x1b[42D' + ' ' * 42 + '\x1b[42D',
+        'noPaging': [r'screen-length disable$'],
+        'error': "% Unrecognized command found at '^' position.",
+        'configModes': ('privilege',),
+        'outputs': {
+            r'dis(play)? ver(sion)?$': H3C_VERSION,
+            r'dis(play)? clock$': '10:20:30 UTC Mon 10/19/2026',
+            r'dis(play)? object-group ip address$': H3C_OBJECT_GROUPS,
+        },
+        'config': [r'dis(play)? cur(rent-configuration)?$'],
+    },
+    'linux': {
+        'hostname': 'host',
+        'prompts': {'general': '[admin@{hostname} ~]$'},
+        'start': 'general',
+        'modes': [],
+        'more': '',
+        'erase': '',
+        'noPaging': [],
+        'error': '-bash: command not found',
+        'configModes': (),
+        'outputs': {
+            r'uptime$': ' 10:20:30 up 120 days,  3:23,  1 user,  load average: 0.00, 0.01, 0.05',
+            r'hostname$': 'host',
+        },
+        'config': [r'cat /etc/.*'],
+    },
+}
+
+DEFAULT_PAGE_LINES = 24
+
+
+def runningConfig(size):
+    # Generated running configuration of about `size` bytes.
+    lines = []
+    total = 0
+    while total < size:
+        i = len(lines) // 3
+        for line in ('interface GigabitEthernet0/0/%d' % i, ' description uplink-%d' % i, '#'):
+            lines.append(line)
+            total += len(line) + 2
+    return '\r\n'.join(lines)
+
+
+def routingTable(size):
+    # Generated VRP routing table of about `size` bytes, every 4th prefix has a second next hop.
+    lines = ['Route Flags: R - relay, D - download to fib',
+             '------------------------------------------------------------------------------',
+             'Routing Tables: Public',
+             'Destination/Mask    Proto   Pre  Cost      Flags NextHop         Interface',
+             '']
+    total = sum(len(line) + 2 for line in lines)
+    i = 0
+    while total < size:
+        net = '10.%d.%d.0/24' % (i >> 8 & 0xff, i & 0xff)
+        line = '%18s  Static  60   %-8d  RD  10.255.0.1      Vlanif10' % (net, i % 10)
+        lines.append(line)
+        total += len(line) + 2
+        if i % 4 == 0:
+            line = '%18s  Static  60   %-8d  RD  10.255.1.1      Vlanif20' % ('', i % 10)
+            lines.append(line)
+            total += len(line) + 2
+        i += 1
+    return '\r\n'.join(lines)
+
+
+class DeviceSession(object):
+    """CLI state of one session, independent of the transport."""
+    def __init__(self, profile, outputSize=64 * 1024, pageLines=DEFAULT_PAGE_LINES):
+        if profile not in PROFILES:
+            raise ForwardError('[Fake Device Error]: unknown profile %s' % profile)
+        self.profile = PROFILES[profile]
+        self.mode = self.profile['start']
+        self.paging = bool(self.profile['more'])
+        self.pageLines = pageLines
+        self.outputSize = outputSize
+        self.commands = 0
+
+    def prompt(self):
+        return self.profile['prompts'][self.mode].format(hostname=self.profile['hostname'])
+
+    def output(self, line):
+        """Return the output of a command line, without echo and prompt
+        """
+        self.commands += 1
+        cmd = ' '.join(line.split())
+        if not cmd:
+            return ''
+        for pattern in self.profile['noPaging']:
+            if re.match(pattern, cmd):
+                self.paging = False
+                return ''
+        for pattern, fromModes, toMode, text in self.profile['modes']:
+            if re.match(pattern, cmd) and (fromModes is None or self.mode in fromModes):
+                self.mode = toMode
+                return text
+        for pattern in self.profile['config']:
+            if re.match(pattern, cmd):
+                return runningConfig(self.outputSize)
+        for pattern in self.profile.get('routes', ()):
+            if re.match(pattern, cmd):
+                return routingTable(self.outputSize)
+        for pattern, text in self.profile['outputs'].items():
+            if re.match(pattern, cmd):
+                return text.format(hostname=self.profile['hostname']).replace('\r\n', '\n').replace('\n', '\r\n')
+        if self.mode in self.profile['configModes']:
+            if any(re.match(pattern, cmd) for pattern in self.profile.get('rejected', ())):
+                return self.profile['error']
+            # Configuration commands are accepted silently.
+            return ''
+        return self.profile['error']
+
+    def pages(self, text):
+        """Split an output in pages of pageLines lines, every page but the last ends with the More marker
+        """
+        lines = text.split('\r\n') if text else []
+        if not self.paging or len(lines) <= self.pageLines:
+            return [text]
+        return ['\r\n'.join(lines[i:i + self.pageLines]) for i in range(0, len(lines), self.pageLines)]
+
+
+class LineReader(object):
+    """Read command lines from a transport, '\\r', '\\n' and '\\r\\n' end a line."""
+    def __init__(self, recv):
+        self.recv = recv
+        self.buffer = ''
+
+    def _fill(self):
+        data = self.recv()
+        if not data:
+            raise EOFError()
+        if not isinstance(data, str):
+            data = data.decode('utf-8', 'replace')
+        self.buffer += data
+
+    def readChar(self):
+        while not self.buffer:
+            self._fill()
+        char, self.buffer = self.buffer[0], self.buffer[1:]
+        return char
+
+    def readLine(self):
+        line = ''
+        while True:
+            char = self.readChar()
+            if char == '\r' and self.buffer.startswith('\n'):
+                # '\r\n' received together is one end of line.
+                self.buffer = self.buffer[1:]
+            if char in '\r\n':
+                return line
+            line += char
+
+
+def serveShell(session, reader, send, latency=0):
+    """Interactive CLI loop: echo, output page by page, host prompt
+    """
+    send('Info: fake device of Forward\r\n' + session.prompt())
+    while True:
+        line = reader.readLine()
+        send(line + '\r\n')
+        if latency:
+            time.sleep(latency)
+        if line.strip() in ('logout', 'exit') and session.mode == session.profile['start']:
+            return
+        output = session.output(line)
+        pages = session.pages(output)
+        for i, page in enumerate(pages):
+            if i > 0:
+                # Wait for the key after the More marker.
+                key = reader.readChar()
+                if key in 'qQ':
+                    break
+                send(session.profile['erase'])
+            send(page)
+            if i < len(pages) - 1:
+                send('\r\n' + session.profile['more'])
+        send(('\r\n' if output else '') + session.prompt())
+
+
+_shellServerInterface = None
+
+
+def shellServerInterface(server):
+    """paramiko server interface of a FakeSSHServer. paramiko is imported on the first SSH
+    server only, the telnet and SOAP emulations do not need it.
+    """
+    global _shellServerInterface
+    if _shellServerInterface is None:
+        import paramiko
+
+        class ShellServerInterface(paramiko.ServerInterface):
+            def __init__(self, server):
+                self.server = server
+                self.shell = threading.Event()
+                self.command = None
+
+            def check_auth_password(self, username, password):
+                if (username, password) == (self.server.username, self.server.password):
+                    return paramiko.AUTH_SUCCESSFUL
+                return paramiko.AUTH_FAILED
+
+            def get_allowed_auths(self, username):
+                return 'password'
+
+            def check_channel_request(self, kind, chanid):
+                if kind == 'session':
+                    return paramiko.OPEN_SUCCEEDED
+                return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+            def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+                return True
+
+            def check_channel_shell_request(self, channel):
+                threading.Thread(target=self.server.serveChannel, args=(channel, None)).start()
+                return True
+
+            def check_channel_exec_request(self, channel, command):
+                if not isinstance(command, str):
+                    command = command.decode('utf-8', 'replace')
+                threading.Thread(target=self.server.serveChannel, args=(channel, command)).start()
+                return True
+
+        _shellServerInterface = ShellServerInterface
+    return _shellServerInterface(server)
+
+
+class FakeServer(object):
+    def __init__(self, profile='cisco', username='admin', password='admin', host='127.0.0.1', port=0,
+                 latency=0, outputSize=64 * 1024, pageLines=DEFAULT_PAGE_LINES):
+        """
+        - parameter profile: key of PROFILES
+        - parameter latency: seconds before every answer
+        - parameter outputSize: bytes of the running configuration
+        """
+        if profile not in PROFILES:
+            raise ForwardError('[Fake Device Error]: unknown profile %s' % profile)
+        self.profile = profile
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.outputSize = outputSize
+        self.pageLines = pageLines
+        self.sock = None
+        self.sessions = 0
+        self.running = False
+
+    def newSession(self):
+        self.sessions += 1
+        return DeviceSession(self.profile, outputSize=self.outputSize, pageLines=self.pageLines)
+
+    def start(self):
+        """Listen and accept in a background thread, return the port
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(1024)
+        self.port = self.sock.getsockname()[1]
+        self.running = True
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+        return self.port
+
+    def _accept(self):
+        while self.running:
+            try:
+                client, address = self.sock.accept()
+            except Exception:
+                break
+            # The echo, output and prompt are sent apart, as an ssh daemon no Nagle delay between them.
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            thread = threading.Thread(target=self.handle, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        self.running = False
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+    def handle(self, client):
+        raise NotImplementedError()
+
+
+_hostKey = None
+_hostKeyLock = threading.Lock()
+
+
+def getHostKey():
+    # Generated once per process, the generation takes a while.
+    global _hostKey
+    with _hostKeyLock:
+        if _hostKey is None:
+            import paramiko
+            _hostKey = paramiko.RSAKey.generate(2048)
+        return _hostKey
+
+
+class FakeSSHServer(FakeServer):
+    def handle(self, client):
+        import paramiko
+        transport = paramiko.Transport(client)
+        transport.add_server_key(getHostKey())
+        try:
+            transport.start_server(server=shellServerInterface(self))
+        except Exception:
+            transport.close()
+
+    def serveChannel(self, channel, command):
+        try:
+            session = self.newSession()
+            if command is not None:
+                # exec request: output only, then EOF
+                if self.latency:
+                    time.sleep(self.latency)
+                session.paging = False
+                channel.sendall(session.output(command))
+                channel.send_exit_status(0)
+                channel.shutdown_write()
+                # Closed by the client once it has read up to EOF.
+                channel.settimeout(30)
+                while channel.recv(1024):
+                    pass
+                return
+            reader = LineReader(lambda: channel.recv(1024))
+            serveShell(session, reader, channel.sendall, self.latency)
+        except Exception:
+            pass
+        finally:
+            channel.close()
+
+
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+
+
+class FakeTelnetServer(FakeServer):
+    def handle(self, client):
+        state = {'command': False, 'option': False, 'sb': False}
+
+        def recv():
+            # Drop the telnet negotiation (IAC ...) from the input.
+            text = bytearray()
+            while not text:
+                data = bytearray(client.recv(1024))
+                if not data:
+                    return ''
+                for byte in data:
+                    if state['command']:
+                        # Byte after IAC: WILL/WONT/DO/DONT are followed by an option.
+                        state['command'] = False
+                        if byte == SB:
+                            state['sb'] = True
+                        elif byte in (WILL, WONT, DO, DONT):
+                            state['option'] = True
+                        elif byte == IAC:
+                            text.append(byte)
+                    elif state['option']:
+                        state['option'] = False
+                    elif state['sb']:
+                        state['sb'] = byte != SE
+                    elif byte == IAC:
+                        state['command'] = True
+                    else:
+                        text.append(byte)
+            return bytes(text).decode('utf-8', 'replace')
+
+        def send(data):
+            client.sendall(data.encode('utf-8'))
+
+        try:
+            reader = LineReader(recv)
+            send('\r\nUsername:')
+            username = reader.readLine()
+            send('\r\nPassword:')
+            password = reader.readLine()
+            if (username, password) != (self.username, self.password):
+                send('\r\nLogin incorrect\r\n')
+                return
+            send('\r\n')
+            serveShell(self.newSession(), reader, send, self.latency)
+        except Exception:
+            pass
+        finally:
+            client.close()
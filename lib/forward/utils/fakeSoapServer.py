@@ -0,0 +1,260 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Simulated web-service firewall, for tests and benchmarks of BASEDEPP.
+FakeSoapServer listens on 127.0.0.1 over HTTP/1.1 keep-alive, serves a document/literal
+WSDL for every web service of DEPP_SERVICES and accepts their operations with Basic
+authentication. The calls are recorded as (operation, parameters), a fault code can be
+set per operation, latency delays every answer.
+
+    server = FakeSoapServer(username='admin', password='admin', latency=0.01)
+    server.start()
+    dev = BASEDEPP('127.0.0.1', 'admin', 'admin', soapBase=server.base)
+    dev.createIPObject('web', '10.0.0.1')
+    server.calls        # [('addAddrObj', {'name': 'web', 'ip': '10.0.0.1'})]
+    server.stop()
+"""
+
+import time
+import base64
+import threading
+import xml.etree.ElementTree as ET
+from six.moves import BaseHTTPServer, socketserver
+from forward.utils.forwardError import ForwardError
+
+# Items of the policy and SNAT objects.
+OBJECTS = ('type', 'name')
+SERVER_OBJECT = ('name', 'protocol', 'sourcePortRange', 'destinationPortRange', 'vsysName')
+STATIC_NAT = ('vsysName', 'name', 'interface', 'globalAddress', 'enable', 'localAddress')
+SNAT = ('vsysName', 'name', 'interface', 'addressPool', ('sourceIpObjects', OBJECTS),
+        ('destinationIpObjects', OBJECTS), ('serverObjects', OBJECTS), 'enable')
+POLICY = ('name', 'vsysName', 'position', 'enabled', 'action', 'sourceSecurityZone', 'destinationSecurityZone',
+          ('sourceIpObjects', OBJECTS), ('destinationIpObjects', OBJECTS), ('serverObjects', OBJECTS))
+
+# WSDL path: (service, {operation: fields}), a field is a name or (name, fields) for a list of items.
+DEPP_SERVICES = {
+    '/func/web_main/wsdl/netaddr/netaddr.wsdl': ('netaddr', {
+        'addAddrObj': ('name', 'ip'),
+        'modAddrObj': ('oldname', 'name', 'ip'),
+        'delAddrObj': ('name',),
+    }),
+    '/func/web_main/wsdl/netservice/netservice.wsdl': ('netservice', dict(
+        (operation, (('p', SERVER_OBJECT),))
+        for operation in ('createServerObject', 'updateServerObject', 'deleteServerObject'))),
+    '/func/web_main/wsdl/nat/NatManager.wsdl': ('NatManager', dict(
+        [(operation, (('p', STATIC_NAT),))
+         for operation in ('createStaticNat', 'updateStaticNat', 'deleteStaticNat', 'createDnat', 'deleteDnat')],
+        createSnat=(('p', SNAT),), deleteSnat=(('p', SNAT),))),
+    '/func/web_main/wsdl/pf_policy/pf_policy/pf_policy.wsdl': ('pf_policy', dict(
+        (operation, (('p', POLICY),))
+        for operation in ('createSecurityPolicy', 'updateSecurityPolicy', 'deleteSecurityPolicy'))),
+}
+
+NAMESPACE = 'http://forward.fake/%s'
+SOAP_ENVELOPE = 'http://schemas.xmlsoap.org/soap/envelope/'
+
+
+def schemaFields(fields):
+    elements = []
+    for field in fields:
+        if isinstance(field, tuple):
+            name, items = field
+            elements.append('<xsd:element name="%s" minOccurs="0" maxOccurs="unbounded"><xsd:complexType>'
+                            '<xsd:sequence>%s</xsd:sequence></xsd:complexType></xsd:element>'
+                            % (name, schemaFields(items)))
+        else:
+            elements.append('<xsd:element name="%s" type="xsd:string" minOccurs="0"/>' % field)
+    return ''.join(elements)
+
+
+def buildWsdl(service, operations, location):
+    """Document/literal wrapped WSDL of a service, its operations answer an empty result
+    """
+    types, messages, portType, binding = [], [], [], []
+    for operation in sorted(operations):
+        types.append('<xsd:element name="%s"><xsd:complexType><xsd:sequence>%s</xsd:sequence></xsd:complexType>'
+                     '</xsd:element>' % (operation, schemaFields(operations[operation])))
+        types.append('<xsd:element name="%sResponse"><xsd:complexType><xsd:sequence>'
+                     '<xsd:element name="result" type="xsd:string" minOccurs="0"/></xsd:sequence>'
+                     '</xsd:complexType></xsd:element>' % operation)
+        messages.append('<message name="%sRequest"><part name="parameters" element="tns:%s"/></message>'
+                        '<message name="%sResponse"><part name="parameters" element="tns:%sResponse"/></message>'
+                        % (operation, operation, operation, operation))
+        portType.append('<operation name="%s"><input message="tns:%sRequest"/><output message="tns:%sResponse"/>'
+                        '</operation>' % (operation, operation, operation))
+        binding.append('<operation name="%s"><soap:operation soapAction="%s"/><input><soap:body use="literal"/>'
+                       '</input><output><soap:body use="literal"/></output></operation>' % (operation, operation))
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<definitions name="{service}" targetNamespace="{tns}" xmlns="http://schemas.xmlsoap.org/wsdl/" '
+            'xmlns:tns="{tns}" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/" '
+            'xmlns:xsd="http://www.w3.org/2001/XMLSchema">'
+            '<types><xsd:schema targetNamespace="{tns}" elementFormDefault="qualified">{types}</xsd:schema></types>'
+            '{messages}<portType name="{service}PortType">{portType}</portType>'
+            '<binding name="{service}Binding" type="tns:{service}PortType">'
+            '<soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>{binding}</binding>'
+            '<service name="{service}"><port name="{service}Port" binding="tns:{service}Binding">'
+            '<soap:address location="{location}"/></port></service></definitions>').format(
+                service=service, tns=NAMESPACE % service, types=''.join(types), messages=''.join(messages),
+                portType=''.join(portType), binding=''.join(binding), location=location)
+
+
+def elementValue(element):
+    # Text of a leaf, dict of the children, lists for the repeated ones.
+    children = list(element)
+    if not children:
+        return element.text or ''
+    value = {}
+    for child in children:
+        name = child.tag.split('}')[-1]
+        item = elementValue(child)
+        if name in value:
+            if not isinstance(value[name], list):
+                value[name] = [value[name]]
+            value[name].append(item)
+        else:
+            value[name] = item
+    return value
+
+
+class SoapHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are written apart, no delayed ACK wait on a kept connection.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # A kept connection idle for idleTimeout seconds is closed, as a web server does.
+        self.timeout = self.server.fake.idleTimeout
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.fake.connected()
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body, contentType='text/xml; charset=utf-8', headers=()):
+        fake = self.server.fake
+        if fake.latency:
+            time.sleep(fake.latency)
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', contentType)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def authorized(self):
+        fake = self.server.fake
+        credentials = base64.b64encode(('%s:%s' % (fake.username, fake.password)).encode('utf-8')).decode('ascii')
+        if self.headers.get('Authorization') == 'Basic %s' % credentials:
+            return True
+        self.reply(401, 'Unauthorized', 'text/plain', [('WWW-Authenticate', 'Basic realm="depp"')])
+        return False
+
+    def do_GET(self):
+        fake = self.server.fake
+        path = self.path.split('?')[0]
+        if path not in DEPP_SERVICES:
+            self.reply(404, 'Not Found', 'text/plain')
+            return
+        if not self.authorized():
+            return
+        fake.wsdlRequests += 1
+        service, operations = DEPP_SERVICES[path]
+        location = 'http://%s%s' % (self.headers.get('Host', '%s:%d' % (fake.host, fake.port)), path[:-len('.wsdl')])
+        self.reply(200, buildWsdl(service, operations, location))
+
+    def do_POST(self):
+        fake = self.server.fake
+        data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self.authorized():
+            return
+        try:
+            body = ET.fromstring(data).find('{%s}Body' % SOAP_ENVELOPE)
+            request = list(body)[0]
+        except (ET.ParseError, AttributeError, IndexError):
+            self.reply(400, 'Bad Request', 'text/plain')
+            return
+        operation = request.tag.split('}')[-1]
+        params = elementValue(request)
+        with fake.lock:
+            fake.calls.append((operation, params if isinstance(params, dict) else {}))
+        code = fake.faults.get(operation)
+        if code is not None:
+            self.reply(500, '<soap:Envelope xmlns:soap="%s"><soap:Body><soap:Fault><faultcode>soap:Server</faultcode>'
+                            '<faultstring>%s</faultstring></soap:Fault></soap:Body></soap:Envelope>'
+                       % (SOAP_ENVELOPE, code))
+            return
+        namespace = request.tag[1:].split('}')[0]
+        self.reply(200, '<soap:Envelope xmlns:soap="%s"><soap:Body><ns:%sResponse xmlns:ns="%s"><ns:result>0'
+                        '</ns:result></ns:%sResponse></soap:Body></soap:Envelope>'
+                   % (SOAP_ENVELOPE, operation, namespace, operation))
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeSoapServer(object):
+    def __init__(self, username='admin', password='admin', host='127.0.0.1', port=0, latency=0, idleTimeout=None):
+        """
+        - parameter latency: seconds before every answer
+        - parameter idleTimeout: seconds a kept connection waits for the next request, None for ever
+        """
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.idleTimeout = idleTimeout
+        # operation -> fault code answered, [ex] {'addAddrObj': 506}
+        self.faults = {}
+        self.calls = []
+        self.connections = 0
+        self.wsdlRequests = 0
+        self.lock = threading.Lock()
+        self.httpd = None
+
+    @property
+    def base(self):
+        """Base url of the web services, [ex] the soapBase of BASEDEPP
+        """
+        return 'http://%s:%d' % (self.host, self.port)
+
+    def connected(self):
+        with self.lock:
+            self.connections += 1
+
+    def start(self):
+        """Listen and serve in a background thread, return the port
+        """
+        if self.httpd is not None:
+            raise ForwardError('[Fake Soap Error]: server already started')
+        self.httpd = ThreadingHTTPServer((self.host, self.port), SoapHandler)
+        self.httpd.fake = self
+        self.port = self.httpd.server_address[1]
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self.port
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
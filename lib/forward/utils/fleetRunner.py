@@ -0,0 +1,63 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][Forward] Fleet runner, run one method across many instances with bounded
+parallelism and yield every device result as soon as that device is finished.
+
+    for ip, result in FleetRunner(timeout=60).imap(instances, 'showVersion'):
+        # result: {'status': True, 'content': 'V200R003C00', 'errLog': ''}
+"""
+
+from forward.utils.loginScheduler import LoginScheduler
+
+
+def callMethod(instance, method, *args, **kwargs):
+    # method is a method name of the instance, or a callable receiving the instance first
+    if callable(method):
+        result = method(instance, *args, **kwargs)
+    else:
+        result = getattr(instance, method)(*args, **kwargs)
+    if isinstance(result, dict) and 'status' in result:
+        return result
+    # Wrap foreign return values into the njInfo format.
+    return {'status': True, 'content': result, 'errLog': ''}
+
+
+class FleetRunner(object):
+    """Run a method or callable across instances.
+
+    - parameter scheduler: LoginScheduler instance, carries the concurrency limits
+    - parameter timeout: per-device timeout in seconds, None means wait forever
+    """
+    def __init__(self, scheduler=None, timeout=None):
+        self.scheduler = scheduler or LoginScheduler()
+        self.timeout = timeout
+
+    def imap(self, instances, method, *args, **kwargs):
+        """Yield (ip, {status, content, errLog}) in completion order.
+        """
+        for instance, result in self.scheduler.imap(instances,
+                                                    task=callMethod,
+                                                    args=(method,) + args,
+                                                    kwargs=kwargs,
+                                                    timeout=self.timeout):
+            yield instance.ip, result
+
+    def run(self, instances, method, *args, **kwargs):
+        """Wait for all devices, return {ip: {status, content, errLog}}
+        """
+        return dict(self.imap(instances, method, *args, **kwargs))
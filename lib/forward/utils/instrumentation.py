@@ -0,0 +1,177 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Instrumentation of the login and command hot paths.
+The device classes emit one event (a flat dict) per login and per command/execute;
+events go to the sinks added to the Instrumentation, nothing is built without sink.
+
+    login:   {'event': 'login', 'ip', 'model', 'status', 'reused',
+              'connect', 'auth', 'shell', 'prompt', 'init', 'total'}       (seconds)
+    command: {'event': 'command', 'ip', 'model', 'method', 'cmd', 'state',
+              'bytes', 'recvs', 'pages', 'regexTime', 'wallTime'}
+
+cmd is the command line with everything after a password/secret keyword masked, see
+redactCommand(); the stats of MemorySink are by method, not by command line.
+
+    sink = MemorySink()
+    getInstrumentation().addSink(sink)
+    ... run the collection ...
+    sink.top('wallTime')    # [(('command', 'S9312', 'pushConfig'), {...}), ...]
+"""
+
+import json
+import socket
+import threading
+from forward.utils.patterns import COMMAND_SECRET
+
+# Fields sent as timers by StatsdSink, the other numbers are counters.
+TIMING_FIELDS = ('connect', 'auth', 'shell', 'prompt', 'init', 'total', 'regexTime', 'wallTime')
+
+
+def redactCommand(cmd):
+    """'local-user admin password cipher Abc123' -> 'local-user admin password ***'
+    """
+    if not cmd:
+        return cmd
+    return COMMAND_SECRET.sub(r'\1 ***', cmd)
+
+
+class MemorySink(object):
+    def __init__(self, keepEvents=False):
+        """Aggregate count/sum/max of the numeric fields by (event, model, method),
+        a bounded set of keys whatever the command lines
+        - parameter keepEvents: also keep every event in self.events
+        """
+        self.keepEvents = keepEvents
+        self.events = []
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def handle(self, event):
+        key = (event['event'], event.get('model'), event.get('method'))
+        with self.lock:
+            if self.keepEvents:
+                self.events.append(event)
+            stats = self.stats.setdefault(key, {'count': 0})
+            stats['count'] += 1
+            for field, value in event.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                if field not in stats:
+                    stats[field] = {'sum': 0, 'max': value}
+                stats[field]['sum'] += value
+                stats[field]['max'] = max(stats[field]['max'], value)
+
+    def top(self, field='wallTime', n=10):
+        """Return the n keys with the biggest sum of a field, [ex] the methods taking the most time
+        """
+        with self.lock:
+            items = [(key, stats) for key, stats in self.stats.items() if field in stats]
+        items.sort(key=lambda item: item[1][field]['sum'], reverse=True)
+        return items[:n]
+
+    def reset(self):
+        with self.lock:
+            self.events = []
+            self.stats = {}
+
+
+class JSONLinesSink(object):
+    def __init__(self, output):
+        """Write every event as a JSON line
+        - parameter output: path of the file (appended) or a file-like object
+        """
+        if hasattr(output, 'write'):
+            self.output = output
+            self.ownOutput = False
+        else:
+            self.output = open(output, 'a')
+            self.ownOutput = True
+        self.lock = threading.Lock()
+
+    def handle(self, event):
+        line = json.dumps(event, sort_keys=True) + '\n'
+        with self.lock:
+            self.output.write(line)
+            self.output.flush()
+
+    def close(self):
+        if self.ownOutput:
+            self.output.close()
+
+
+class StatsdSink(object):
+    def __init__(self, host='127.0.0.1', port=8125, prefix='forward'):
+        """Send the numeric fields in the StatsD line protocol over UDP,
+        [ex] forward.command.S9312.wallTime:231.5|ms, forward.command.S9312.bytes:65536|c
+        """
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def handle(self, event):
+        name = '%s.%s.%s' % (self.prefix, event['event'], str(event.get('model')).replace('.', '_'))
+        lines = []
+        for field, value in sorted(event.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if field in TIMING_FIELDS:
+                lines.append('%s.%s:%.3f|ms' % (name, field, value * 1000))
+            else:
+                lines.append('%s.%s:%d|c' % (name, field, value))
+        if lines:
+            try:
+                self.socket.sendto('\n'.join(lines).encode('utf-8'), self.address)
+            except socket.error:
+                # Nobody listening, metrics are best effort.
+                pass
+
+    def close(self):
+        self.socket.close()
+
+
+class Instrumentation(object):
+    def __init__(self):
+        self.sinks = []
+        self.lock = threading.Lock()
+
+    def addSink(self, sink):
+        with self.lock:
+            self.sinks = self.sinks + [sink]
+        return sink
+
+    def removeSink(self, sink):
+        with self.lock:
+            self.sinks = [s for s in self.sinks if s is not sink]
+
+    def emit(self, event):
+        """Send an event to every sink, a failing sink never breaks the session
+        """
+        for sink in self.sinks:
+            try:
+                sink.handle(event)
+            except Exception:
+                pass
+
+
+_defaultInstrumentation = Instrumentation()
+
+
+def getInstrumentation():
+    """Return the process-wide instrumentation, used by the device classes by default
+    """
+    return _defaultInstrumentation
@@ -0,0 +1,289 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Compact IP ranges.
+'x.x.x.x', 'x.x.x.x-y.y.y.y' and 'x.x.x.x/n' are kept as integer intervals, in the
+order given, minus the excluded ranges. The addresses ending in .0 are skipped, as
+DEVICELIST always did. Nothing is expanded until asked: len() and `in` work on the
+intervals, iteration makes the strings one /24 block at a time, toArray() gives the
+addresses as a 4-byte integer array.
+
+    ranges = IpRanges(['10.0.0.0/12'], exclude=['10.1.0.0-10.1.255.255'])
+    len(ranges)            # 1040384
+    '10.2.3.4' in ranges   # True
+    for ip in ranges: ...
+
+IpSet is the set form, for comparing address groups: sorted, merged intervals
+of all the addresses (.0 included), compared, hashed and tested in O(intervals).
+
+    IpSet(['10.0.0.1-10.0.0.6']) == IpSet(['10.0.0.1', '10.0.0.2-10.0.0.6'])   # True
+    IpSet(['10.0.0.0/24']) >= IpSet(['10.0.0.5-10.0.0.9'])                      # True
+"""
+
+import six
+import bisect
+from array import array
+from forward.utils.forwardError import ForwardError
+
+# Decimal strings of the last octet, the strings of a /24 block are prefix + OCTETS[i].
+OCTETS = [str(i) for i in range(256)]
+# Unsigned array type of at least 32 bits.
+TYPECODE = 'I' if array('I').itemsize >= 4 else 'L'
+
+
+def ipToNum(ip):
+    # '1.2.3.4' -> 16909060
+    try:
+        octets = [int(x) for x in ip.strip().split('.')]
+        if len(octets) != 4 or not all(0 <= x <= 255 for x in octets):
+            raise ValueError(ip)
+    except (ValueError, AttributeError):
+        raise ForwardError('[IP Range Error]: illegal ip address %s' % ip)
+    return octets[0] << 24 | octets[1] << 16 | octets[2] << 8 | octets[3]
+
+
+def numToIp(num):
+    # 16909060 -> '1.2.3.4'
+    return '%d.%d.%d.%d' % (num >> 24, num >> 16 & 0xff, num >> 8 & 0xff, num & 0xff)
+
+
+def parseRange(text):
+    """'x.x.x.x', 'x.x.x.x-y.y.y.y' or 'x.x.x.x/n' -> (start, end), end < start for an empty range
+    """
+    if '/' in text:
+        ip, _, prefix = text.partition('/')
+        try:
+            prefix = int(prefix)
+            if not 0 <= prefix <= 32:
+                raise ValueError(prefix)
+        except ValueError:
+            raise ForwardError('[IP Range Error]: illegal prefix length %s' % text)
+        size = 1 << (32 - prefix)
+        start = ipToNum(ip) & ~(size - 1) & 0xffffffff
+        return start, start + size - 1
+    bounds = text.split('-')
+    return ipToNum(bounds[0]), ipToNum(bounds[-1])
+
+
+def countHosts(start, end):
+    # Addresses of [start, end] without the .0 ones.
+    if end < start:
+        return 0
+    return end - start + 1 - (end // 256 - (start - 1) // 256)
+
+
+def blocks(start, end):
+    """Yield the strings of [start, end] as one list per /24 block
+    """
+    num = start
+    while num <= end:
+        block = num >> 8
+        last = min(end, block << 8 | 0xff)
+        prefix = '%d.%d.%d.' % (block >> 16, block >> 8 & 0xff, block & 0xff)
+        yield [prefix + octet for octet in OCTETS[(num & 0xff) or 1:(last & 0xff) + 1]]
+        num = last + 1
+
+
+def subtract(start, end, excluded):
+    # [start, end] minus the sorted, merged intervals of excluded.
+    pieces = []
+    for low, high in excluded:
+        if high < start:
+            continue
+        if low > end:
+            break
+        if low > start:
+            pieces.append((start, low - 1))
+        start = max(start, high + 1)
+        if start > end:
+            return pieces
+    pieces.append((start, end))
+    return pieces
+
+
+def merge(intervals):
+    # Sorted intervals, overlapping and adjacent ones joined.
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class IpRanges(object):
+    def __init__(self, items=(), exclude=()):
+        """
+        - parameter items: ip, ip range or CIDR strings, [ex] ['1.1.1.1', '2.2.2.2-2.2.3.4', '3.3.0.0/16']
+        - parameter exclude: ranges removed from the items, same format
+        """
+        if isinstance(items, six.string_types):
+            items = [items]
+        if isinstance(exclude, six.string_types):
+            exclude = [exclude]
+        self.excluded = merge(parseRange(item) for item in exclude)
+        # [(start, end)] in the order of the items
+        self.intervals = []
+        self.size = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        start, end = parseRange(item)
+        if end < start:
+            return
+        for piece in subtract(start, end, self.excluded):
+            self.intervals.append(piece)
+            self.size += countHosts(*piece)
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    __nonzero__ = __bool__
+
+    def __contains__(self, ip):
+        num = ipToNum(ip)
+        if not num & 0xff:
+            return False
+        return any(start <= num <= end for start, end in self.intervals)
+
+    def __iter__(self):
+        for start, end in self.intervals:
+            for block in blocks(start, end):
+                for ip in block:
+                    yield ip
+
+    def numbers(self):
+        """Yield the addresses as integers
+        """
+        for start, end in self.intervals:
+            for num in range(start, end + 1):
+                if num & 0xff:
+                    yield num
+
+    def toArray(self):
+        """Return the addresses as an array of 4-byte integers
+        """
+        result = array(TYPECODE)
+        for start, end in self.intervals:
+            num = start
+            while num <= end:
+                last = min(end, num | 0xff)
+                result.extend(range(num if num & 0xff else num + 1, last + 1))
+                num = last + 1
+        return result
+
+    def strings(self):
+        """Return all the addresses as strings, built by /24 blocks
+        """
+        result = []
+        for start, end in self.intervals:
+            for block in blocks(start, end):
+                result.extend(block)
+        return result
+
+
+def parseAddress(text):
+    """parseRange(), and 'x.x.x.x y.y.y.y' or 'x.x.x.x n' for an address and its mask
+    """
+    parts = text.split()
+    if len(parts) != 2:
+        return parseRange(text)
+    if parts[1].isdigit():
+        return parseRange('%s/%s' % tuple(parts))
+    mask = ipToNum(parts[1])
+    start = ipToNum(parts[0]) & mask
+    return start, start | (~mask & 0xffffffff)
+
+
+class IpSet(object):
+    """Immutable set of IPv4 addresses as sorted, merged (start, end) intervals
+    """
+    __slots__ = ('intervals', '_starts')
+
+    def __init__(self, items=()):
+        """
+        - parameter items: strings of parseAddress() or (start, end) integer intervals
+        """
+        if isinstance(items, six.string_types):
+            items = [items]
+        self.intervals = tuple(merge(parseAddress(item) if isinstance(item, six.string_types) else tuple(item)
+                                     for item in items))
+        if any(end < start for start, end in self.intervals):
+            self.intervals = tuple((start, end) for start, end in self.intervals if start <= end)
+        self._starts = None
+
+    def __len__(self):
+        return sum(end - start + 1 for start, end in self.intervals)
+
+    def __bool__(self):
+        return bool(self.intervals)
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        return isinstance(other, IpSet) and self.intervals == other.intervals
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.intervals)
+
+    def __contains__(self, ip):
+        """An address, as a string or an integer
+        """
+        num = ipToNum(ip) if isinstance(ip, six.string_types) else ip
+        if self._starts is None:
+            self._starts = [start for start, _ in self.intervals]
+        i = bisect.bisect_right(self._starts, num) - 1
+        return i >= 0 and num <= self.intervals[i][1]
+
+    def issubset(self, other):
+        """Every address of self is in other, one pass over both interval lists
+        """
+        intervals = other.intervals
+        i = 0
+        for start, end in self.intervals:
+            while i < len(intervals) and intervals[i][1] < start:
+                i += 1
+            if i == len(intervals) or not intervals[i][0] <= start <= end <= intervals[i][1]:
+                return False
+        return True
+
+    def __le__(self, other):
+        return self.issubset(other)
+
+    def __ge__(self, other):
+        return other.issubset(self)
+
+    def __or__(self, other):
+        return IpSet(self.intervals + other.intervals)
+
+    def ranges(self):
+        """Return the intervals as 'x.x.x.x' or 'x.x.x.x-y.y.y.y' strings
+        """
+        return [numToIp(start) if start == end else '%s-%s' % (numToIp(start), numToIp(end))
+                for start, end in self.intervals]
+
+    def __repr__(self):
+        return 'IpSet(%r)' % self.ranges()
@@ -0,0 +1,189 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][Forward] Bounded login scheduler, used for the initialize multithread step.
+Instances are queued and handled by a fixed number of worker threads, optionally
+limited per vendor and per subnet, so large inventories log in at a steady rate.
+"""
+
+import time
+import threading
+from collections import deque
+from six.moves import queue
+from forward.utils.forwardError import ForwardError
+from forward.utils.loginThread import loginThread
+from forward.utils.parse import ip_to_num
+
+DEFAULT_MAX_WORKERS = 64
+
+# Protocol classes are not vendors, skip them when looking for a vendor base class.
+TRANSPORT_CLASSES = frozenset(['BASESSHV1', 'BASESSHV2', 'BASETELNET'])
+
+
+def getVendor(instance):
+    # BASEHUAWEI -> 'huawei', fall back to the device class name: S9312 -> 's9312'
+    for cls in type(instance).__mro__:
+        name = cls.__name__
+        if name.startswith('BASE') and name not in TRANSPORT_CLASSES:
+            return name[4:].lower()
+    return type(instance).__name__.lower()
+
+
+def getSubnet(ip, prefix=24):
+    # '192.168.1.20', 24 -> '192.168.1.0/24'
+    try:
+        mask = (0xffffffff << (32 - prefix)) & 0xffffffff
+        num = ip_to_num(ip) & mask
+    except Exception:
+        # Not a dotted ip address, every target is a subnet of its own.
+        return str(ip)
+    return '%s.%s.%s.%s/%s' % (num >> 24, (num >> 16) & 0xff, (num >> 8) & 0xff, num & 0xff, prefix)
+
+
+class LoginScheduler(object):
+    """Run a task (login by default) for many instances with bounded concurrency.
+
+    - parameter maxWorkers: upper limit of tasks running at the same time
+    - parameter vendorLimits: {'huawei': 10, ...}, upper limit of running tasks per vendor
+    - parameter subnetLimit: upper limit of running tasks per subnet
+    - parameter subnetPrefix: prefix length used to group targets into subnets
+    - parameter interval: minimum seconds between two task starts, 0 means no pacing
+
+    Any object with a `run(instances)` method can be given to Forward as scheduler.
+    """
+    def __init__(self, maxWorkers=DEFAULT_MAX_WORKERS, vendorLimits=None,
+                 subnetLimit=None, subnetPrefix=24, interval=0):
+        if not isinstance(maxWorkers, int) or maxWorkers < 1:
+            raise ForwardError('[Scheduler Init Failed]: maxWorkers must be a positive integer')
+        if subnetLimit is not None and subnetLimit < 1:
+            raise ForwardError('[Scheduler Init Failed]: subnetLimit must be a positive integer')
+        self.maxWorkers = maxWorkers
+        self.vendorLimits = vendorLimits or {}
+        self.subnetLimit = subnetLimit
+        self.subnetPrefix = subnetPrefix
+        self.interval = interval
+
+    def _keys(self, instance):
+        # Return the limited keys of an instance, [(key, limit), ...]
+        keys = []
+        vendor = getVendor(instance)
+        if vendor in self.vendorLimits:
+            keys.append((('vendor', vendor), self.vendorLimits[vendor]))
+        if self.subnetLimit:
+            keys.append((('subnet', getSubnet(instance.ip, self.subnetPrefix)), self.subnetLimit))
+        return keys
+
+    def imap(self, instances, task=loginThread, args=(), kwargs=None, timeout=None):
+        """Run task(instance, *args, **kwargs) for every instance,
+        yield (instance, result) as soon as each one is finished.
+        A task running longer than timeout seconds is yielded as failed,
+        its late result is dropped.
+        """
+        kwargs = kwargs or {}
+        pending = deque((index, instance, self._keys(instance)) for index, instance in enumerate(instances))
+        total = len(pending)
+        if total == 0:
+            return
+        running = {}
+        condition = threading.Condition()
+        results = queue.Queue()
+        state = {'nextStart': 0.0}
+        # index -> (instance, start time) of the tasks in progress
+        started = {}
+
+        def take():
+            # Pick the first pending instance whose vendor/subnet slots are free.
+            with condition:
+                while pending:
+                    for position, (index, instance, keys) in enumerate(pending):
+                        if all(running.get(key, 0) < limit for key, limit in keys):
+                            del pending[position]
+                            for key, limit in keys:
+                                running[key] = running.get(key, 0) + 1
+                            now = time.time()
+                            delay = state['nextStart'] - now
+                            state['nextStart'] = max(now, state['nextStart']) + self.interval
+                            started[index] = (instance, now + max(delay, 0))
+                            return index, instance, keys, delay
+                    condition.wait()
+                return None
+
+        def release(keys):
+            with condition:
+                for key, limit in keys:
+                    running[key] -= 1
+                condition.notify_all()
+
+        def worker():
+            while True:
+                item = take()
+                if item is None:
+                    return
+                index, instance, keys, delay = item
+                if delay > 0:
+                    time.sleep(delay)
+                try:
+                    result = task(instance, *args, **kwargs)
+                except Exception as e:
+                    result = {'status': False, 'content': '', 'errLog': str(e)}
+                release(keys)
+                results.put((index, instance, result))
+
+        for i in range(min(self.maxWorkers, total)):
+            threadNode = threading.Thread(target=worker)
+            threadNode.daemon = True
+            threadNode.start()
+        expired = set()
+        done = 0
+        while done < total:
+            wait = None
+            if timeout is not None:
+                timeouts = []
+                with condition:
+                    now = time.time()
+                    for index, (instance, start) in list(started.items()):
+                        if now - start >= timeout:
+                            # Give up waiting for this one.
+                            del started[index]
+                            expired.add(index)
+                            timeouts.append(instance)
+                    if started:
+                        wait = max(min(start for instance, start in started.values()) + timeout - now, 0.01)
+                    else:
+                        wait = timeout
+                for instance in timeouts:
+                    done += 1
+                    yield instance, {'status': False, 'content': '',
+                                     'errLog': '[Timeout Error]: %s: no result in %ss' % (instance.ip, timeout)}
+                if done >= total:
+                    break
+            try:
+                index, instance, result = results.get(timeout=wait)
+            except queue.Empty:
+                continue
+            if index in expired:
+                continue
+            with condition:
+                started.pop(index, None)
+            done += 1
+            yield instance, result
+
+    def run(self, instances, task=loginThread, args=(), kwargs=None, timeout=None):
+        """Run task for every instance and wait for all of them,
+        return [(instance, result), ...] in completion order.
+        """
+        return list(self.imap(instances, task, args, kwargs, timeout))
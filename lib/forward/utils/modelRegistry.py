@@ -0,0 +1,73 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Model registry of the device classes.
+A model name resolves to its class, [ex] 's9312' -> forward.devclass.s9312.S9312;
+the module is imported on the first lookup of the model only, and the class is
+memoized, so a fleet of 10000 targets of 3 models imports and resolves 3 times.
+Classes outside forward.devclass can be added with register().
+"""
+
+import os
+import pkgutil
+import importlib
+import threading
+from forward.utils.forwardError import ForwardError
+
+# model -> device class
+_classes = {}
+_lock = threading.Lock()
+
+
+def getDeviceClass(model):
+    """Return the device class of a model, import its module on first use
+    """
+    try:
+        return _classes[model]
+    except KeyError:
+        pass
+    with _lock:
+        if model not in _classes:
+            try:
+                module = importlib.import_module('forward.devclass.%s' % model)
+            except ImportError as e:
+                if model not in listModels():
+                    raise ForwardError('[Model Error]: unknown model %s' % model)
+                # A dependency of the model is missing, [ex] telnetlib or pexpect.
+                raise ForwardError('[Model Error]: %s can not be imported: %s' % (model, str(e)))
+            try:
+                _classes[model] = getattr(module, model.upper())
+            except AttributeError:
+                raise ForwardError('[Model Error]: forward.devclass.%s has no class %s' % (model, model.upper()))
+        return _classes[model]
+
+
+def register(model, deviceClass):
+    """Add or replace the class of a model, [ex] a device class of another package
+    """
+    with _lock:
+        _classes[model] = deviceClass
+    return deviceClass
+
+
+def listModels():
+    """Return the names of the models of forward.devclass, without importing them
+    """
+    import forward.devclass
+    path = os.path.dirname(forward.devclass.__file__)
+    return sorted(name for loader, name, isPackage in pkgutil.iter_modules([path])
+                  if not name.startswith('base') and not isPackage)
@@ -6,6 +6,7 @@
 # This file is part of Forward.
 
 import re
+from forward.utils.ipRange import IpRanges
 
 
 def is_quoted(data):
@@ -57,8 +58,7 @@ def get_ip_in_range(ip_range):
         output all ip within list belongs to 'x.x.x.x-y.y.y.y',
         except '0.0.0.0'
     """
-    ip = [ip_to_num(x) for x in ip_range.split('-')]
-    return [num_to_ip(x) for x in range(ip[0], ip[-1] + 1) if x & 0xff]
+    return IpRanges([ip_range]).strings()
 
 
 def get_ip_list(inventory):
@@ -66,7 +66,4 @@ def get_ip_list(inventory):
         input ['1.1.1.1','2.2.2.2-2.2.3.4']
         output all legal ip address within list
     """
-    ip_list = []
-    for x in inventory:
-        ip_list.extend(get_ip_in_range(x))
-    return ip_list
+    return IpRanges(inventory).strings()
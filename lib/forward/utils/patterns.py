@@ -0,0 +1,95 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Pattern registry.
+Every regular expression of the receive loops (prompts, More markers, cleanup rules)
+is compiled once per process and shared by all instances. Device classes declare
+named patterns with register() at import and look them up with get(); any other
+pattern string goes through compilePattern(), which compiles it on first use only.
+"""
+
+import re
+import six
+from forward.utils.forwardError import ForwardError
+
+# (pattern, flags) -> compiled pattern
+_compiled = {}
+# name -> compiled pattern
+_registry = {}
+
+
+def compilePattern(pattern, flags=0):
+    # Accept a pattern string or an already compiled pattern.
+    if not isinstance(pattern, six.string_types):
+        return pattern
+    key = (pattern, flags)
+    try:
+        return _compiled[key]
+    except KeyError:
+        compiled = _compiled[key] = re.compile(pattern, flags)
+        return compiled
+
+
+def compilePrompt(prompt):
+    # {"success": "...", "error": "..."} -> [("success", compiled), ...], the caller's dict is untouched.
+    return [(key, compilePattern(prompt[key])) for key in prompt]
+
+
+def register(name, pattern, flags=0):
+    """Declare a named pattern once, at import of the device class
+    """
+    compiled = compilePattern(pattern, flags)
+    if name in _registry and _registry[name] is not compiled:
+        raise ForwardError('[Pattern Error]: %s is already registered with another pattern' % name)
+    _registry[name] = compiled
+    return compiled
+
+
+def get(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ForwardError('[Pattern Error]: %s is not registered' % name)
+
+
+# Host prompt and More marker shared by the transport classes.
+BASE_PROMPT = register('basePrompt', r"(>|#|\]|\$) *$")
+MORE_FLAG = register('moreFlag', r'(< *)?(\-)+( |\()?[Mm]ore.*(\)| )?(\-)+( *>)?|\(Q to quit\)')
+TELNET_MORE_FLAG = register('telnetMoreFlag', r'(\-)+( |\()?[Mm]ore.*(\)| )?(\-)+|\(Q to quit\)')
+PASSWORD_EXPIRED = register('passwordExpired', r'(new +password)|(password.*change)', re.IGNORECASE)
+# Mode of the command line, by the last character of the host prompt.
+GENERAL_MODE = register('generalMode', r"> ?$")
+PRIVILEGE_MODE = register('privilegeMode', r"(#|\]) ?$")
+# Output cleanup rules.
+PAGE_BREAK = register('pageBreak', "\r\n.*?\r +?\r")
+TELNET_PAGE_BREAK = register('telnetPageBreak', "\r\n.*?\r *?\r")
+HUAWEI_MORE = register('huaweiMore', " *---- More ----\x1b\\[42D                                          \x1b\\[42D")
+BROCADE_MORE = register('brocadeMore', "<--- More --->\\r +\\r")
+CTRL_C_MORE = register('ctrlCMore', ' \\-\\-More\\(CTRL\\+C break\\)\\-\\- (\x00|\x08){0,} +(\x00|\x08){0,}')
+BACKSPACE = register('backspace', "(\x08)+ +")
+NULL_CHARS = register('nullChars', "[\x00\x08]+")
+CTRL_C_BREAK = register('ctrlCBreak', re.escape("--More(CTRL+Cbreak)--"))
+ANSI = register('ansi', r"\x1b\[[0-9;?]*[A-Za-z]|\x1b[=>]")
+# Error printed for a rejected configuration line, see BASESSHV2.pushConfig.
+CONFIG_ERROR = register('configError', r"^\s*(% ?(Invalid|Incomplete|Ambiguous|Unrecognized|Unknown|Bad|Wrong|Too many)|"
+                                       r"Error:|[Uu]nknown (command|action)|[Cc]ommand parse error)")
+HUAWEI_CONFIG_ERROR = register('huaweiConfigError', r"^\s*Error:")
+H3C_CONFIG_ERROR = register('h3cConfigError', r"^\s*% ?(Unrecognized|Incomplete|Too many|Wrong|Ambiguous)")
+CISCO_CONFIG_ERROR = register('ciscoConfigError', r"^\s*% ?(Invalid|Incomplete|Ambiguous|Unrecognized|Unknown|Bad)")
+# Secret of a command line, masked in the instrumentation events.
+COMMAND_SECRET = register('commandSecret', r"\b(password|passwd|secret|cipher|simple|community|key)\b.*", re.IGNORECASE)
+FORTINET_CONFIG_ERROR = register('fortinetConfigError', r"Unknown action|[Cc]ommand parse error|entry not found")
@@ -0,0 +1,98 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Incremental prompt matching for the command() receive loop.
+More markers are stripped once per line as the data arrives, the success/error
+patterns are tested against a sliding window: the new data plus `overlap` characters
+before it. Only when the last line looks like a host prompt (basePrompt) the patterns
+are tested against the whole output, for the prompts like 'Version[\s\S]+# ?$' whose
+match starts far before the window.
+"""
+
+from forward.utils.patterns import compilePattern, compilePrompt
+
+DEFAULT_OVERLAP = 4096
+
+
+class PromptMatcher(object):
+    def __init__(self, prompt, moreFlag, basePrompt, overlap=DEFAULT_OVERLAP, keep=True):
+        """
+        - parameter prompt: {"success": "regular-expression-success", ...}, strings or compiled
+        - parameter moreFlag: More marker, removed before matching
+        - parameter basePrompt: host prompt, triggers a check of the whole output
+        - parameter keep: False to keep the last window only, for the streaming loops
+        """
+        self.keep = keep
+        # Keep the order of the prompt dict, the first matched key wins.
+        self.patterns = compilePrompt(prompt)
+        self.moreFlag = compilePattern(moreFlag)
+        self.basePrompt = compilePattern(basePrompt)
+        self.overlap = overlap
+        # More-stripped complete lines, and the raw data after the last '\n'.
+        self.lines = []
+        self.size = 0
+        self.partial = ''
+
+    def _search(self, text):
+        for key, pattern in self.patterns:
+            if pattern.search(text):
+                return key
+        return None
+
+    def feed(self, data):
+        """Add received data, return the matched prompt key or None
+        """
+        start = self.size
+        data = self.partial + data
+        position = data.rfind('\n')
+        if position != -1:
+            # More markers never cross a line, so the complete lines are cleaned only once.
+            line = self.moreFlag.sub('', data[:position + 1])
+            self.lines.append(line)
+            self.size += len(line)
+            self.partial = data[position + 1:]
+        else:
+            self.partial = data
+        tail = self.moreFlag.sub('', self.partial)
+        # Window: new data plus overlap, started at a line boundary.
+        window = [tail]
+        need = self.size - start + self.overlap
+        size = 0
+        for line in reversed(self.lines):
+            if size + len(line) > need:
+                piece = line[len(line) - (need - size):]
+                window.append(piece[piece.find('\n') + 1:] or piece)
+                size += len(piece)
+                break
+            window.append(line)
+            size += len(line)
+        window.reverse()
+        if not self.keep:
+            # The older lines are dropped, memory stays bounded by the window.
+            self.lines = [''.join(window[:-1])]
+            self.size = len(self.lines[0])
+        state = self._search(''.join(window))
+        if state is None and self.basePrompt.search(tail) and size < self.size:
+            state = self._search(self.getvalue())
+        return state
+
+    def getvalue(self):
+        """Return the whole output without More markers
+        """
+        if len(self.lines) > 1:
+            self.lines = [''.join(self.lines)]
+        return (self.lines[0] if self.lines else '') + self.moreFlag.sub('', self.partial)
@@ -0,0 +1,90 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Completion of a command by quiescence, without a probe keystroke.
+execute() used to send a carriage return and wait for the prompt before every command
+(cleanBuffer), one more round trip per command. With a QuiescenceDetector the pending
+data is dropped without sending anything, and the output is complete when its last line
+is the host prompt and nothing more arrives for idle seconds: a prompt-like line in the
+middle of an output is followed by more data.
+The idle time follows the round trip time of the link, measured from the sending of a
+command to its echo and smoothed as TCP does (RFC 6298): srtt * idleRatio + 4 * rttvar,
+bounded by minIdle and maxIdle.
+
+    self.quiescence = QuiescenceDetector()      # in the __init__ of a device class
+"""
+
+import time
+
+DEFAULT_MIN_IDLE = 0.001
+DEFAULT_MAX_IDLE = 0.5
+# Idle time until the first round trip is measured.
+DEFAULT_INITIAL_IDLE = 0.05
+
+
+class QuiescenceDetector(object):
+    def __init__(self, minIdle=DEFAULT_MIN_IDLE, maxIdle=DEFAULT_MAX_IDLE, idleRatio=0.25,
+                 initialIdle=DEFAULT_INITIAL_IDLE, clock=time.time, sleep=time.sleep):
+        """
+        - parameter minIdle/maxIdle: bounds of the idle time, seconds
+        - parameter idleRatio: part of the smoothed round trip time in the idle time
+        """
+        self.minIdle = minIdle
+        self.maxIdle = maxIdle
+        self.idleRatio = idleRatio
+        self.initialIdle = initialIdle
+        self.clock = clock
+        self.sleep = sleep
+        # Smoothed round trip time and its variation, None until the first sample
+        self.srtt = None
+        self.rttvar = None
+
+    def sample(self, rtt):
+        """Take a measured round trip time, seconds
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2.0
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    @property
+    def idle(self):
+        """Seconds without data after the prompt before the output is complete
+        """
+        if self.srtt is None:
+            return self.initialIdle
+        return min(self.maxIdle, max(self.minIdle, self.srtt * self.idleRatio + 4 * self.rttvar))
+
+    def drain(self, shell):
+        """Drop the data pending on a shell, nothing is sent
+        """
+        while shell.recv_ready():
+            shell.recv(4096)
+
+    def quiet(self, shell, idle=None):
+        """Return True if no data is ready on a shell within idle seconds
+        """
+        deadline = self.clock() + (self.idle if idle is None else idle)
+        while not shell.recv_ready():
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return True
+            # Polled, a paramiko channel has no wait with a timeout that keeps the data.
+            self.sleep(min(remaining, 0.001))
+        return False
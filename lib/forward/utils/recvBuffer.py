@@ -0,0 +1,90 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Incremental receive buffer for the shell receive loops.
+Received data is kept as a list of chunks and only the last line (tail) is tracked,
+so the cost of every recv() is proportional to the new bytes, not to the total.
+The read size grows while the device keeps filling it and shrinks when it does not.
+"""
+
+import codecs
+
+MIN_READ_SIZE = 1024
+MAX_READ_SIZE = 65536
+
+
+class RecvBuffer(object):
+    def __init__(self, minSize=MIN_READ_SIZE, maxSize=MAX_READ_SIZE, strip=''):
+        """
+        - parameter minSize/maxSize: bounds of the adaptive read size
+        - parameter strip: characters removed from every chunk on arrival, [ex]'\x08'
+        """
+        self.strip = strip
+        self.chunks = []
+        self.size = 0
+        self.recvCount = 0
+        # Data after the last '\n', [ex]'[wangzhe@cloudlab100 ~]$ '
+        self.tail = ''
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.readSize = minSize
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def feed(self, data):
+        """Append received data, update the tail line and the next read size
+        """
+        if not isinstance(data, str):
+            # bytes from paramiko on python3
+            data = self._decoder.decode(data)
+        received = len(data)
+        for char in self.strip:
+            data = data.replace(char, '')
+        if not data:
+            return data
+        self.chunks.append(data)
+        self.size += len(data)
+        position = data.rfind('\n')
+        if position == -1:
+            self.tail += data
+        else:
+            self.tail = data[position + 1:]
+        if received >= self.readSize:
+            # The device has more to send, read bigger.
+            self.readSize = min(self.readSize * 2, self.maxSize)
+        elif received < self.readSize // 4:
+            self.readSize = max(self.readSize // 2, self.minSize)
+        return data
+
+    def recv(self, shell):
+        """Read once from a paramiko shell with the adaptive size
+        """
+        self.recvCount += 1
+        return self.feed(shell.recv(self.readSize))
+
+    def drain(self):
+        """Return the data received since the last drain and forget it, for the streaming loops
+        """
+        data = ''.join(self.chunks)
+        self.chunks = []
+        return data
+
+    def getvalue(self):
+        """Return all received data, chunks are joined once
+        """
+        if len(self.chunks) > 1:
+            self.chunks = [''.join(self.chunks)]
+        return self.chunks[0] if self.chunks else ''
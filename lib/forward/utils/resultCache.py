@@ -0,0 +1,208 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Result cache of the read-only show methods.
+The successful results of show*() and basicInfo() are kept by (ip, port, username,
+privileged, method, arguments) for ttl seconds, the least recently used ones are evicted
+past maxEntries. Instances of the same device and account share the entries, privileged
+meaning a privilegePw was given: a session never reads the output of another account.
+A mutating method (create*, delete*, add*, update*, change*, commit, pushConfig...) drops
+the entries of its device for every account, as does a command()/execute() called
+directly by the user: it may change the configuration.
+Results are copied in and out, a caller may modify its result.
+
+    cache = ResultCache(ttl=300, maxEntries=1024)
+    BASESSHV2(ip, username, password, resultCache=cache)
+    BASESSHV2(ip, username, password, resultCache=True)    # process-wide cache
+"""
+
+import copy
+import time
+import inspect
+import weakref
+import functools
+import threading
+from collections import OrderedDict
+from forward.utils.forwardError import ForwardError
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 1024
+# Read-only methods: show*, and these.
+READ_METHODS = ('basicInfo',)
+# Methods changing the device, by prefix.
+MUTATING_PREFIXES = ('create', 'delete', 'add', 'update', 'change', 'commit', '_commit', 'set', 'trunkOpen',
+                     'pushConfig')
+# Raw commands, mutating when called by the user and not by a show method.
+RAW_METHODS = ('command', 'execute')
+
+
+class ResultCache(object):
+    def __init__(self, ttl=DEFAULT_TTL, maxEntries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        """
+        - parameter ttl: seconds a result is kept
+        - parameter maxEntries: number of results kept, the least recently used are evicted
+        """
+        if ttl < 0 or maxEntries < 1:
+            raise ForwardError('[Result Cache Error]: ttl must not be negative and maxEntries positive')
+        self.ttl = ttl
+        self.maxEntries = maxEntries
+        self.clock = clock
+        # key -> (expiry, result), oldest used first
+        self.entries = OrderedDict()
+        # device -> keys of its entries
+        self.devices = {}
+        self.lock = threading.Lock()
+        # Counters, [ex] for the hit rate of the cache
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return a copy of the cached result of a key, or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            # Most recently used.
+            del self.entries[key]
+            self.entries[key] = entry
+            self.hits += 1
+            result = entry[1]
+        return copy.deepcopy(result)
+
+    def put(self, key, result):
+        """Keep a copy of a result, key[0] is the device
+        """
+        result = copy.deepcopy(result)
+        with self.lock:
+            if key in self.entries:
+                del self.entries[key]
+            self.entries[key] = (self.clock() + self.ttl, result)
+            self.devices.setdefault(key[0], set()).add(key)
+            while len(self.entries) > self.maxEntries:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        del self.entries[key]
+        keys = self.devices.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.devices[key[0]]
+
+    def invalidate(self, device):
+        """Drop the results of a device, [ex] ('10.0.0.1', 22)
+        """
+        with self.lock:
+            for key in self.devices.pop(device, ()):
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.devices.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def attach(self, device):
+        """Wrap the methods of a device instance: the read-only ones use the cache,
+        the mutating ones invalidate it
+        """
+        # The wrappers are kept by the instance, a weak reference avoids a cycle.
+        ref = weakref.ref(device)
+        # Depth of the wrapped calls running, per thread: the commands of a show method are not the user's.
+        state = threading.local()
+        for name in dir(device.__class__):
+            method = getattr(device.__class__, name, None)
+            if not callable(method) or name.startswith('__'):
+                continue
+            if name.startswith('show') or name in READ_METHODS:
+                if inspect.isgeneratorfunction(method):
+                    # [ex] showRouteStream
+                    continue
+                wrapper = self._cached(ref, state, name, method)
+            elif name.startswith(MUTATING_PREFIXES):
+                wrapper = self._invalidating(ref, state, method, False)
+            elif name in RAW_METHODS:
+                wrapper = self._invalidating(ref, state, method, True)
+            else:
+                continue
+            setattr(device, name, wrapper)
+        return device
+
+    def _cached(self, ref, state, name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            device = ref()
+            try:
+                key = (deviceKey(device), sessionKey(device), name, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                key = None
+            result = None if key is None else self.get(key)
+            if result is not None:
+                return result
+            state.depth = getattr(state, 'depth', 0) + 1
+            try:
+                result = method(device, *args, **kwargs)
+            finally:
+                state.depth -= 1
+            if key is not None and isinstance(result, dict) and result.get('status'):
+                self.put(key, result)
+            return result
+        return wrapper
+
+    def _invalidating(self, ref, state, method, raw):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            device = ref()
+            nested = getattr(state, 'depth', 0) > 0
+            state.depth = getattr(state, 'depth', 0) + 1
+            try:
+                return method(device, *args, **kwargs)
+            finally:
+                state.depth -= 1
+                if not (raw and nested):
+                    self.invalidate(deviceKey(device))
+        return wrapper
+
+
+def deviceKey(device):
+    return (device.ip, getattr(device, 'port', None))
+
+
+def sessionKey(device):
+    # Account of the session, the output a show method can read depends on it.
+    return (getattr(device, 'username', None), bool(getattr(device, 'privilegePw', None)))
+
+
+_defaultCache = None
+_defaultLock = threading.Lock()
+
+
+def getResultCache():
+    """Return the process-wide result cache
+    """
+    global _defaultCache
+    with _defaultLock:
+        if _defaultCache is None:
+            _defaultCache = ResultCache()
+        return _defaultCache
@@ -0,0 +1,160 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Incremental parsers of routing tables.
+A parser is fed the lines of the output one by one, as BASESSHV2.streamCommand
+receives them, and returns the routes completed by each line as Route tuples;
+only the prefix of the current route is kept between lines. One Route is made per
+next hop, the continuation lines of a prefix give routes of their own.
+
+    parser = HuaweiRouteParser()
+    for line in lines:
+        for route in parser.feed(line):
+            ...
+    routes = parser.close()
+"""
+
+import re
+from collections import namedtuple
+
+# Fields are the strings of the output, '' when the vendor does not show them.
+Route = namedtuple('Route', ['net', 'mask', 'via', 'interface', 'type', 'metric'])
+
+IP = r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
+
+
+class RouteParser(object):
+    def feed(self, line):
+        """Parse a line, return the routes it completes
+        """
+        return []
+
+    def close(self):
+        """Return the routes left at the end of the output
+        """
+        return []
+
+
+class HuaweiRouteParser(RouteParser):
+    """display ip routing-table of VRP and Comware, the Flags column is optional (H3C has none):
+    Destination/Mask    Proto   Pre  Cost      Flags NextHop         Interface
+          10.0.0.0/24   Static  60   0           RD  10.1.1.1        Vlanif10
+                        Static  60   0           RD  10.1.1.2        Vlanif20
+    """
+    route = re.compile(r'(%s)/(\d{1,2})\s+(\S+)\s+\d+\s+(\d+)\s+(?:\S+\s+)?(%s)\s+(\S+)' % (IP, IP))
+    nextHop = re.compile(r'^\s+([A-Za-z]\S*)\s+\d+\s+(\d+)\s+(?:\S+\s+)?(%s)\s+(\S+)\s*$' % IP)
+
+    def __init__(self):
+        self.prefix = None
+
+    def feed(self, line):
+        match = self.route.search(line)
+        if match:
+            net, mask, _type, metric, via, interface = match.groups()
+            self.prefix = (net, mask)
+            return [Route(net, mask, via, interface, _type, metric)]
+        match = self.nextHop.search(line)
+        if match and self.prefix:
+            _type, metric, via, interface = match.groups()
+            return [Route(self.prefix[0], self.prefix[1], via, interface, _type, metric)]
+        return []
+
+
+class CiscoRouteParser(RouteParser):
+    """show routing of NX-OS, a prefix line and one line per next hop:
+    10.0.0.0/24, ubest/mbest: 1/0, attached
+        *via 10.0.0.1, Vlan10, [0/0], 2w0d, direct
+    """
+    prefixLine = re.compile(r'^(%s)/(\d{1,2}),' % IP)
+    viaLine = re.compile(r'\*via ([^,]+),\s*([^,]*),\s*\[\d+/(\d+)\]')
+
+    def __init__(self):
+        self.prefix = None
+        # The prefix has no next hop line yet.
+        self.pending = False
+
+    def feed(self, line):
+        match = self.prefixLine.search(line)
+        if match:
+            routes = self.close()
+            self.prefix = match.groups()
+            self.pending = True
+            return routes
+        match = self.viaLine.search(line)
+        if match and self.prefix:
+            via, interface, metric = match.groups()
+            self.pending = False
+            return [Route(self.prefix[0], self.prefix[1], via, interface.strip(), line.split()[-1], metric)]
+        return []
+
+    def close(self):
+        if self.pending:
+            self.pending = False
+            return [Route(self.prefix[0], self.prefix[1], '', '', '', '')]
+        return []
+
+
+class FortinetRouteParser(RouteParser):
+    """get router info routing-table all of FortiOS, continuation lines for more next hops:
+    S       1.1.1.4/32 [10/0] via 192.168.93.41, inter-vlanxxxx
+                       [10/0] via 192.168.199.1, mgxxx
+    C       10.1.1.0/24 is directly connected, port1
+    """
+    types = {'S': 'static', 'C': 'direct', 'O': 'ospf', 'R': 'rip', 'B': 'bgp'}
+    route = re.compile(r'^(\S)\S*\s+(%s)/(\d{1,2})(.*)' % IP)
+    nextHop = re.compile(r'^\s+\[\d+/(\d+)\]\s+via\s+([^,\s]+),?\s*(\S*)')
+    metric = re.compile(r'\[\d+/(\d+)\]')
+    via = re.compile(r'via (%s)' % IP)
+
+    def __init__(self):
+        self.prefix = None
+
+    def feed(self, line):
+        match = self.route.search(line)
+        if match:
+            code, net, mask, rest = match.groups()
+            _type = self.types.get(code, 'unkown')
+            self.prefix = (net, mask, _type)
+            metric = self.metric.search(rest)
+            via = self.via.search(rest)
+            interface = rest.split(',')[-1].strip() if ',' in rest else ''
+            return [Route(net, mask, via.group(1) if via else '', interface, _type,
+                          metric.group(1) if metric else '')]
+        match = self.nextHop.search(line)
+        if match and self.prefix:
+            metric, via, interface = match.groups()
+            return [Route(self.prefix[0], self.prefix[1], via, interface, self.prefix[2], metric)]
+        return []
+
+
+def writeRoutes(routes, output):
+    """Write routes as tab separated lines, return their number
+    - parameter output: path of the file (overwritten) or a file-like object
+    """
+    if hasattr(output, 'write'):
+        stream, close = output, False
+    else:
+        stream, close = open(output, 'w'), True
+    count = 0
+    try:
+        for route in routes:
+            stream.write('\t'.join(route) + '\n')
+            count += 1
+    finally:
+        if close:
+            stream.close()
+    return count
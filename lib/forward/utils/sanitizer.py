@@ -0,0 +1,88 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Output sanitizer.
+Pager and terminal artifacts (More markers, page breaks, backspaces, ANSI codes) are
+removed in a single scan of the output: the rules are joined into one alternation,
+at a given position the first rule of the list wins. Device classes replace
+self.sanitizer (and self.executeSanitizer of the telnet and sshv1 transports) to add
+their own rules.
+"""
+
+from forward.utils import patterns
+from forward.utils.patterns import compilePattern
+
+
+class Sanitizer(object):
+    def __init__(self, rules):
+        """
+        - parameter rules: [(pattern, replacement), ...], pattern is a string or a compiled pattern without flags
+        """
+        self.rules = list(rules)
+        self._replacements = {}
+        alternation = []
+        for i, (pattern, replacement) in enumerate(self.rules):
+            name = 'rule%d' % i
+            alternation.append('(?P<%s>%s)' % (name, getattr(pattern, 'pattern', pattern)))
+            self._replacements[name] = replacement
+        self._pattern = compilePattern('|'.join(alternation)) if alternation else None
+
+    def _replace(self, match):
+        # The outer named group of the rule is the last one closed.
+        return self._replacements[match.lastgroup]
+
+    def extend(self, rules):
+        """Return a new sanitizer, the given rules are tried before the current ones
+        """
+        return Sanitizer(list(rules) + self.rules)
+
+    def sanitize(self, content):
+        if self._pattern is None or not content:
+            return content
+        return self._pattern.sub(self._replace, content)
+
+
+# Output of paramiko shells.
+SSHV2_SANITIZER = Sanitizer([
+    # page break, the line is kept
+    (patterns.PAGE_BREAK, "\r\n"),
+    (patterns.HUAWEI_MORE, ""),
+    (patterns.BROCADE_MORE, ""),
+    (patterns.CTRL_C_MORE, ""),
+    # spaces erasing a More marker
+    (patterns.BACKSPACE, ""),
+    (patterns.ANSI, ""),
+])
+
+# Output of telnetlib and pexpect channels, command().
+TELNET_SANITIZER = Sanitizer([
+    (patterns.TELNET_PAGE_BREAK, "\r\n"),
+    (patterns.BROCADE_MORE, ""),
+    (patterns.CTRL_C_MORE, ""),
+    (patterns.CTRL_C_BREAK, ""),
+    (patterns.BACKSPACE, ""),
+    (patterns.NULL_CHARS, ""),
+    (patterns.ANSI, ""),
+])
+
+# execute() of telnetlib and pexpect channels: its rules of old only, page breaks and the
+# spaces after backspaces are kept.
+TELNET_EXECUTE_SANITIZER = Sanitizer([
+    (patterns.BROCADE_MORE, ""),
+    (patterns.NULL_CHARS, ""),
+    (patterns.CTRL_C_BREAK, ""),
+])
@@ -0,0 +1,186 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] SSHv2 session pool.
+Authenticated paramiko clients are kept by (ip, port, username) and shared: every
+login() opens a new shell channel on the transport already connected, logout()
+closes the channel and gives the client back. A client unused for idleTimeout
+seconds, or whose transport is dead, is closed; a client whose shell failed to start
+at login is closed at once. There is no background thread: the idle clients expire
+inside acquire() and closeIdle() only, a long running program calls closeIdle() now
+and then.
+
+    pool = SessionPool(idleTimeout=300)
+    BASESSHV2(ip, username, password, sessionPool=pool)
+    BASESSHV2(ip, username, password, sessionPool=True)    # process-wide pool
+"""
+
+import time
+import threading
+from forward.utils.sshv2 import sshv2
+from forward.utils.forwardError import ForwardError
+
+DEFAULT_IDLE_TIMEOUT = 300
+# Seconds between keepalive packets of the pooled transports.
+KEEPALIVE_INTERVAL = 30
+
+
+class PooledSession(object):
+    def __init__(self, client, password):
+        self.client = client
+        self.password = password
+        # Number of logged in instances using the client.
+        self.refs = 0
+        self.lastUsed = time.time()
+
+
+class SessionPool(object):
+    def __init__(self, idleTimeout=DEFAULT_IDLE_TIMEOUT, connect=sshv2):
+        """
+        - parameter idleTimeout: seconds a client without user is kept
+        - parameter connect: sshv2-like function opening a new client
+        """
+        if idleTimeout < 0:
+            raise ForwardError('[Session Pool Error]: idleTimeout must not be negative')
+        self.idleTimeout = idleTimeout
+        self.connect = connect
+        self.sessions = {}
+        self.lock = threading.Lock()
+        # Counters, [ex] for the hit rate of the pool
+        self.opened = 0
+        self.reused = 0
+
+    def isAlive(self, client):
+        """Health check of the transport of a client
+        """
+        try:
+            transport = client.get_transport()
+            if transport is None or not transport.is_active():
+                return False
+            # Fails at once if the peer has closed the connection.
+            transport.send_ignore()
+            return True
+        except Exception:
+            return False
+
+    def _close(self, client):
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def _expire(self, now):
+        # Called with the lock held, return the clients to close.
+        expired = []
+        for key, session in list(self.sessions.items()):
+            if session.refs == 0 and now - session.lastUsed >= self.idleTimeout:
+                expired.append(self.sessions.pop(key).client)
+        return expired
+
+    def acquire(self, ip, username, password, timeout=30, port=22):
+        """Return a connected client for the device, same njInfo as sshv2()
+        """
+        key = (ip, int(port), username)
+        with self.lock:
+            expired = self._expire(time.time())
+            session = self.sessions.get(key)
+            if session is not None and session.password == password:
+                session.refs += 1
+            else:
+                session = None
+        for client in expired:
+            self._close(client)
+        if session is not None:
+            if self.isAlive(session.client):
+                self.reused += 1
+                return {'status': True, 'errLog': '', 'content': session.client, 'reused': True}
+            self.discard(session.client)
+        # No usable client, login again.
+        njInfo = self.connect(ip, username, password, timeout, port)
+        if not njInfo['status']:
+            return njInfo
+        client = njInfo['content']
+        try:
+            client.get_transport().set_keepalive(KEEPALIVE_INTERVAL)
+        except Exception:
+            pass
+        session = PooledSession(client, password)
+        session.refs = 1
+        with self.lock:
+            self.opened += 1
+            if key in self.sessions:
+                # Another password, or a concurrent login of the same device; not shared.
+                return njInfo
+            self.sessions[key] = session
+        return njInfo
+
+    def _find(self, client):
+        for key, session in self.sessions.items():
+            if session.client is client:
+                return key, session
+        return None, None
+
+    def release(self, client):
+        """Give the client back, it stays open for idleTimeout seconds
+        """
+        with self.lock:
+            key, session = self._find(client)
+            if session is not None:
+                session.refs = max(session.refs - 1, 0)
+                session.lastUsed = time.time()
+        if session is None:
+            # Not pooled.
+            self._close(client)
+
+    def discard(self, client):
+        """Remove a broken client from the pool and close it
+        """
+        with self.lock:
+            key, session = self._find(client)
+            if session is not None:
+                del self.sessions[key]
+        self._close(client)
+
+    def closeIdle(self):
+        """Close the clients unused for idleTimeout seconds, return their number
+        """
+        with self.lock:
+            expired = self._expire(time.time())
+        for client in expired:
+            self._close(client)
+        return len(expired)
+
+    def closeAll(self):
+        with self.lock:
+            clients = [session.client for session in self.sessions.values()]
+            self.sessions = {}
+        for client in clients:
+            self._close(client)
+
+
+_defaultPool = None
+_defaultLock = threading.Lock()
+
+
+def getSessionPool():
+    """Return the process-wide session pool
+    """
+    global _defaultPool
+    with _defaultLock:
+        if _defaultPool is None:
+            _defaultPool = SessionPool()
+        return _defaultPool
@@ -0,0 +1,281 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Cached SOAP clients of the web-service devices, [ex] BASEDEPP.
+A suds Client is built once per (WSDL url, credentials) and reused: the WSDL is not
+fetched and parsed again for every operation, and the parsed WSDL is also kept on
+disk (suds ObjectCache) for the next processes. The requests of the clients go
+through KeepAliveTransports: one persistent HTTP connection per device, the Basic
+credentials sent with the first request instead of after a 401.
+
+    clients = SoapClientCache()
+    client = clients.client('http://10.0.0.1/func/web_main/wsdl/netaddr/netaddr.wsdl', 'admin', 'pw')
+    client.service.addAddrObj(name='web', ip='10.0.0.1/32')
+"""
+
+import os
+import base64
+import socket
+import tempfile
+import threading
+from io import BytesIO
+from six.moves import http_client
+from six.moves.urllib.parse import urlsplit
+from forward.utils.forwardError import ForwardError
+
+try:
+    from suds.transport import Transport, Reply, TransportError
+except ImportError:
+    # suds is only needed by the web-service devices, getSoapClientCache().client() tells it is missing.
+    Transport = object
+    Reply = TransportError = None
+
+# Days the parsed WSDL stays in the disk cache.
+DEFAULT_WSDL_DAYS = 30
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'forward-wsdl')
+
+
+class KeepAliveConnection(object):
+    def __init__(self, scheme, host, port=None, timeout=90):
+        """One persistent HTTP(S) connection, opened again when the server has closed it
+        """
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connection = None
+        self.lock = threading.Lock()
+        # Connections opened, [ex] 1 for any number of requests to a keep-alive server
+        self.opened = 0
+
+    def _connect(self):
+        connectionClass = http_client.HTTPSConnection if self.scheme == 'https' else http_client.HTTPConnection
+        self.connection = connectionClass(self.host, self.port, timeout=self.timeout)
+        self.opened += 1
+
+    def request(self, method, path, body=None, headers=None):
+        """Return (status, reason, headers, body) of a request
+        """
+        with self.lock:
+            for attempt in (0, 1):
+                reused = self.connection is not None
+                if not reused:
+                    self._connect()
+                try:
+                    self.connection.request(method, path, body, headers or {})
+                except (http_client.HTTPException, IOError) as e:
+                    self.close()
+                    # Not sent, a kept connection closed by the server while idle is opened again once.
+                    if reused and attempt == 0 and not isinstance(e, socket.timeout):
+                        continue
+                    raise
+                try:
+                    response = self.connection.getresponse()
+                    data = response.read()
+                except http_client.BadStatusLine:
+                    # Closed without a byte of answer (RemoteDisconnected): the idle connection was
+                    # dropped by the server before it read the request.
+                    self.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except (http_client.HTTPException, IOError):
+                    # [ex] socket.timeout: the device may be running the operation, it is not sent again.
+                    self.close()
+                    raise
+                if response.getheader('connection', '').lower() == 'close':
+                    self.close()
+                return response.status, response.reason, dict(response.getheaders()), data
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class KeepAlivePool(object):
+    def __init__(self, timeout=90):
+        """KeepAliveConnections by (scheme, host, port), shared by the transports of a device
+        """
+        self.timeout = timeout
+        self.connections = {}
+        self.lock = threading.Lock()
+
+    def connection(self, url):
+        """Return the connection and the path of a url
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        with self.lock:
+            if key not in self.connections:
+                self.connections[key] = KeepAliveConnection(parts.scheme, parts.hostname, parts.port, self.timeout)
+            connection = self.connections[key]
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return connection, path
+
+    @property
+    def opened(self):
+        return sum(connection.opened for connection in self.connections.values())
+
+    def close(self):
+        with self.lock:
+            for connection in self.connections.values():
+                connection.close()
+            self.connections.clear()
+
+
+class KeepAliveTransport(Transport):
+    def __init__(self, username=None, password=None, pool=None, timeout=90):
+        """suds transport on the KeepAliveConnections of a pool.
+        A suds transport belongs to one Client, the pool may be shared.
+        """
+        Transport.__init__(self)
+        self.headers = {}
+        if username is not None and password is not None:
+            credentials = base64.b64encode(('%s:%s' % (username, password)).encode('utf-8')).decode('ascii')
+            self.headers['Authorization'] = 'Basic %s' % credentials
+        self.pool = pool if pool is not None else KeepAlivePool(timeout)
+
+    def _request(self, method, request):
+        connection, path = self.pool.connection(request.url)
+        headers = dict(self.headers)
+        headers.update(request.headers)
+        # The connection errors are raised as they are: suds takes a TransportError without
+        # an HTTP status for an empty successful reply.
+        return connection.request(method, path, request.message, headers)
+
+    def open(self, request):
+        status, reason, headers, data = self._request('GET', request)
+        if status >= 300:
+            raise TransportError(reason, status, BytesIO(data))
+        return BytesIO(data)
+
+    def send(self, request):
+        status, reason, headers, data = self._request('POST', request)
+        if status in (http_client.ACCEPTED, http_client.NO_CONTENT):
+            return None
+        if status >= 300:
+            # A SOAP fault comes with 500, suds reads it from the error.
+            raise TransportError(reason, status, BytesIO(data))
+        return Reply(http_client.OK, headers, data)
+
+    def close(self):
+        self.pool.close()
+
+
+class SoapClientCache(object):
+    def __init__(self, cacheDir=DEFAULT_CACHE_DIR, wsdlDays=DEFAULT_WSDL_DAYS, timeout=90):
+        """
+        - parameter cacheDir: directory of the parsed WSDL files, None for no disk cache
+        - parameter wsdlDays: days a WSDL is kept on disk
+        """
+        self.cacheDir = cacheDir
+        self.wsdlDays = wsdlDays
+        self.timeout = timeout
+        # (url, username, password) -> suds Client
+        self.clients = {}
+        # (host, username, password) -> KeepAlivePool, shared by the WSDLs of a device
+        self.pools = {}
+        self.lock = threading.Lock()
+        # Clients built, [ex] 4 for the 4 WSDLs of a device however many operations
+        self.created = 0
+
+    def client(self, url, username, password):
+        """Return the suds Client of a WSDL url, built on first use
+        """
+        key = (url, username, password)
+        with self.lock:
+            client = self.clients.get(key)
+            if client is not None:
+                return client
+            pool = self._pool(url, username, password)
+        if Reply is None:
+            raise ForwardError('[SOAP Error]: the suds package is required by %s' % url)
+        from suds.client import Client
+        from suds.cache import ObjectCache, NoCache
+        options = {'transport': KeepAliveTransport(username, password, pool), 'timeout': self.timeout}
+        # suds keeps the WSDL in a temporary directory when no cache is given.
+        if self.cacheDir is None:
+            options['cache'] = NoCache()
+        else:
+            options['cache'] = ObjectCache(location=self.cacheDir, days=self.wsdlDays)
+        client = Client(url, **options)
+        with self.lock:
+            self.clients[key] = client
+            self.created += 1
+        return client
+
+    def _pool(self, url, username, password):
+        # Called with the lock held.
+        key = (urlsplit(url).netloc, username, password)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = KeepAlivePool(self.timeout)
+        return pool
+
+    def invalidate(self, url=None):
+        """Drop the client of a WSDL url, or all of them
+        """
+        with self.lock:
+            for key in list(self.clients):
+                if url is None or key[0] == url:
+                    del self.clients[key]
+
+    def close(self):
+        """Close the connections and drop the clients
+        """
+        with self.lock:
+            for pool in self.pools.values():
+                pool.close()
+            self.pools.clear()
+            self.clients.clear()
+
+
+def soapFaultCode(error):
+    """Error code of a failed operation, [ex] 401 or 506, None if there is none
+    """
+    message = getattr(error, 'message', None)
+    if isinstance(message, (tuple, list)) and message:
+        return message[0]
+    fault = getattr(error, 'fault', None)
+    for value in (getattr(fault, 'faultstring', None), getattr(fault, 'faultcode', None)):
+        try:
+            return int(str(value).split(':')[-1])
+        except (TypeError, ValueError):
+            pass
+    httpcode = getattr(error, 'httpcode', None)
+    if httpcode is not None:
+        return httpcode
+    if error.args and isinstance(error.args[0], tuple) and error.args[0]:
+        return error.args[0][0]
+    return None
+
+
+_defaultCache = None
+_defaultLock = threading.Lock()
+
+
+def getSoapClientCache():
+    """Return the process-wide SOAP client cache
+    """
+    global _defaultCache
+    with _defaultLock:
+        if _defaultCache is None:
+            _defaultCache = SoapClientCache()
+        return _defaultCache
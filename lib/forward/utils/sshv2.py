@@ -19,23 +19,37 @@
 Author: Cheung Kei-Chuen, Wang Zhe
 """
 
-import paramiko
+import time
+import socket
 
 
 def sshv2(ip='', username='', password='', timeout=30, port=22):
     # return SSH channel, use ssh.invoke_shell() to active a shell, and resize window size
+    # njInfo['timings']: seconds of the TCP connect and of the ssh handshake with authentication
     njInfo = {
         'status': True,
         'errLog': '',
-        'content': ''
+        'content': '',
+        'timings': {}
     }
+    sock = None
     try:
+        # paramiko is imported on the first login, not at import of the device classes.
+        import paramiko
         port = int(port)
+        start = time.time()
+        sock = socket.create_connection((ip, port), timeout)
+        njInfo['timings']['connect'] = time.time() - start
+        start = time.time()
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(ip, port, username, password, timeout=timeout, allow_agent=False, look_for_keys=False)
+        ssh.connect(ip, port, username, password, timeout=timeout, allow_agent=False, look_for_keys=False,
+                    sock=sock)
+        njInfo['timings']['auth'] = time.time() - start
         njInfo['content'] = ssh
     except Exception as e:
         njInfo['status'] = False
         njInfo['errLog'] = str(e)
+        if sock is not None:
+            sock.close()
     return njInfo
@@ -0,0 +1,312 @@
+# This file is part of Forward.
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+-----Introduction-----
+[Core][forward] Target table of the Forward class.
+Targets are rows of column arrays: the IPv4 address as a 4-byte integer and the id
+of a profile. A profile (model, username, password, kwargs) is interned and checked
+once, however many targets use it. About 20 bytes per target instead of a list, a
+string and a dict reference (~200 bytes).
+Lookup and removal by ip are O(1) by an open addressing index kept in an array,
+built on the first get()/remove()/`in`. Iteration gives the [ip, model, username,
+password, kwargs] lists of the rows, in the order they were added.
+
+    table = TargetTable()
+    table.addRanges(IpRanges(['10.0.0.0/16']), 's9312', 'admin', 'pw', {'port': 22})
+    table.get('10.0.3.4')       # ['10.0.3.4', 's9312', 'admin', 'pw', {'port': 22}]
+    table.remove('10.0.3.4')    # 1
+"""
+
+import six
+import itertools
+from array import array
+from forward.utils.ipRange import ipToNum, numToIp, TYPECODE
+from forward.utils.forwardError import ForwardError
+
+# Free slot of the index, and free row of a chain.
+EMPTY = 0xFFFFFFFF
+# Slot of a removed ip, skipped by the lookups.
+DELETED = 0xFFFFFFFE
+# Profile of a removed row.
+REMOVED = 0xFFFFFFFF
+# Fibonacci hashing of the addresses.
+MULTIPLIER = 2654435761
+
+
+class TargetProfile(object):
+    __slots__ = ('model', 'username', 'password', 'kwargs')
+
+    def __init__(self, model, username, password, kwargs):
+        self.model = model
+        self.username = username
+        self.password = password
+        # None for a target given without kwargs
+        self.kwargs = kwargs
+
+    def target(self, ip):
+        if self.kwargs is None:
+            return [ip, self.model, self.username, self.password]
+        return [ip, self.model, self.username, self.password, self.kwargs]
+
+
+def ipNumber(ip):
+    # IPv4 address -> integer, None for a host name or an address not written canonically
+    try:
+        num = ipToNum(ip)
+    except ForwardError:
+        return None
+    if num and numToIp(num) == ip:
+        return num
+    return None
+
+
+class TargetTable(object):
+    def __init__(self, targets=None):
+        self.profiles = []
+        self._profileIds = {}
+        # Columns, one item per row.
+        self.ips = array(TYPECODE)
+        self.rowProfiles = array(TYPECODE)
+        # Previous row of the same ip, filled with the index.
+        self.previous = array(TYPECODE)
+        # row -> target not given by an IPv4 address, its ips item is 0
+        self.hosts = {}
+        self.size = 0
+        # Index: slots of rows by ip, host name -> last row.
+        self._slots = None
+        self._used = 0
+        self._hostRows = {}
+        if targets:
+            self.extend(targets)
+
+    def profile(self, model, username, password, kwargs):
+        """Return the id of the interned profile, the parameters are checked on the first use only
+        """
+        try:
+            key = (model, username, password, None if kwargs is None else tuple(sorted(kwargs.items())))
+            hash(key)
+        except (TypeError, AttributeError):
+            # Unhashable kwargs values, the dict itself is the profile.
+            key = (model, username, password, id(kwargs))
+        profileId = self._profileIds.get(key)
+        if profileId is None:
+            if not all(isinstance(value, six.string_types) for value in (model, username, password)):
+                raise ForwardError('[Target Error]: model, username and password must be strings')
+            if not (kwargs is None or isinstance(kwargs, dict)):
+                raise ForwardError('[Target Error]: kwargs must be a dict')
+            profileId = len(self.profiles)
+            self.profiles.append(TargetProfile(model, username, password, kwargs))
+            self._profileIds[key] = profileId
+        return profileId
+
+    def add(self, ip, model, username, password, kwargs=None):
+        if not isinstance(ip, six.string_types):
+            raise ForwardError('[Target Error]: ip must be a string')
+        self._append(ip, self.profile(model, username, password, kwargs))
+
+    def addRanges(self, ipRanges, model, username, password, kwargs):
+        """Add the addresses of an IpRanges with one profile, checked once
+        """
+        profileId = self.profile(model, username, password, kwargs)
+        numbers = ipRanges.toArray()
+        start = len(self.ips)
+        self.ips.extend(numbers)
+        self.rowProfiles.extend(array(TYPECODE, [profileId]) * len(numbers))
+        self.previous.extend(array(TYPECODE, [EMPTY]) * len(numbers))
+        self.size += len(numbers)
+        slots = self._slots
+        if slots is not None:
+            for row in range(start, len(self.ips)):
+                self._indexRow(row)
+                if self._slots is not slots:
+                    # Built again by _indexRow with every row, the next ones included.
+                    break
+
+    def extend(self, targets):
+        """Add [ip, model, username, password(, kwargs)] lists, all checked before any is added
+        """
+        rows = []
+        for target in targets:
+            try:
+                if not 4 <= len(target) <= 5 or not isinstance(target[0], six.string_types):
+                    raise ForwardError('[Target Error]: illegal target %s' % str(target))
+                profileId = self.profile(target[1], target[2], target[3], target[4] if len(target) > 4 else None)
+            except TypeError:
+                raise ForwardError('[Target Error]: illegal target %s' % str(target))
+            rows.append((target[0], profileId))
+        for ip, profileId in rows:
+            self._append(ip, profileId)
+
+    def _append(self, ip, profileId):
+        row = len(self.ips)
+        num = ipNumber(ip)
+        if num is None:
+            self.hosts[row] = ip
+            num = 0
+        self.ips.append(num)
+        self.rowProfiles.append(profileId)
+        self.previous.append(EMPTY)
+        self.size += 1
+        if self._slots is not None:
+            self._indexRow(row)
+
+    def _buildIndex(self):
+        capacity = 8
+        while capacity * 2 < self.size * 3 + 3:
+            capacity *= 2
+        self._slots = array(TYPECODE, [EMPTY]) * capacity
+        self._used = 0
+        self._hostRows = {}
+        rowProfiles = self.rowProfiles
+        for row in range(len(self.ips)):
+            if rowProfiles[row] != REMOVED:
+                self._indexRow(row)
+
+    def _indexRow(self, row):
+        num = self.ips[row]
+        if num == 0:
+            host = self.hosts[row]
+            self.previous[row] = self._hostRows.get(host, EMPTY)
+            self._hostRows[host] = row
+            return
+        slots = self._slots
+        mask = len(slots) - 1
+        i = (num * MULTIPLIER) & mask
+        free = -1
+        while True:
+            slot = slots[i]
+            if slot == EMPTY:
+                break
+            if slot == DELETED:
+                if free < 0:
+                    free = i
+            elif self.ips[slot] == num:
+                # Same ip again, the new row is looked up first.
+                self.previous[row] = slot
+                slots[i] = row
+                return
+            i = (i + 1) & mask
+        self.previous[row] = EMPTY
+        if free >= 0:
+            slots[free] = row
+            return
+        slots[i] = row
+        self._used += 1
+        if self._used * 3 > len(slots) * 2:
+            self._buildIndex()
+
+    def _slot(self, num):
+        # Slot of num in the index, -1 if absent.
+        slots = self._slots
+        mask = len(slots) - 1
+        i = (num * MULTIPLIER) & mask
+        while True:
+            slot = slots[i]
+            if slot == EMPTY:
+                return -1
+            if slot != DELETED and self.ips[slot] == num:
+                return i
+            i = (i + 1) & mask
+
+    def _lastRow(self, ip):
+        if self._slots is None:
+            self._buildIndex()
+        num = ipNumber(ip)
+        if num is None:
+            return self._hostRows.get(ip, EMPTY)
+        slot = self._slot(num)
+        return EMPTY if slot < 0 else self._slots[slot]
+
+    def _target(self, row):
+        num = self.ips[row]
+        return self.profiles[self.rowProfiles[row]].target(self.hosts[row] if num == 0 else numToIp(num))
+
+    def get(self, ip):
+        """Return the target of an ip, the last added one if the ip is added twice, or None
+        """
+        row = self._lastRow(ip)
+        return None if row == EMPTY else self._target(row)
+
+    def remove(self, ip):
+        """Remove every target of an ip, return their number
+        """
+        row = self._lastRow(ip)
+        if row == EMPTY:
+            return 0
+        num = self.ips[row]
+        if num == 0:
+            del self._hostRows[ip]
+        else:
+            self._slots[self._slot(num)] = DELETED
+        removed = 0
+        while row != EMPTY:
+            self.rowProfiles[row] = REMOVED
+            self.hosts.pop(row, None)
+            removed += 1
+            row = self.previous[row]
+        self.size -= removed
+        if len(self.ips) > 1024 and self.size * 2 < len(self.ips):
+            self.compact()
+        return removed
+
+    def compact(self):
+        """Drop the removed rows from the columns, the index is built again on the next lookup
+        """
+        ips, rowProfiles, hosts = array(TYPECODE), array(TYPECODE), {}
+        for row in range(len(self.ips)):
+            if self.rowProfiles[row] != REMOVED:
+                if row in self.hosts:
+                    hosts[len(ips)] = self.hosts[row]
+                ips.append(self.ips[row])
+                rowProfiles.append(self.rowProfiles[row])
+        self.ips, self.rowProfiles, self.hosts = ips, rowProfiles, hosts
+        self.previous = array(TYPECODE, [EMPTY]) * len(ips)
+        self._slots = None
+
+    def __contains__(self, ip):
+        return self._lastRow(ip) != EMPTY
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        profiles, hosts = self.profiles, self.hosts
+        for row in range(len(self.ips)):
+            profileId = self.rowProfiles[row]
+            if profileId == REMOVED:
+                continue
+            num = self.ips[row]
+            yield profiles[profileId].target(hosts[row] if num == 0 else numToIp(num))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('target index out of range')
+        if self.size == len(self.ips):
+            return self._target(index)
+        return next(itertools.islice(self, index, None))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'TargetTable(%d targets, %d profiles)' % (self.size, len(self.profiles))
@@ -19,6 +19,7 @@
 Author: Wang Zhe, Cheung Kei-Chuen
 """
 
+import time
 import telnetlib
 import re
 
@@ -36,13 +37,18 @@ class NJTELNETWraper(telnetlib.Telnet):
 
     def login(self, username, password):
         # login by username and password
+        # timings: seconds of the TCP connect and of the username/password exchange
         njInfo = {"status": False,
-                  "content": ""}
+                  "content": "",
+                  "timings": {}}
         try:
+            start = time.time()
             telnetlib.Telnet.__init__(self,
                                       host=self.ip,
                                       port=self.port,
                                       timeout=self.timeout)
+            njInfo['timings']['connect'] = time.time() - start
+            start = time.time()
             # self.set_debuglevel(2)
             # username
             self.expect([r"Username|login"])
@@ -51,6 +57,7 @@ class NJTELNETWraper(telnetlib.Telnet):
             self.expect([r"assword"])
             self.write('%s\n' % password)
             T = self.expect([r"Login incorrect|assword", r"%s" % self.prompt])
+            njInfo['timings']['auth'] = time.time() - start
             # is tuple ,notice \r \n
             NT = T[0]
             if NT == 1:
@@ -0,0 +1,46 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import unittest
+from forward.utils.fakeDevice import FakeSSHServer
+
+
+class FakeServerCase(unittest.TestCase):
+    """Test case with one FakeSSHServer per profile of `profiles`, started once for the class.
+    """
+    profiles = ('huawei', 'cisco')
+
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        cls.servers = {}
+        for profile in cls.profiles:
+            cls.servers[profile] = FakeSSHServer(profile)
+            cls.servers[profile].start()
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers.values():
+            server.stop()
+
+    def login(self, deviceClass, profile, **kwargs):
+        """Return an instance of deviceClass logged in the server of profile
+        """
+        dev = deviceClass('127.0.0.1', 'admin', 'admin', port=self.servers[profile].port, timeout=10, **kwargs)
+        self.assertEqual(dev.login()['status'], True)
+        return dev
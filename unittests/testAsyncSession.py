@@ -0,0 +1,122 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import sys
+import logging
+import unittest
+from forward.utils.fakeDevice import FakeSSHServer
+
+try:
+    import asyncio
+except ImportError:
+    # Python 2, the asyncio session engine is not available.
+    asyncio = None
+
+
+class FakeTelnetDevice(asyncio.Protocol if asyncio else object):
+    """IAC DO NAWS, then a cisco-like login and `show version` with one More page."""
+    def connection_made(self, transport):
+        self.transport = transport
+        self.stage = 0
+        self.buffer = b''
+        transport.write(b'\xff\xfd\x1fUsername: ')
+
+    def data_received(self, data):
+        if self.stage < 2:
+            self.buffer += data
+            if b'\n' not in self.buffer:
+                return
+            self.buffer = b''
+            self.stage += 1
+            self.transport.write(b'Password: ' if self.stage == 1 else b'\r\nR1#')
+            return
+        data = data.replace(b'\xff\xfb\x1f', b'').split(b'\xff\xfa')[0]
+        if data == b' ':
+            self.transport.write(b'\r\nuptime 3 days\r\nR1#')
+        elif b'show version' in data:
+            self.transport.write(b'show version\r\nVersion 1.0\r\n --More-- ')
+        else:
+            self.transport.write(b'\r\nR1#')
+
+
+@unittest.skipIf(sys.version_info < (3, 5), 'asyncio session engine requires Python 3.5+')
+class TestAsyncSession(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def run_loop(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_telnet_session(self):
+        from forward.utils.asyncSession import ASYNCTELNET, gatherBounded
+        server = self.run_loop(self.loop.create_server(FakeTelnetDevice, '127.0.0.1', 0))
+        port = server.sockets[0].getsockname()[1]
+        sessions = [ASYNCTELNET('127.0.0.1', 'admin', 'admin', port=port, timeout=5) for i in range(20)]
+        logins = self.run_loop(gatherBounded([session.login() for session in sessions], limit=5))
+        results = self.run_loop(gatherBounded([session.execute('show version') for session in sessions]))
+        command = self.run_loop(sessions[0].command('show version', prompt={'success': r'uptime[\s\S]+R1#$'},
+                                                    timeout=5))
+        self.run_loop(gatherBounded([session.logout() for session in sessions]))
+        server.close()
+        self.run_loop(server.wait_closed())
+        self.assertTrue(all(login['status'] for login in logins))
+        self.assertEqual(results[0]['status'], True)
+        self.assertTrue('Version 1.0' in results[0]['content'])
+        self.assertTrue('More' not in results[0]['content'])
+        self.assertEqual(command['state'], 'success')
+
+    def test_sshv2_session(self):
+        from forward.utils.asyncSession import ASYNCSSHV2, gatherBounded
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        server = FakeSSHServer('cisco', pageLines=20)
+        port = server.start()
+        try:
+            sessions = [ASYNCSSHV2('127.0.0.1', 'admin', 'admin', port=port, timeout=10) for i in range(4)]
+            logins = self.run_loop(gatherBounded([session.login() for session in sessions]))
+            results = self.run_loop(gatherBounded([session.execute('show clock') for session in sessions]))
+            # 100 VLANs over several More pages.
+            command = self.run_loop(sessions[0].command('show vlan brief', prompt={'success': r'R1> ?$'},
+                                                        timeout=10))
+            self.run_loop(gatherBounded([session.logout() for session in sessions]))
+        finally:
+            server.stop()
+        self.assertTrue(all(login['status'] for login in logins), logins)
+        self.assertEqual(sessions[0].prompt, re.escape('R1>'))
+        self.assertEqual([result['content'].strip() for result in results],
+                         ['*10:20:30.123 UTC Mon Oct 19 2026'] * 4)
+        self.assertEqual(command['state'], 'success')
+        self.assertTrue('VLAN0100' in command['content'])
+        self.assertTrue('More' not in command['content'])
+
+    def test_async_device_adapter(self):
+        from forward.utils.asyncSession import AsyncDevice
+
+        class FAKE(object):
+            ip = '1.1.1.1'
+
+            def showVersion(self):
+                return {'status': True, 'content': '1.0', 'errLog': ''}
+
+        device = AsyncDevice(FAKE())
+        self.assertEqual(device.ip, '1.1.1.1')
+        self.assertEqual(self.run_loop(device.showVersion())['content'], '1.0')
@@ -19,6 +19,7 @@ import unittest
 import importlib
 from forward.utils.forwardError import ForwardError
 from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.devclass.baseDepp import BASEDEPP
 
 
 class deviceClassBaseDepp(unittest.TestCase):
@@ -63,3 +64,12 @@ class deviceClassBaseDepp(unittest.TestCase):
         cls = getattr(importlib.import_module('forward.devclass.{dev}'.format(dev=self.deviceClassName)),
                       self.deviceClassName.upper())
         self.assertEquals(cls.__bases__[0], BASESSHV2)
+
+
+class TestIpObjectAddress(unittest.TestCase):
+    def test_unicode(self):
+        dev = BASEDEPP('10.0.0.1', 'admin', 'admin')
+        self.assertEqual(dev.ipObjectAddress(u'10.0.0.1'), '10.0.0.1')
+        self.assertEqual(dev.ipObjectAddress(u'10.0.0.1/24'), '10.0.0.1/32')
+        self.assertEqual(dev.ipObjectAddress(u'10.0.0.200-10.0.0.100'), '10.0.0.100-10.0.0.200')
+        self.assertRaises(ForwardError, dev.ipObjectAddress, None)
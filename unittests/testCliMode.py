@@ -0,0 +1,127 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from forward.utils.cliMode import ModeTracker, hostnameOf, CISCO_MODES, HUAWEI_MODES, FORTINET_MODES
+from forward.utils.instrumentation import Instrumentation, MemorySink
+from forward.devclass.baseHuawei import BASEHUAWEI
+from forward.devclass.baseCisco import BASECISCO
+from unittests.fakeServerCase import FakeServerCase
+
+
+class TestModeTracker(unittest.TestCase):
+    def test_hostname(self):
+        self.assertEqual(hostnameOf('<HUAWEI>'), 'HUAWEI')
+        self.assertEqual(hostnameOf('R1#'), 'R1')
+        self.assertEqual(hostnameOf('FGT # '), 'FGT')
+        self.assertEqual(hostnameOf('user@mx960> '), 'user@mx960')
+
+    def test_huawei(self):
+        tracker = ModeTracker(HUAWEI_MODES)
+        tracker.setHostname('<SW-CORE-01>')
+        self.assertEqual(tracker.mode(), 1)
+        tracker.observe('system-view\r\nEnter system view, return user view with Ctrl+Z.\r\n[SW-CORE-01]')
+        self.assertEqual(tracker.mode(), 2)
+        # A sub-view is not the privilege mode.
+        tracker.observe('interface Vlanif10\r\n[SW-CORE-01-Vlanif10]')
+        self.assertEqual(tracker.mode(), None)
+        tracker.observe('')
+        self.assertEqual(tracker.mode(), None)
+
+    def test_cisco(self):
+        tracker = ModeTracker(CISCO_MODES)
+        tracker.setHostname('R1>')
+        tracker.observe('conf t\r\nR1(config)#')
+        self.assertEqual(tracker.mode(), 3)
+        tracker.observe('interface Vlan10\r\nR1(config-if)#')
+        self.assertEqual(tracker.mode(), None)
+        tracker.observe('end\r\nR1#')
+        self.assertEqual(tracker.mode(), 2)
+        # Another host name.
+        tracker.observe('SR1#')
+        self.assertEqual(tracker.mode(), None)
+
+    def test_fortinet(self):
+        tracker = ModeTracker(FORTINET_MODES)
+        tracker.setHostname('FGT # ')
+        self.assertEqual(tracker.mode(), 2)
+        tracker.observe('config system interface\r\nFGT (interface) # ')
+        self.assertEqual(tracker.mode(), 3)
+
+    def test_no_modes(self):
+        tracker = ModeTracker()
+        tracker.setHostname('R1#')
+        self.assertEqual(tracker.mode(), None)
+
+
+class TestModeSwitch(FakeServerCase):
+    def login(self, deviceClass, profile):
+        sink = MemorySink(keepEvents=True)
+        instrumentation = Instrumentation()
+        instrumentation.addSink(sink)
+        dev = FakeServerCase.login(self, deviceClass, profile, instrumentation=instrumentation)
+        del sink.events[:]
+        return dev, sink
+
+    def sent(self, sink):
+        commands = [event['cmd'] for event in sink.events if event['event'] == 'command']
+        del sink.events[:]
+        return commands
+
+    def test_huawei(self):
+        dev, sink = self.login(BASEHUAWEI, 'huawei')
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(self.sent(sink), ['system-view'])
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(self.sent(sink), [])
+        self.assertEqual(dev.generalMode()['status'], True)
+        self.assertEqual(self.sent(sink), ['return'])
+        # self.mode is stale, the prompt is not.
+        dev.mode = 2
+        self.assertEqual(dev.generalMode()['status'], True)
+        self.assertEqual(self.sent(sink), [])
+        dev.logout()
+
+    def test_raw_send(self):
+        # A vendor method entering a view past command(), as S9312.createVlan does.
+        dev, sink = self.login(BASEHUAWEI, 'huawei')
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.sent(sink)
+        dev.shell.send('vlan 10\n')
+        dev.modeTracker.observe('')
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(self.sent(sink), ['return', 'system-view'])
+        dev.shell.send('vlan 10\n')
+        dev.getPrompt()
+        self.assertEqual(dev.modeTracker.hostname, 'HUAWEI')
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(self.sent(sink), ['return', 'system-view'])
+        dev.logout()
+
+    def test_cisco(self):
+        dev, sink = self.login(BASECISCO, 'cisco')
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(self.sent(sink), ['enable'])
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(dev.configMode()['status'], True)
+        self.assertEqual(self.sent(sink), ['config term'])
+        self.assertEqual(dev.configMode()['status'], True)
+        self.assertEqual(self.sent(sink), [])
+        # Leaving the config mode still sends end.
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(self.sent(sink), ['end'])
+        dev.logout()
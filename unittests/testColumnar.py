@@ -0,0 +1,90 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from six import StringIO
+from forward.utils.columnar import ColumnTable, toColumns, concat, collectColumns
+from forward.utils.routeParser import Route
+from forward.utils.forwardError import ForwardError
+
+VLANS = [
+    {'id': '10', 'description': 'office', 'status': 'active', 'interface': ['GE0/0/1', 'GE0/0/2'], 'type': 'common'},
+    {'id': '20', 'description': '', 'status': 'active', 'interface': [], 'type': 'common'},
+]
+# Declared, the order of the keys of a dict differs between the python versions.
+FIELDS = ('id', 'description', 'status', 'interface', 'type')
+
+
+class TestColumnTable(unittest.TestCase):
+    def test_dictionary_encoding(self):
+        table = toColumns({'status': True, 'content': VLANS, 'errLog': ''}, FIELDS)['content']
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.fields, ['id', 'description', 'status', 'interface', 'type'])
+        self.assertEqual(table.column('status'), ['active', 'active'])
+        # '' and 'active' stored once.
+        self.assertEqual(table.values['status'], ['', 'active'])
+        self.assertEqual(list(table.codes['status']), [1, 1])
+        self.assertEqual(table.row(0), ('10', 'office', 'active', ('GE0/0/1', 'GE0/0/2'), 'common'))
+
+    def test_missing_fields(self):
+        table = ColumnTable()
+        table.append({'interfaceName': 'GE0/0/1'})
+        table.append({'interfaceName': 'GE0/0/2', 'speed': 1000})
+        self.assertEqual(table.column('speed'), ['', 1000])
+        self.assertEqual(list(table.rows()), [('GE0/0/1', ''), ('GE0/0/2', 1000)])
+
+    def test_tuples(self):
+        table = ColumnTable(Route._fields)
+        table.extend([Route('10.0.0.0', '24', '10.1.1.1', 'Vlan10', 'static', '5')])
+        self.assertEqual(table.row(0), ('10.0.0.0', '24', '10.1.1.1', 'Vlan10', 'static', '5'))
+        self.assertRaises(ForwardError, table.append, ('10.0.0.0', '24'))
+
+    def test_failed(self):
+        njInfo = toColumns({'status': False, 'content': '', 'errLog': 'timeout'})
+        self.assertEqual((njInfo['status'], len(njInfo['content']), njInfo['errLog']), (False, 0, 'timeout'))
+
+    def test_write(self):
+        output = StringIO()
+        table = toColumns({'status': True, 'content': VLANS[:1], 'errLog': ''}, FIELDS)['content']
+        self.assertEqual(table.write(output), 1)
+        self.assertEqual(output.getvalue(), 'id\tdescription\tstatus\tinterface\ttype\n'
+                                            '10\toffice\tactive\tGE0/0/1,GE0/0/2\tcommon\n')
+
+
+class TestFleet(unittest.TestCase):
+    def test_concat(self):
+        first = toColumns({'status': True, 'content': VLANS, 'errLog': ''})['content']
+        second = ColumnTable()
+        second.append({'id': '30', 'status': 'suspend', 'name': 'guest'})
+        table = concat([first, second], keys=['1.1.1.1', '1.1.1.2'])
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.column('deviceIp'), ['1.1.1.1', '1.1.1.1', '1.1.1.2'])
+        self.assertEqual(table.column('id'), ['10', '20', '30'])
+        self.assertEqual(table.column('name'), ['', '', 'guest'])
+        self.assertEqual(table.column('type'), ['common', 'common', ''])
+        self.assertEqual(table.values['status'], ['', 'active', 'suspend'])
+        self.assertRaises(ForwardError, concat, [table], ['1.1.1.3'], 'id')
+
+    def test_collect(self):
+        results = [('1.1.1.1', {'status': True, 'content': VLANS, 'errLog': ''}),
+                   ('1.1.1.2', {'status': False, 'content': [], 'errLog': 'not login'}),
+                   ('1.1.1.3', {'status': True, 'content': VLANS[1:], 'errLog': ''})]
+        njInfo = collectColumns(results)
+        self.assertEqual(njInfo['status'], False)
+        self.assertTrue('[1.1.1.2]: not login' in njInfo['errLog'])
+        self.assertEqual(njInfo['content'].column('deviceIp'), ['1.1.1.1', '1.1.1.1', '1.1.1.3'])
+        self.assertEqual(njInfo['content'].column('id'), ['10', '20', '20'])
@@ -63,3 +63,65 @@ class deviceClassE8000e(unittest.TestCase):
         cls = getattr(importlib.import_module('forward.devclass.{dev}'.format(dev=self.deviceClassName)),
                       self.deviceClassName.upper())
         self.assertEquals(cls.__bases__[0], BASEHUAWEI)
+
+    def test_find_address_set(self):
+        from forward.devclass.e8000e import E8000E
+        from forward.utils.ipRange import IpSet
+        content = '\r\n'.join([
+            'Address-set: addr_10.0.0.[1_9]',
+            ' Item(s):',
+            '  address 0 range 10.0.0.1 10.0.0.5',
+            '  address 1 10.0.0.6 mask 29',
+            'Address-set: addr_10.0.0.[1_5]',
+            ' Item(s):',
+            '  address 0 range 10.0.0.5 10.0.0.5',
+            '  address 1 range 10.0.0.1 10.0.0.4',
+        ])
+        dev = E8000E('ip', 'username', 'password')
+        self.assertEqual(dev._findAddressSet(content, IpSet('10.0.0.1-10.0.0.5')), 'addr_10.0.0.[1_5]')
+        self.assertEqual(dev._findAddressSet(content, IpSet('10.0.0.0-10.0.0.7')), 'addr_10.0.0.[1_9]')
+        self.assertEqual(dev._findAddressSet(content, IpSet('10.0.0.1-10.0.0.4')), None)
+
+    def test_object_catalog(self):
+        from forward.devclass.e8000e import E8000E
+        outputs = {
+            'display ip address-set verbose all': '\r\n'.join([
+                'Address-set: web_10.0.0.[1_5]',
+                '  address 0 range 10.0.0.1 10.0.0.5',
+                'Address-set: db_10.1.0.9',
+                '  address 0 10.1.0.9 mask 32',
+                'Address-set: nested',
+                '  address 0 address-set web_10.0.0.[1_5]']),
+            'display ip service-set verbose all': '\r\n'.join([
+                'Service-set Name: tcp_any_80',
+                '  service 0 protocol tcp source-port 0-65535 destination-port 80',
+                'Service-set Name: udp_any_[5000_5010]',
+                '  service 0 protocol udp source-port 0-65535 destination-port 5000-5010']),
+        }
+        sent = []
+
+        def command(cmd, prompt, timeout=30):
+            sent.append(cmd)
+            if cmd in outputs:
+                return {'status': True, 'state': 'success', 'content': outputs[cmd], 'errLog': ''}
+            return {'status': True, 'state': 'success', 'content': '10:20:30', 'errLog': ''}
+        dev = E8000E('ip', 'username', 'password')
+        dev.command = command
+        dev.privilegeMode = lambda: {'status': True, 'content': '', 'errLog': ''}
+        self.assertEqual(dev.loadObjectCatalog()['status'], True)
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(dev.showIpRangeObject('10.0.0.1', '10.0.0.5')['content'], 'web_10.0.0.[1_5]')
+        self.assertEqual(dev.showIpObject('10.1.0.9', '255.255.255.255')['content'], 'db_10.1.0.9')
+        self.assertEqual(dev.showIpObject('10.1.0.8', '32')['status'], False)
+        self.assertEqual(dev.showPortObject('tcp', '80')['content'], 'tcp_any_80')
+        self.assertEqual(dev.showPortRangeObject('udp', '5000', '5010')['content'], 'udp_any_[5000_5010]')
+        self.assertEqual(dev.showPortObject('udp', '80')['status'], False)
+        self.assertEqual(len(sent), 2)
+        # Created objects are added.
+        self.assertEqual(dev.createIpObject('10.1.0.8', '32', 'app')['status'], True)
+        self.assertEqual(dev.createPortObject('udp', '80')['status'], True)
+        del sent[:]
+        self.assertEqual(dev.showIpObject('10.1.0.8', '255.255.255.255')['content'], 'app_10.1.0.8')
+        self.assertEqual(dev.showPortObject('udp', '80')['content'], 'udp_any_80')
+        self.assertEqual(sent, [])
+
@@ -0,0 +1,119 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import socket
+import threading
+import unittest
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+OUTPUTS = {
+    'show version': 'Cisco IOS Software, Version 15.2\r\nuptime is 3 weeks\r\n',
+    'show ntp status': 'Clock is synchronized\r\n',
+    'show snmp': 'Chassis: FTX1234\r\n',
+    'show vlan': 'VLAN Name Status\r\n' * 1000,
+    'show foo': "show foo\r\n     ^\r\n% Invalid input detected at '^' marker.\r\n",
+}
+
+
+class FakeExecChannel(object):
+    def __init__(self, transport):
+        self.transport = transport
+        self.pending = ''
+        self.closed = False
+
+    def settimeout(self, timeout):
+        pass
+
+    def set_combine_stderr(self, combine):
+        pass
+
+    def exec_command(self, cmd):
+        if cmd not in OUTPUTS:
+            raise socket.timeout('timed out')
+        self.pending = OUTPUTS[cmd]
+
+    def recv(self, size):
+        # Slow device, the output comes after a while.
+        time.sleep(0.05)
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def close(self):
+        with self.transport.lock:
+            self.transport.running -= 1
+        self.closed = True
+
+
+class FakeTransport(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.maxRunning = 0
+
+    def open_session(self, timeout=None):
+        with self.lock:
+            self.running += 1
+            self.maxRunning = max(self.maxRunning, self.running)
+        return FakeExecChannel(self)
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.transport = FakeTransport()
+
+    def get_transport(self):
+        return self.transport
+
+
+class TestExecChannel(unittest.TestCase):
+    def setUp(self):
+        self.dev = BASESSHV2('1.1.1.1', 'admin', 'admin', execMode=True, maxChannels=3)
+        self.dev.isLogin = True
+        self.dev._channel = FakeClient()
+
+    def test_exec_command(self):
+        result = self.dev.execCommand('show vlan')
+        self.assertEqual(result['status'], True)
+        self.assertEqual(result['content'], OUTPUTS['show vlan'])
+
+    def test_exec_commands(self):
+        cmds = ['show version', 'show ntp status', 'show snmp', 'show vlan', 'show version']
+        results = self.dev.execCommands(cmds)
+        self.assertEqual([result['content'] for result in results], [OUTPUTS[cmd] for cmd in cmds])
+        self.assertEqual(self.dev._channel.transport.maxRunning, 3)
+        self.assertEqual(self.dev._channel.transport.running, 0)
+
+    def test_failure(self):
+        results = self.dev.readCommands(['show version', 'show unknown'], prompt={})
+        self.assertEqual(results[0]['status'], True)
+        self.assertEqual(results[1]['status'], False)
+        self.assertTrue('show unknown' in results[1]['errLog'])
+        self.assertEqual(self.dev._channel.transport.running, 0)
+
+    def test_rejected(self):
+        # As command() with the error pattern, not a success.
+        result = self.dev.execCommand('show foo')
+        self.assertEqual(result['status'], False)
+        self.assertTrue("% Invalid input detected at '^' marker." in result['errLog'])
+        self.assertEqual(result['content'], OUTPUTS['show foo'])
+        self.assertEqual([result['status'] for result in self.dev.readCommands(['show snmp', 'show foo'], prompt={})],
+                         [True, False])
+
+    def test_not_login(self):
+        self.dev.isLogin = False
+        self.assertEqual(self.dev.execCommand('show version')['status'], False)
@@ -0,0 +1,127 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import socket
+import logging
+import unittest
+from collections import OrderedDict
+from forward.utils.fakeDevice import FakeSSHServer, FakeTelnetServer, DeviceSession
+from forward.devclass.baseHuawei import BASEHUAWEI
+from forward.devclass.baseCisco import BASECISCO
+
+PROMPT = {"success": r"[\r\n]+\S+(>|#|\]) ?$", "error": r"Error:[\s\S]+[\r\n]+\S+(>|#|\]) ?$"}
+
+
+class TestDeviceSession(unittest.TestCase):
+    def test_modes(self):
+        session = DeviceSession('cisco')
+        self.assertEqual(session.prompt(), 'R1>')
+        session.output('enable')
+        session.output('conf t')
+        self.assertEqual(session.prompt(), 'R1(config)#')
+        self.assertEqual(session.output('interface Vlan10'), '')
+        session.output('end')
+        self.assertEqual(session.prompt(), 'R1#')
+        self.assertEqual(session.output('show foo'), "% Invalid input detected at '^' marker.")
+
+    def test_pages(self):
+        session = DeviceSession('huawei', outputSize=10000, pageLines=20)
+        pages = session.pages(session.output('display current-configuration'))
+        self.assertTrue(len(pages) > 1)
+        session.output('screen-length 0 temporary')
+        self.assertEqual(len(session.pages(session.output('display current-configuration'))), 1)
+
+
+class TestFakeSSHServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        cls.server = FakeSSHServer('huawei', outputSize=20000, pageLines=20)
+        cls.port = cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def login(self, noPaging=True):
+        dev = BASEHUAWEI('127.0.0.1', 'admin', 'admin', port=self.port, timeout=10)
+        if not noPaging:
+            dev.noPaging = []
+        self.assertEqual(dev.login()['status'], True)
+        self.assertEqual(dev.prompt, re.escape('<HUAWEI>'))
+        return dev
+
+    def test_pager(self):
+        dev = self.login(noPaging=False)
+        result = dev.command('display current-configuration', prompt=PROMPT)
+        self.assertEqual(result['state'], 'success')
+        self.assertFalse('More' in result['content'])
+        self.assertTrue('interface GigabitEthernet0/0/0\r\n' in result['content'])
+        self.assertTrue(result['content'].endswith('#\r\n<HUAWEI>'))
+        dev.logout()
+
+    def test_no_paging_and_modes(self):
+        dev = self.login()
+        self.assertEqual(dev.execute('display clock')['content'].strip(),
+                         '2026-10-19 10:20:30\r\nMonday\r\nTime Zone(Beijing) : UTC+08:00')
+        # The first matching key wins.
+        prompt = OrderedDict([("error", PROMPT["error"]), ("success", PROMPT["success"])])
+        self.assertEqual(dev.command('foo', prompt=prompt)['state'], 'error')
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(dev.mode, 2)
+        self.assertEqual(dev.command('foo', prompt=prompt)['content'], 'foo\r\n[HUAWEI]')
+        dev.logout()
+
+    def test_exec(self):
+        dev = self.login()
+        results = dev.execCommands(['display version', 'display clock'])
+        self.assertTrue(results[0]['content'].startswith('Huawei Versatile Routing Platform'))
+        self.assertTrue(results[1]['content'].startswith('2026-10-19'))
+        # Rejected by the device.
+        self.assertEqual(dev.execCommand('display foo')['status'], False)
+        dev.logout()
+
+    def test_bad_password(self):
+        dev = BASECISCO('127.0.0.1', 'admin', 'wrong', port=self.port, timeout=10)
+        self.assertEqual(dev.login()['status'], False)
+
+
+class TestFakeTelnetServer(unittest.TestCase):
+    def test_session(self):
+        server = FakeTelnetServer('cisco')
+        port = server.start()
+        client = socket.create_connection(('127.0.0.1', port), timeout=10)
+
+        def expect(text):
+            data = b''
+            while not data.endswith(text):
+                data += client.recv(1024)
+            return data
+
+        try:
+            expect(b'Username:')
+            # Negotiation bytes are dropped.
+            client.sendall(b'\xff\xfb\x1f\xff\xfa\x1f\x27\x10\x27\x10\xff\xf0admin\r\n')
+            expect(b'Password:')
+            client.sendall(b'admin\r\n')
+            expect(b'R1>')
+            client.sendall(b'show clock\r\n')
+            self.assertEqual(expect(b'R1>'), b'show clock\r\n*10:20:30.123 UTC Mon Oct 19 2026\r\nR1>')
+        finally:
+            client.close()
+            server.stop()
@@ -0,0 +1,56 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import unittest
+from forward import Forward
+from forward.utils.fleetRunner import FleetRunner
+from forward.utils.loginScheduler import LoginScheduler
+
+
+class FAKE(object):
+    def __init__(self, ip, delay):
+        self.ip = ip
+        self.delay = delay
+
+    def showVersion(self, prefix='V'):
+        time.sleep(self.delay)
+        return {'status': True, 'content': prefix + self.ip, 'errLog': ''}
+
+
+class TestFleetRunner(unittest.TestCase):
+    def test_completion_order(self):
+        instances = [FAKE('1.1.1.1', 0.3), FAKE('1.1.1.2', 0.0)]
+        result = list(FleetRunner().imap(instances, 'showVersion', prefix='R'))
+        # The fast device comes first.
+        self.assertEqual([ip for ip, data in result], ['1.1.1.2', '1.1.1.1'])
+        self.assertEqual(result[0][1]['content'], 'R1.1.1.2')
+
+    def test_callable_and_timeout(self):
+        instances = [FAKE('1.1.1.%d' % i, 0.0) for i in range(1, 10)] + [FAKE('1.1.1.10', 2)]
+        runner = FleetRunner(scheduler=LoginScheduler(maxWorkers=3), timeout=0.5)
+        result = runner.run(instances, lambda instance: instance.showVersion(prefix='')['content'])
+        self.assertEqual(len(result), 10)
+        self.assertEqual(result['1.1.1.1'], {'status': True, 'content': '1.1.1.1', 'errLog': ''})
+        self.assertEqual(result['1.1.1.10']['status'], False)
+        self.assertTrue('Timeout' in result['1.1.1.10']['errLog'])
+
+    def test_forward_run_fleet(self):
+        fleet = Forward()
+        fleet.instances = {'1.1.1.1': FAKE('1.1.1.1', 0), '1.1.1.2': FAKE('1.1.1.2', 0)}
+        result = dict(fleet.runFleet('showVersion'))
+        self.assertEqual(result['1.1.1.2']['content'], 'V1.1.1.2')
@@ -0,0 +1,125 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import six
+import json
+import socket
+import logging
+import unittest
+from forward.utils.instrumentation import Instrumentation, MemorySink, JSONLinesSink, StatsdSink, redactCommand
+from forward.utils.fakeDevice import FakeSSHServer
+from forward.devclass.baseHuawei import BASEHUAWEI
+
+PROMPT = {"success": r"[\r\n]+\S+(>|\]) ?$", "error": r"Error:[\s\S]+"}
+
+
+class TestSinks(unittest.TestCase):
+    def test_memory(self):
+        sink = MemorySink(keepEvents=True)
+        sink.handle({'event': 'command', 'model': 'S9312', 'method': 'execute', 'cmd': 'display version',
+                     'bytes': 100, 'wallTime': 0.5, 'state': 'success'})
+        sink.handle({'event': 'command', 'model': 'S9312', 'method': 'execute', 'cmd': 'display clock',
+                     'bytes': 300, 'wallTime': 0.1, 'state': 'success'})
+        sink.handle({'event': 'command', 'model': 'C6506', 'method': 'command', 'cmd': 'show run', 'bytes': 10,
+                     'wallTime': 2.0, 'regexTime': None})
+        # One key per method, whatever the command lines.
+        stats = sink.stats[('command', 'S9312', 'execute')]
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['bytes'], {'sum': 400, 'max': 300})
+        self.assertEqual([key for key, stats in sink.top('wallTime')],
+                         [('command', 'C6506', 'command'), ('command', 'S9312', 'execute')])
+        self.assertEqual([key for key, stats in sink.top('bytes', n=1)], [('command', 'S9312', 'execute')])
+        self.assertEqual(len(sink.events), 3)
+        sink.reset()
+        self.assertEqual(sink.stats, {})
+
+    def test_redact(self):
+        self.assertEqual(redactCommand('local-user admin password irreversible-cipher Abc@1234'),
+                         'local-user admin password ***')
+        self.assertEqual(redactCommand('username admin privilege 15 secret 0 Abc@1234'),
+                         'username admin privilege 15 secret ***')
+        self.assertEqual(redactCommand('snmp-agent community read Public@1'), 'snmp-agent community ***')
+        self.assertEqual(redactCommand('display current-configuration'), 'display current-configuration')
+        self.assertEqual(redactCommand(None), None)
+
+    def test_json_lines(self):
+        output = six.StringIO()
+        JSONLinesSink(output).handle({'event': 'login', 'ip': '10.0.0.1', 'total': 1.5})
+        self.assertEqual(json.loads(output.getvalue()), {'event': 'login', 'ip': '10.0.0.1', 'total': 1.5})
+
+    def test_statsd(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(5)
+        sink = StatsdSink(port=server.getsockname()[1])
+        sink.handle({'event': 'command', 'model': 'S9312', 'cmd': 'display version', 'bytes': 100,
+                     'wallTime': 0.25, 'regexTime': None, 'state': 'success'})
+        self.assertEqual(server.recv(4096).decode('utf-8').split('\n'),
+                         ['forward.command.S9312.bytes:100|c', 'forward.command.S9312.wallTime:250.000|ms'])
+        sink.close()
+        server.close()
+
+    def test_failing_sink(self):
+        class Broken(object):
+            def handle(self, event):
+                raise ValueError(event)
+        instrumentation = Instrumentation()
+        sink = MemorySink()
+        instrumentation.addSink(Broken())
+        instrumentation.addSink(sink)
+        instrumentation.emit({'event': 'login', 'model': 'S9312', 'total': 1})
+        self.assertEqual(sink.stats[('login', 'S9312', None)]['count'], 1)
+        instrumentation.removeSink(sink)
+        self.assertEqual(len(instrumentation.sinks), 1)
+
+
+class TestSessionEvents(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        cls.server = FakeSSHServer('huawei', outputSize=20000, pageLines=20)
+        cls.port = cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_events(self):
+        instrumentation = Instrumentation()
+        sink = instrumentation.addSink(MemorySink(keepEvents=True))
+        dev = BASEHUAWEI('127.0.0.1', 'admin', 'admin', port=self.port, timeout=10, instrumentation=instrumentation)
+        dev.noPaging = []
+        self.assertEqual(dev.login()['status'], True)
+        login = sink.events[0]
+        self.assertEqual((login['event'], login['model'], login['status'], login['reused']),
+                         ('login', 'BASEHUAWEI', True, False))
+        for phase in ('connect', 'auth', 'shell', 'prompt', 'init'):
+            self.assertTrue(0 <= login[phase] <= login['total'])
+        result = dev.command('display current-configuration', prompt=PROMPT)
+        command = sink.events[1]
+        self.assertEqual((command['method'], command['cmd'], command['state']),
+                         ('command', 'display current-configuration', 'success'))
+        self.assertTrue(command['pages'] > 1)
+        self.assertTrue(command['bytes'] >= len(result['content']))
+        self.assertTrue(command['recvs'] >= command['pages'])
+        self.assertTrue(0 <= command['regexTime'] <= command['wallTime'])
+        dev.execute('display clock')
+        self.assertEqual(sink.events[2]['method'], 'execute')
+        dev.command('local-user admin password cipher Abc@1234', prompt=PROMPT)
+        self.assertEqual(sink.events[3]['cmd'], 'local-user admin password ***')
+        self.assertEqual(sink.stats[('command', 'BASEHUAWEI', 'command')]['count'], 2)
+        dev.logout()
@@ -0,0 +1,116 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from forward import Forward
+from forward.utils.ipRange import IpRanges, IpSet, ipToNum, numToIp
+from forward.utils.deviceListSplit import DEVICELIST
+from forward.utils.parse import get_ip_in_range, get_ip_list
+from forward.utils.forwardError import ForwardError
+
+
+def expand(start, end):
+    # The expansion done by DEVICELIST before the integer intervals.
+    return [numToIp(num) for num in range(ipToNum(start), ipToNum(end) + 1) if num & 0xff]
+
+
+class TestIpRanges(unittest.TestCase):
+    def test_range(self):
+        ranges = IpRanges(['10.0.0.250-10.0.2.3'])
+        self.assertEqual(list(ranges), expand('10.0.0.250', '10.0.2.3'))
+        self.assertEqual(len(ranges), len(expand('10.0.0.250', '10.0.2.3')))
+        self.assertEqual(ranges.strings(), list(ranges))
+        self.assertEqual(list(ranges.toArray()), [ipToNum(ip) for ip in ranges])
+        self.assertEqual(list(ranges.numbers()), list(ranges.toArray()))
+
+    def test_cidr_and_exclude(self):
+        ranges = IpRanges(['10.0.0.0/12'], exclude=['10.1.0.0/16', '10.2.0.5'])
+        self.assertEqual(len(ranges), (16 - 1) * 65536 - 15 * 256 - 1)
+        self.assertTrue('10.2.0.4' in ranges)
+        self.assertFalse('10.2.0.5' in ranges)
+        self.assertFalse('10.1.3.4' in ranges)
+        self.assertFalse('10.16.0.1' in ranges)
+        self.assertFalse('10.2.3.0' in ranges)
+        self.assertEqual(ranges.intervals, [(ipToNum('10.0.0.0'), ipToNum('10.0.255.255')),
+                                            (ipToNum('10.2.0.0'), ipToNum('10.2.0.4')),
+                                            (ipToNum('10.2.0.6'), ipToNum('10.15.255.255'))])
+        self.assertEqual(list(IpRanges('192.168.1.77/30')), ['192.168.1.76', '192.168.1.77', '192.168.1.78',
+                                                            '192.168.1.79'])
+        # Unicode strings, [ex] of json on py2, are ranges too.
+        self.assertEqual(list(IpRanges(u'192.168.1.76/30', exclude=u'192.168.1.77-192.168.1.79')),
+                         ['192.168.1.76'])
+
+    def test_order_and_empty(self):
+        self.assertEqual(list(IpRanges(['2.2.2.2', '1.1.1.1', '2.2.2.2'])), ['2.2.2.2', '1.1.1.1', '2.2.2.2'])
+        self.assertEqual(list(IpRanges(['1.1.1.5-1.1.1.1', '1.1.1.0'])), [])
+        self.assertFalse(IpRanges([]))
+
+    def test_illegal(self):
+        self.assertRaises(ForwardError, IpRanges, ['1.1.1'])
+        self.assertRaises(ForwardError, IpRanges, ['1.1.1.256'])
+        self.assertRaises(ForwardError, IpRanges, ['1.1.1.1/33'])
+
+    def test_devicelist(self):
+        self.assertEqual(DEVICELIST(['1.1.1.1', '2.2.2.254-2.2.3.2']).getIpList(),
+                         ['1.1.1.1', '2.2.2.254', '2.2.2.255', '2.2.3.1', '2.2.3.2'])
+        self.assertEqual(DEVICELIST([]).getIp('3.3.3.3'), ['3.3.3.3'])
+        self.assertEqual(get_ip_in_range('2.2.2.254-2.2.3.1'), ['2.2.2.254', '2.2.2.255', '2.2.3.1'])
+        self.assertEqual(get_ip_list(['1.1.1.1', '1.1.1.2']), ['1.1.1.1', '1.1.1.2'])
+
+    def test_add_targets(self):
+        forward = Forward()
+        forward.addTargets(['10.0.0.0/12'], 's9312', 'admin', 'admin', exclude=['10.0.0.0/16'], port=22)
+        forward.addTargets(['10.32.0.1'], 'c6506', 'admin', 'admin')
+        self.assertEqual(len(forward.targets), 15 * 255 * 256 + 1)
+        self.assertEqual(len(forward.targets.profiles), 2)
+        self.assertEqual(forward.targets[0], ['10.1.0.1', 's9312', 'admin', 'admin', {'port': 22}])
+        self.assertEqual(forward.targets[-1], ['10.32.0.1', 'c6506', 'admin', 'admin', {}])
+
+
+class TestIpSet(unittest.TestCase):
+    def test_equal(self):
+        a = IpSet(['10.0.0.9', '10.0.0.1-10.0.0.5', '10.0.0.4-10.0.0.6', '10.0.0.7'])
+        b = IpSet(['10.0.0.1-10.0.0.7', '10.0.0.9'])
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(a.ranges(), ['10.0.0.1-10.0.0.7', '10.0.0.9'])
+        self.assertEqual(len(a), 8)
+        self.assertNotEqual(a, IpSet(['10.0.0.1-10.0.0.9']))
+        self.assertEqual(IpSet(['10.0.0.0/24']), IpSet(['10.0.0.0 255.255.255.0']))
+        self.assertEqual(IpSet(['10.0.0.0/24']), IpSet(['10.0.0.0 24']))
+        self.assertEqual(IpSet(['10.0.0.255', '10.0.1.0-10.0.1.3']).intervals,
+                         ((ipToNum('10.0.0.255'), ipToNum('10.0.1.3')),))
+        # Empty ranges are dropped.
+        self.assertFalse(IpSet(['10.0.0.5-10.0.0.1']))
+        # Unicode strings are addresses too, not sequences.
+        self.assertEqual(IpSet(u'10.0.0.1'), IpSet(['10.0.0.1']))
+        self.assertEqual(IpSet([u'10.0.0.1-10.0.0.3']).ranges(), ['10.0.0.1-10.0.0.3'])
+        self.assertTrue(u'10.0.0.2' in IpSet([u'10.0.0.1-10.0.0.3']))
+
+    def test_contains(self):
+        big = IpSet(['0.0.0.0/1', '172.16.0.0/12'])
+        self.assertEqual(len(big), 2 ** 31 + 2 ** 20)
+        self.assertTrue('10.1.2.3' in big)
+        self.assertTrue(ipToNum('172.31.255.255') in big)
+        self.assertFalse('172.32.0.0' in big)
+        self.assertFalse('128.0.0.0' in big)
+        self.assertTrue(IpSet(['10.0.0.0/16', '172.20.0.1']) <= big)
+        self.assertTrue(big >= IpSet(['172.16.0.0-172.16.255.255']))
+        self.assertFalse(IpSet(['127.255.255.255-128.0.0.0']) <= big)
+        self.assertEqual(IpSet('10.0.0.1-10.0.0.3') | IpSet('10.0.0.4'), IpSet('10.0.0.1-10.0.0.4'))
+        self.assertRaises(ForwardError, IpSet, ['10.0.0.1 255.255.255.256'])
+
@@ -0,0 +1,91 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import threading
+import unittest
+from forward.utils.forwardError import ForwardError
+from forward.utils.loginScheduler import LoginScheduler, getVendor, getSubnet
+
+
+class BASEHUAWEI(object):
+    def __init__(self, ip):
+        self.ip = ip
+        self.isLogin = False
+
+
+class BASECISCO(BASEHUAWEI):
+    pass
+
+
+class S9312(BASEHUAWEI):
+    pass
+
+
+class TestLoginScheduler(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+
+    def fakeLogin(self, instance, key=None):
+        key = key(instance) if key else 'all'
+        with self.lock:
+            self.running[key] = self.running.get(key, 0) + 1
+            self.peak[key] = max(self.peak.get(key, 0), self.running[key])
+        time.sleep(0.01)
+        with self.lock:
+            self.running[key] -= 1
+        instance.isLogin = True
+        return instance.ip
+
+    def test_get_vendor(self):
+        self.assertEqual(getVendor(S9312('1.1.1.1')), 'huawei')
+        self.assertEqual(getVendor(object()), 'object')
+
+    def test_get_subnet(self):
+        self.assertEqual(getSubnet('192.168.1.20'), '192.168.1.0/24')
+        self.assertEqual(getSubnet('10.1.2.3', 16), '10.1.0.0/16')
+        self.assertEqual(getSubnet(1), '1')
+
+    def test_max_workers(self):
+        instances = [S9312('10.0.0.%d' % i) for i in range(1, 41)]
+        result = LoginScheduler(maxWorkers=4).run(instances, task=self.fakeLogin)
+        self.assertEqual(len(result), 40)
+        self.assertTrue(all(instance.isLogin for instance in instances))
+        self.assertTrue(self.peak['all'] <= 4)
+
+    def test_vendor_and_subnet_limits(self):
+        instances = [S9312('10.0.%d.%d' % (i % 2, i)) for i in range(1, 21)]
+        instances += [BASECISCO('10.0.2.%d' % i) for i in range(1, 21)]
+        scheduler = LoginScheduler(maxWorkers=16, vendorLimits={'huawei': 2})
+        scheduler.run(instances, task=self.fakeLogin, args=(getVendor,))
+        self.assertTrue(self.peak['huawei'] <= 2)
+        scheduler = LoginScheduler(maxWorkers=16, subnetLimit=3)
+        self.peak = {}
+        scheduler.run(instances, task=self.fakeLogin, args=(lambda x: getSubnet(x.ip),))
+        self.assertTrue(max(self.peak.values()) <= 3)
+
+    def test_imap_and_errors(self):
+        def brokenLogin(instance):
+            raise Exception('boom')
+        result = list(LoginScheduler(maxWorkers=2).imap([S9312('1.1.1.1')], task=brokenLogin))
+        self.assertEqual(result[0][1]['status'], False)
+        self.assertEqual(result[0][1]['errLog'], 'boom')
+        self.assertEqual(LoginScheduler().run([]), [])
+        with self.assertRaises(ForwardError):
+            LoginScheduler(maxWorkers=0)
@@ -0,0 +1,60 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+import subprocess
+import unittest
+from forward import Forward
+from forward.utils import modelRegistry
+from forward.utils.modelRegistry import getDeviceClass, register, listModels
+from forward.utils.forwardError import ForwardError
+from forward.devclass.s9312 import S9312
+
+
+class TestModelRegistry(unittest.TestCase):
+    def test_resolve(self):
+        self.assertTrue(getDeviceClass('s9312') is S9312)
+        self.assertTrue(modelRegistry._classes['s9312'] is S9312)
+        self.assertRaises(ForwardError, getDeviceClass, 'nomodel')
+
+    def test_register(self):
+        class MYSWITCH(S9312):
+            pass
+        register('myswitch', MYSWITCH)
+        self.assertTrue(getDeviceClass('myswitch') is MYSWITCH)
+
+    def test_list(self):
+        models = listModels()
+        self.assertTrue('s9312' in models and 'c6506' in models)
+        self.assertFalse('baseHuawei' in models)
+
+    def test_get_instances(self):
+        forward = Forward()
+        forward.addTargets(['10.0.0.1-10.0.0.3'], 's9312', 'admin', 'admin')
+        instances = forward.getInstances(preLogin=False)
+        self.assertEqual(sorted(instances), ['10.0.0.1', '10.0.0.2', '10.0.0.3'])
+        self.assertTrue(all(isinstance(instance, S9312) for instance in instances.values()))
+
+    def test_lazy_transports(self):
+        # A new interpreter: the device classes load no transport until the first login.
+        code = ("import sys\nimport forward\nfrom forward.devclass.s9312 import S9312\n"
+                "from forward.devclass.baseTELNET import BASETELNET\n"
+                "print(','.join(m for m in ('paramiko', 'telnetlib') if m in sys.modules))")
+        lib = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+        output = subprocess.check_output([sys.executable, '-c', code], env=dict(os.environ, PYTHONPATH=lib))
+        self.assertEqual(output.decode('utf-8').strip(), '')
@@ -0,0 +1,77 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import unittest
+from forward.utils.fakeDevice import FakeSSHServer
+from forward.utils.instrumentation import Instrumentation, MemorySink
+from forward.devclass.baseH3C import BASEH3C
+
+
+class TestObjectGroupIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        cls.server = FakeSSHServer('h3c')
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.sink = MemorySink(keepEvents=True)
+        instrumentation = Instrumentation()
+        instrumentation.addSink(self.sink)
+        self.dev = BASEH3C('127.0.0.1', 'admin', 'admin', port=self.server.port, timeout=10,
+                           instrumentation=instrumentation)
+        self.assertEqual(self.dev.login()['status'], True)
+        del self.sink.events[:]
+
+    def tearDown(self):
+        self.dev.logout()
+
+    def sent(self):
+        commands = [event['cmd'] for event in self.sink.events if event['event'] == 'command']
+        del self.sink.events[:]
+        return commands
+
+    def test_lookup(self):
+        dev = self.dev
+        result = dev.isExistObjectGroupIPAddress(['10.0.0.9', '10.0.0.3-10.0.0.5', '10.0.0.1', '10.0.0.2'])
+        self.assertEqual(result, {'status': True, 'content': 'web'})
+        self.assertEqual(self.sent(), ['system-view', 'display object-group ip address'])
+        # The index is reused.
+        self.assertEqual(dev.isExistObjectGroupIPAddress(['10.1.0.0/24'])['content'], 'db')
+        self.assertEqual(dev.isExistObjectGroupIPAddress(['10.0.0.1'])['status'], False)
+        self.assertEqual(self.sent(), [])
+        # Nested groups are not indexed.
+        self.assertEqual(len(dev.objectGroupIndex), 2)
+
+    def test_invalidate(self):
+        dev = self.dev
+        self.assertEqual(dev.loadObjectGroupIPAddress()['status'], True)
+        self.assertRaises(IOError, dev.createObjectGroupIPAddress, [])
+        self.assertIsNotNone(dev.objectGroupIndex)
+        dev.timeout = 1
+        # The fake device does not enter the group view, the creation fails after the first command.
+        dev.command = lambda cmd, prompt, timeout=1: {'state': None, 'errLog': 'timeout', 'content': ''}
+        self.assertRaises(IOError, dev.createObjectGroupIPAddress, ['10.0.0.1'])
+        self.assertIsNone(dev.objectGroupIndex)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import unittest
+from forward.utils import patterns
+from forward.utils.forwardError import ForwardError
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+
+class FakeShell(object):
+    def __init__(self, data):
+        self.data = list(data)
+
+    def send(self, data):
+        pass
+
+    def recv(self, size):
+        return self.data.pop(0) if self.data else ''
+
+    def recv_ready(self):
+        return False
+
+    def settimeout(self, timeout):
+        pass
+
+
+class TestPatterns(unittest.TestCase):
+    def test_compile_once(self):
+        pattern = patterns.compilePattern(r'[\r\n]+\S+# ?$')
+        self.assertTrue(patterns.compilePattern(r'[\r\n]+\S+# ?$') is pattern)
+        self.assertTrue(patterns.compilePattern(pattern) is pattern)
+        self.assertFalse(patterns.compilePattern(r'[\r\n]+\S+# ?$', re.IGNORECASE) is pattern)
+
+    def test_register(self):
+        pattern = patterns.register('test.prompt', r'<\S+> ?$')
+        self.assertTrue(patterns.get('test.prompt') is pattern)
+        # Same declaration again, [ex] module reloaded
+        self.assertTrue(patterns.register('test.prompt', r'<\S+> ?$') is pattern)
+        self.assertRaises(ForwardError, patterns.register, 'test.prompt', r'\[\S+\] ?$')
+        self.assertRaises(ForwardError, patterns.get, 'test.unknown')
+
+    def test_transport_patterns(self):
+        dev = BASESSHV2('1.1.1.1', 'admin', 'admin')
+        self.assertTrue(patterns.compilePattern(dev.basePrompt) is patterns.BASE_PROMPT)
+        self.assertTrue(patterns.compilePattern(dev.moreFlag) is patterns.MORE_FLAG)
+
+    def test_command_keep_prompt(self):
+        dev = BASESSHV2('1.1.1.1', 'admin', 'admin')
+        dev.isLogin = True
+        dev.shell = FakeShell(['display version\r\n', 'Version 5.1\r\n<HUAWEI>'])
+        prompt = {"success": r"[\r\n]+\S+(>|\]) ?$", "error": r"Error:[\s\S]+"}
+        self.assertEqual(dev.command('display version', prompt=prompt)['state'], 'success')
+        # The prompt dict of the caller is not modified.
+        self.assertEqual(prompt, {"success": r"[\r\n]+\S+(>|\]) ?$", "error": r"Error:[\s\S]+"})
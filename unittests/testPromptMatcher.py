@@ -0,0 +1,65 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import unittest
+from forward.utils.promptMatcher import PromptMatcher
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+
+class TestPromptMatcher(unittest.TestCase):
+    def setUp(self):
+        dev = BASESSHV2('1.1.1.1', 'admin', 'admin')
+        self.moreFlag = dev.moreFlag
+        self.basePrompt = dev.basePrompt
+
+    def fullScan(self, prompt, content):
+        # The matching done by BASESSHV2.command before the matcher.
+        for key in prompt:
+            if re.search(prompt[key], re.sub(self.moreFlag, "", content)):
+                return key
+        return None
+
+    def replay(self, prompt, data, size):
+        matcher = PromptMatcher(prompt, self.moreFlag, self.basePrompt, overlap=64)
+        content = ''
+        for i in range(0, len(data), size):
+            content += data[i:i + size]
+            state = matcher.feed(data[i:i + size])
+            self.assertEqual(state, self.fullScan(prompt, content))
+            if state is not None:
+                return state
+        return None
+
+    def test_same_result_as_full_scan(self):
+        output = ''.join('interface GE0/0/%d\r\n  ---- More ----\x1b[42D \x1b[42D description x\r\n' % i
+                         for i in range(40))
+        prompts = [
+            {"success": "[\r\n]+\S+(>|\]) ?$", "error": "Unrecognized command[\s\S]+"},
+            {"success": "[vV]ersion[\s\S]+[\r\n]+\S+(>|\]) ?$", "error": "Error:[\s\S]+"},
+        ]
+        for prompt in prompts:
+            for size in (3, 50, 4096):
+                self.assertEqual(self.replay(prompt, 'Version 5.1\r\n' + output + '<HUAWEI>', size), 'success')
+                self.assertEqual(self.replay(prompt, output + 'Error: Unrecognized command\r\n' + output, size), 'error')
+                self.assertEqual(self.replay(prompt, output + 'R1-More', size), None)
+
+    def test_more_flag_removed(self):
+        matcher = PromptMatcher({"success": "end[\r\n]+<R1> ?$"}, self.moreFlag, self.basePrompt)
+        self.assertEqual(matcher.feed('line\r\n  ---- More ----'), None)
+        self.assertEqual(matcher.feed('\r\nend\r\n<R1>'), 'success')
+        self.assertEqual(matcher.getvalue(), 'line\r\n  \r\nend\r\n<R1>')
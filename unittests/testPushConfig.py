@@ -0,0 +1,78 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from forward.utils import patterns
+from forward.devclass.baseHuawei import BASEHUAWEI
+from forward.devclass.baseCisco import BASECISCO
+from unittests.fakeServerCase import FakeServerCase
+
+
+class TestConfigErrors(unittest.TestCase):
+    def test_patterns(self):
+        self.assertTrue(patterns.HUAWEI_CONFIG_ERROR.search("Error: Unrecognized command found at '^' position."))
+        self.assertTrue(patterns.H3C_CONFIG_ERROR.search("% Unrecognized command found at '^' position."))
+        self.assertTrue(patterns.CISCO_CONFIG_ERROR.search("% Invalid input detected at '^' marker."))
+        self.assertTrue(patterns.FORTINET_CONFIG_ERROR.search('command parse error before \'foo\''))
+        self.assertFalse(patterns.CISCO_CONFIG_ERROR.search(' description 100% used'))
+        self.assertTrue(patterns.CONFIG_ERROR.search('Error: Wrong parameter found'))
+
+
+class TestPushConfig(FakeServerCase):
+    def test_huawei_block(self):
+        dev = self.login(BASEHUAWEI, 'huawei')
+        lines = ['acl number 3000'] + ['rule %d permit ip source 10.%d.%d.0 0.0.0.255' % (i * 5, i // 256, i % 256)
+                                       for i in range(2000)]
+        result = dev.pushConfig(lines)
+        self.assertEqual(result['status'], True, result['errLog'])
+        self.assertEqual(result['errors'], [])
+        self.assertIn(lines[-1], result['content'])
+        self.assertEqual(dev.modeTracker.mode(), 2)
+        # The session is usable after the block.
+        self.assertEqual(dev.command('display clock', prompt={'success': dev.basePrompt})['state'], 'success')
+        dev.logout()
+
+    def test_huawei_errors(self):
+        dev = self.login(BASEHUAWEI, 'huawei', configWindow=4)
+        lines = ['vlan batch 10 20', 'invalid line 1', 'interface Vlanif10', 'invalid line 3', 'quit']
+        result = dev.pushConfig(lines)
+        self.assertEqual(result['status'], False)
+        self.assertEqual([(error['index'], error['line']) for error in result['errors']],
+                         [(1, 'invalid line 1'), (3, 'invalid line 3')])
+        self.assertTrue(result['errors'][0]['error'].startswith('Error:'))
+        self.assertIn('line 3 invalid line 3', result['errLog'])
+        dev.logout()
+
+    def test_cisco_window(self):
+        dev = self.login(BASECISCO, 'cisco')
+        lines = ['interface Vlan%d' % (i // 2) if i % 2 == 0 else 'invalid' for i in range(20)]
+        result = dev.pushConfig(lines, window=1)
+        self.assertEqual([error['index'] for error in result['errors']], list(range(1, 20, 2)))
+        self.assertEqual(dev.modeTracker.mode(), 3)
+        # Nothing is sent in an empty block.
+        self.assertEqual(dev.pushConfig([]), {'status': True, 'content': '', 'errLog': '', 'errors': []})
+        self.assertEqual(dev.privilegeMode()['status'], True)
+        self.assertEqual(dev.modeTracker.mode(), 2)
+        dev.logout()
+
+    def test_not_login(self):
+        dev = BASEHUAWEI('127.0.0.1', 'admin', 'admin', port=self.servers['huawei'].port)
+        self.assertEqual(dev.pushConfig(['vlan 10'])['status'], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import unittest
+from forward.utils.fakeDevice import FakeSSHServer
+from forward.utils.quiescence import QuiescenceDetector
+from forward.devclass.baseCisco import BASECISCO
+
+
+class FakeShell(object):
+    """recv_ready() answers from a list, then False."""
+    def __init__(self, ready=()):
+        self.ready = list(ready)
+        self.sent = []
+
+    def recv_ready(self):
+        return self.ready.pop(0) if self.ready else False
+
+    def recv(self, size):
+        return 'x'
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestQuiescenceDetector(unittest.TestCase):
+    def test_idle(self):
+        detector = QuiescenceDetector(minIdle=0.005, maxIdle=0.5, initialIdle=0.05)
+        self.assertEqual(detector.idle, 0.05)
+        detector.sample(0.1)
+        self.assertAlmostEqual(detector.idle, 0.1 * 0.25 + 4 * 0.05)
+        for i in range(50):
+            detector.sample(0.1)
+        # A steady link leaves a quarter of the round trip.
+        self.assertAlmostEqual(detector.idle, 0.025, places=3)
+        detector.sample(10)
+        self.assertEqual(detector.idle, 0.5)
+        detector = QuiescenceDetector()
+        for i in range(50):
+            detector.sample(0.0001)
+        self.assertEqual(detector.idle, 0.001)
+
+    def test_quiet(self):
+        clock = FakeClock()
+        detector = QuiescenceDetector(clock=clock, sleep=clock.sleep)
+        shell = FakeShell()
+        self.assertTrue(detector.quiet(shell, idle=0.05))
+        self.assertAlmostEqual(clock.now, 0.05)
+        self.assertFalse(detector.quiet(FakeShell([False, False, True]), idle=0.05))
+        shell = FakeShell([True, True])
+        detector.drain(shell)
+        self.assertEqual(shell.ready, [])
+        self.assertEqual(shell.sent, [])
+
+
+class TestQuiescenceExecute(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        cls.server = FakeSSHServer('cisco', latency=0.02)
+        cls.port = cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_no_probe(self):
+        dev = BASECISCO('127.0.0.1', 'admin', 'admin', port=self.port, timeout=10)
+        self.assertTrue(dev.login()['status'])
+        self.assertIsNotNone(dev.quiescence)
+        sent = []
+        send = dev.shell.send
+        dev.shell.send = lambda data: sent.append(data) or send(data)
+        result = dev.execute('show clock')
+        self.assertTrue(result['status'])
+        self.assertEqual(result['content'].strip(), '*10:20:30.123 UTC Mon Oct 19 2026')
+        result = dev.execute('show vlan brief')
+        self.assertEqual(len(result['content'].strip().split('\r\n')), 102)
+        self.assertIsNotNone(dev.quiescence.srtt)
+        # Only the commands were sent, no carriage return before them.
+        self.assertEqual(sent, ['show clock\r', 'show vlan brief\r'])
+        dev.logout()
+
+    def test_probe(self):
+        dev = BASECISCO('127.0.0.1', 'admin', 'admin', port=self.port, timeout=10)
+        self.assertTrue(dev.login()['status'])
+        dev.quiescence = None
+        result = dev.execute('show clock')
+        self.assertEqual(result['content'].strip(), '*10:20:30.123 UTC Mon Oct 19 2026')
+        dev.logout()
+
+
+if __name__ == '__main__':
+    unittest.main()
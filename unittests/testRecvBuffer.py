@@ -0,0 +1,92 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from forward.utils.recvBuffer import RecvBuffer
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+
+class FakeShell(object):
+    """Replay device output, answer every send() with the next page."""
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.pending = ''
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+        if self.pages:
+            self.pending += self.pages.pop(0)
+
+    def recv(self, size):
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def recv_ready(self):
+        return bool(self.pending)
+
+    def settimeout(self, timeout):
+        pass
+
+
+class TestRecvBuffer(unittest.TestCase):
+    def test_tail_and_value(self):
+        buff = RecvBuffer()
+        buff.feed('line1\r\nli')
+        self.assertEqual(buff.tail, 'li')
+        buff.feed('ne2')
+        self.assertEqual(buff.tail, 'line2')
+        buff.feed('\r\nR1#')
+        self.assertEqual(buff.tail, 'R1#')
+        self.assertEqual(buff.getvalue(), 'line1\r\nline2\r\nR1#')
+        self.assertEqual(buff.size, 17)
+
+    def test_bytes_are_decoded(self):
+        buff = RecvBuffer()
+        data = u'\u4e2d\u6587\r\n'.encode('utf-8')
+        buff.feed(data[:2])
+        buff.feed(data[2:])
+        # The native str is kept: the utf-8 bytes on python2, a decoded text on python3.
+        self.assertEqual(buff.getvalue(), data if str is bytes else u'\u4e2d\u6587\r\n')
+
+    def test_adaptive_read_size(self):
+        buff = RecvBuffer(minSize=1024, maxSize=4096)
+        buff.feed('x' * 1024)
+        self.assertEqual(buff.readSize, 2048)
+        buff.feed('x' * 4096)
+        buff.feed('x' * 4096)
+        self.assertEqual(buff.readSize, 4096)
+        buff.feed('x')
+        self.assertEqual(buff.readSize, 2048)
+
+    def test_sshv2_execute(self):
+        dev = BASESSHV2('1.1.1.1', 'admin', 'admin')
+        output = ''.join('line %d\r\n' % i for i in range(20000))
+        dev.shell = FakeShell([
+            '\r\nR1#',
+            'show run\r\n' + output + ' --More-- ',
+            '\r\nlast line\r\nR1#',
+        ])
+        dev._channel = dev.shell
+        dev.isLogin = True
+        dev.prompt = 'R1#'
+        result = dev.execute('show run')
+        self.assertEqual(result['status'], True)
+        self.assertTrue(result['content'].startswith('line 0\r\n'))
+        self.assertTrue('line 19999' in result['content'])
+        self.assertTrue('last line' in result['content'])
+        self.assertEqual(dev.shell.sent, ['\n', 'show run\r', ' '])
@@ -0,0 +1,160 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from forward.utils.resultCache import ResultCache
+from forward.utils.forwardError import ForwardError
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class COUNTING(BASESSHV2):
+    """Answers from memory, counts the commands sent to the 'device'."""
+    def __init__(self, *args, **kws):
+        BASESSHV2.__init__(self, *args, **kws)
+        self.sent = []
+        self.vlans = ['1']
+
+    def command(self, cmd=None, prompt=None, timeout=30):
+        self.sent.append(cmd)
+        if cmd.startswith('vlan '):
+            self.vlans.append(cmd.split()[1])
+        return {'status': True, 'content': ' '.join(self.vlans), 'errLog': '', 'state': 'success'}
+
+    def showVlan(self):
+        data = self.command('display vlan')
+        return {'status': True, 'content': data['content'].split(), 'errLog': ''}
+
+    def showInterface(self, name=None):
+        if name == 'broken':
+            return {'status': False, 'content': [], 'errLog': 'timeout'}
+        return {'status': True, 'content': [name], 'errLog': ''}
+
+    def createVlan(self, vlan):
+        self.command('vlan %s' % vlan)
+        return {'status': True, 'content': '', 'errLog': ''}
+
+    def showStream(self):
+        yield self.command('display vlan')
+
+
+class TestResultCache(unittest.TestCase):
+    def test_ttl(self):
+        clock = Clock()
+        cache = ResultCache(ttl=10, clock=clock)
+        cache.put((('1.1.1.1', 22), 'showVlan', (), ()), {'content': [1]})
+        self.assertEqual(cache.get((('1.1.1.1', 22), 'showVlan', (), ())), {'content': [1]})
+        clock.now += 10
+        self.assertEqual(cache.get((('1.1.1.1', 22), 'showVlan', (), ())), None)
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 1, 1))
+
+    def test_lru(self):
+        cache = ResultCache(maxEntries=2)
+        cache.put(('a', 1), 1)
+        cache.put(('a', 2), 2)
+        cache.get(('a', 1))
+        cache.put(('b', 3), 3)
+        # ('a', 2) is the least recently used.
+        self.assertEqual([cache.get(('a', 1)), cache.get(('a', 2)), cache.get(('b', 3))], [1, None, 3])
+        cache.invalidate('a')
+        self.assertEqual((len(cache), sorted(cache.devices)), (1, ['b']))
+
+    def test_copies(self):
+        cache = ResultCache()
+        result = {'content': [1]}
+        cache.put(('a', 1), result)
+        result['content'].append(2)
+        cache.get(('a', 1))['content'].append(3)
+        self.assertEqual(cache.get(('a', 1)), {'content': [1]})
+
+    def test_parameters(self):
+        self.assertRaises(ForwardError, ResultCache, ttl=-1)
+        self.assertRaises(ForwardError, ResultCache, maxEntries=0)
+
+
+class TestCachedDevice(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResultCache()
+        self.dev = COUNTING('10.0.0.1', 'admin', 'admin', resultCache=self.cache)
+
+    def test_no_cache(self):
+        dev = COUNTING('10.0.0.1', 'admin', 'admin')
+        dev.showVlan()
+        dev.showVlan()
+        self.assertEqual(len(dev.sent), 2)
+
+    def test_repeated_reads(self):
+        self.assertEqual(self.dev.showVlan()['content'], ['1'])
+        self.assertEqual(self.dev.showVlan()['content'], ['1'])
+        self.assertEqual(self.dev.sent, ['display vlan'])
+        # Another instance of the same device shares the entries.
+        other = COUNTING('10.0.0.1', 'admin', 'admin', resultCache=self.cache)
+        self.assertEqual(other.showVlan()['content'], ['1'])
+        self.assertEqual(other.sent, [])
+
+    def test_accounts(self):
+        self.dev.showVlan()
+        # Another account, or the same one with a privilege password, does not read it.
+        for other in (COUNTING('10.0.0.1', 'guest', 'guest', resultCache=self.cache),
+                      COUNTING('10.0.0.1', 'admin', 'admin', privilegePw='enable', resultCache=self.cache)):
+            other.showVlan()
+            self.assertEqual(other.sent, ['display vlan'])
+        self.assertEqual(len(self.cache), 3)
+        # A change drops the entries of every account.
+        self.dev.createVlan('10')
+        self.assertEqual(len(self.cache), 0)
+
+    def test_arguments(self):
+        self.dev.showInterface('GE0/0/1')
+        self.dev.showInterface(name='GE0/0/1')
+        self.dev.showInterface('GE0/0/2')
+        self.assertEqual(len(self.cache), 3)
+        # Failures are not kept.
+        self.dev.showInterface('broken')
+        self.assertEqual(len(self.cache), 3)
+
+    def test_mutating_invalidates(self):
+        self.dev.showVlan()
+        self.dev.createVlan('10')
+        self.assertEqual(self.dev.showVlan()['content'], ['1', '10'])
+        self.assertEqual(self.dev.sent, ['display vlan', 'vlan 10', 'display vlan'])
+
+    def test_push_config_invalidates(self):
+        self.dev.showVlan()
+        self.assertEqual(len(self.cache), 1)
+        self.dev.pushConfig(['vlan 30'])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_raw_command(self):
+        self.dev.showVlan()
+        self.assertEqual(len(self.cache), 1)
+        # The commands of a show method do not invalidate, the user's do.
+        self.dev.command('vlan 20')
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.dev.showVlan()['content'], ['1', '20'])
+
+    def test_generators(self):
+        list(self.dev.showStream())
+        list(self.dev.showStream())
+        self.assertEqual(len(self.dev.sent), 2)
@@ -0,0 +1,132 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import unittest
+from collections import OrderedDict
+from six import StringIO
+from forward.utils.fakeDevice import FakeSSHServer, routingTable
+from forward.utils.forwardError import ForwardError
+from forward.utils.routeParser import Route, HuaweiRouteParser, CiscoRouteParser, FortinetRouteParser, writeRoutes
+from forward.devclass.baseHuawei import BASEHUAWEI
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+
+def parse(parser, lines):
+    routes = []
+    for line in lines:
+        routes.extend(parser.feed(line))
+    return routes + parser.close()
+
+
+class TestRouteParser(unittest.TestCase):
+    def test_huawei(self):
+        routes = parse(HuaweiRouteParser(), [
+            'Destination/Mask    Proto   Pre  Cost      Flags NextHop         Interface',
+            '      10.0.0.0/24   Static  60   0           RD  10.1.1.1        Vlanif10',
+            '                    Static  60   0           RD  10.1.1.2        Vlanif20',
+            '     127.0.0.0/8    Direct  0    0           D   127.0.0.1       InLoopBack0',
+        ])
+        self.assertEqual(routes, [Route('10.0.0.0', '24', '10.1.1.1', 'Vlanif10', 'Static', '0'),
+                                  Route('10.0.0.0', '24', '10.1.1.2', 'Vlanif20', 'Static', '0'),
+                                  Route('127.0.0.0', '8', '127.0.0.1', 'InLoopBack0', 'Direct', '0')])
+
+    def test_h3c(self):
+        # No Flags column.
+        routes = parse(HuaweiRouteParser(), ['1.1.1.0/24          Static 60   10          2.2.2.2         Vlan10'])
+        self.assertEqual(routes, [Route('1.1.1.0', '24', '2.2.2.2', 'Vlan10', 'Static', '10')])
+
+    def test_cisco(self):
+        routes = parse(CiscoRouteParser(), [
+            '10.0.0.0/24, ubest/mbest: 2/0',
+            '    *via 10.1.1.1, Vlan10, [1/5], 2w0d, static',
+            '    *via 10.1.1.2, Vlan20, [1/5], 2w0d, static',
+            '10.0.1.0/24, ubest/mbest: 1/0, attached',
+        ])
+        self.assertEqual(routes, [Route('10.0.0.0', '24', '10.1.1.1', 'Vlan10', 'static', '5'),
+                                  Route('10.0.0.0', '24', '10.1.1.2', 'Vlan20', 'static', '5'),
+                                  Route('10.0.1.0', '24', '', '', '', '')])
+
+    def test_fortinet(self):
+        routes = parse(FortinetRouteParser(), [
+            'S       1.1.1.4/32 [10/0] via 192.168.93.41, inter-vlan10',
+            '                   [10/0] via 192.168.199.1, mgmt',
+            'C       10.1.1.0/24 is directly connected, port1',
+        ])
+        self.assertEqual(routes, [Route('1.1.1.4', '32', '192.168.93.41', 'inter-vlan10', 'static', '0'),
+                                  Route('1.1.1.4', '32', '192.168.199.1', 'mgmt', 'static', '0'),
+                                  Route('10.1.1.0', '24', '', 'port1', 'direct', '')])
+
+    def test_write_routes(self):
+        output = StringIO()
+        self.assertEqual(writeRoutes([Route('10.0.0.0', '24', '10.1.1.1', 'Vlan10', 'static', '5')], output), 1)
+        self.assertEqual(output.getvalue(), '10.0.0.0\t24\t10.1.1.1\tVlan10\tstatic\t5\n')
+
+
+class TestShowRouteStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+        cls.size = 200000
+        cls.server = FakeSSHServer('huawei', outputSize=cls.size, pageLines=50)
+        cls.port = cls.server.start()
+        cls.expected = parse(HuaweiRouteParser(), routingTable(cls.size).split('\r\n'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def login(self, noPaging=True):
+        dev = BASEHUAWEI('127.0.0.1', 'admin', 'admin', port=self.port, timeout=10)
+        if not noPaging:
+            dev.noPaging = []
+        self.assertEqual(dev.login()['status'], True)
+        return dev
+
+    def test_stream(self):
+        dev = self.login()
+        routes = list(dev.showRouteStream())
+        self.assertTrue(len(routes) > 2000)
+        self.assertEqual(routes, self.expected)
+        # The session is usable again.
+        self.assertEqual(dev.execute('display clock')['status'], True)
+        dev.logout()
+
+    def test_stream_pager(self):
+        # Pages broken by More markers give the same routes.
+        dev = self.login(noPaging=False)
+        self.assertEqual(list(dev.showRouteStream()), self.expected)
+        dev.logout()
+
+    def test_save_routes(self):
+        dev = self.login()
+        output = StringIO()
+        result = dev.saveRoutes(output)
+        self.assertEqual(result['status'], True)
+        self.assertEqual(result['content'], len(self.expected))
+        self.assertEqual(output.getvalue().count('\n'), len(self.expected))
+        dev.logout()
+
+    def test_errors(self):
+        dev = self.login()
+        dev.routeCommand = 'display foo'
+        dev.routePrompt = OrderedDict([("error", r"Error:[\s\S]+[\r\n]+\S+> ?$"), ("success", r"[\r\n]+\S+> ?$")])
+        self.assertRaises(ForwardError, list, dev.showRouteStream())
+        dev.logout()
+        result = BASESSHV2('127.0.0.1', 'admin', 'admin', port=self.port).saveRoutes(StringIO())
+        self.assertEqual(result['status'], False)
+        self.assertTrue('parser' in result['errLog'])
@@ -0,0 +1,83 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import unittest
+from forward.utils.sanitizer import Sanitizer, SSHV2_SANITIZER, TELNET_SANITIZER, TELNET_EXECUTE_SANITIZER
+from forward.devclass.baseSSHV2 import BASESSHV2
+from forward.devclass.baseTELNET import BASETELNET
+
+
+HUAWEI_MORE = "  ---- More ----\x1b[42D                                          \x1b[42D"
+CISCO_MORE = " --More(CTRL+C break)-- \x08\x08\x08   \x08\x08"
+
+
+class TestSanitizer(unittest.TestCase):
+    def multiPass(self, content):
+        # The cleanup done by BASESSHV2.command before the sanitizer.
+        content = re.sub("\r\n.*?\r +?\r", "\r\n", content)
+        content = re.sub(" *---- More ----\x1b\\[42D                                          \x1b\\[42D", "", content)
+        content = re.sub("<--- More --->\\r +\\r", "", content)
+        content = re.sub(r' \-\-More\(CTRL\+C break\)\-\- (\x00|\x08){0,} +(\x00|\x08){0,}', "", content)
+        content = re.sub("(\x08)+ +", "", content)
+        return content
+
+    def test_same_result_as_multi_pass(self):
+        lines = ['interface GE0/0/%d\r\n description uplink\r\n' % i for i in range(20)]
+        samples = [
+            HUAWEI_MORE.join(lines),
+            '<--- More --->\r      \r'.join(lines),
+            CISCO_MORE.join(lines),
+            '\r\n'.join(lines) + '\r\n --More-- \r        \r version 5.1\r\n',
+            'a\x08\x08   b\r\nc',
+            'no artifact at all\r\n<R1>',
+        ]
+        for content in samples:
+            self.assertEqual(SSHV2_SANITIZER.sanitize(content), self.multiPass(content))
+
+    def test_telnet(self):
+        content = 'line1\r\n--More(CTRL+Cbreak)--\x00\x00line2\r\n<--- More --->\r   \rline3'
+        self.assertEqual(TELNET_SANITIZER.sanitize(content), 'line1\r\nline2\r\nline3')
+
+    def test_telnet_execute(self):
+        # The cleanup done by BASETELNET.execute and BASESSHV1.execute before the sanitizer.
+        def multiPass(content):
+            content = re.sub("<--- More --->\\r +\\r", "", content)
+            content = re.sub('(\x00|\x08){0,}', "", content)
+            return re.sub(re.escape("--More(CTRL+Cbreak)--"), "", content)
+        content = ('line1\r\n --More-- \r        \rline2\r\na\x08\x08   b\r\n'
+                   '--More(CTRL+Cbreak)--\x00line3\r\n<--- More --->\r   \rline4')
+        # Page break and spaces after the backspaces kept.
+        self.assertEqual(TELNET_EXECUTE_SANITIZER.sanitize(content),
+                         'line1\r\n --More-- \r        \rline2\r\na   b\r\nline3\r\nline4')
+        self.assertEqual(TELNET_EXECUTE_SANITIZER.sanitize(content), multiPass(content))
+
+    def test_ansi(self):
+        content = 'Version:      VyOS 1.1.7\x1b[m\r\n\x1b[K\x1b[?1l\x1b>end\x1b[1;32m ok\x1b[0m'
+        self.assertEqual(SSHV2_SANITIZER.sanitize(content), 'Version:      VyOS 1.1.7\r\nend ok')
+
+    def test_vendor_rules(self):
+        sanitizer = SSHV2_SANITIZER.extend([(r'\[42D', ''), ('---- Page ----', '\r\n')])
+        self.assertEqual(sanitizer.sanitize('a---- Page ----b\x1b[42D'), 'a\r\nb')
+        self.assertEqual(Sanitizer([]).sanitize('a\x08 b'), 'a\x08 b')
+        self.assertEqual(sanitizer.sanitize(''), '')
+
+    def test_transport(self):
+        self.assertTrue(BASESSHV2('1.1.1.1', 'admin', 'admin').sanitizer is SSHV2_SANITIZER)
+        dev = BASETELNET('1.1.1.1', 'admin', 'admin')
+        self.assertTrue(dev.sanitizer is TELNET_SANITIZER)
+        self.assertTrue(dev.executeSanitizer is TELNET_EXECUTE_SANITIZER)
@@ -0,0 +1,78 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import socket
+import unittest
+from forward.devclass.baseCisco import BASECISCO
+from forward.devclass.baseHuawei import BASEHUAWEI
+from forward.devclass.baseFortinet import BASEFORTINET
+from forward.devclass.asa import ASA
+
+
+class FakeShell(object):
+    """Answer every command with the reply of the given dict."""
+    def __init__(self, replies):
+        self.replies = replies
+        self.sent = []
+        self.pending = ''
+
+    def send(self, data):
+        self.sent.append(data)
+        self.pending += self.replies.get(data.strip(), '')
+
+    def recv(self, size):
+        if not self.pending:
+            raise socket.timeout()
+        data, self.pending = self.pending, ''
+        return data
+
+    def recv_ready(self):
+        return False
+
+    def settimeout(self, timeout):
+        pass
+
+
+class TestSessionInit(unittest.TestCase):
+    def run_init(self, dev, replies):
+        dev.isLogin = True
+        dev.shell = FakeShell(replies)
+        return dev.sessionInit(), dev.shell.sent
+
+    def test_cisco(self):
+        result, sent = self.run_init(BASECISCO('1.1.1.1', 'admin', 'admin'),
+                                     {'terminal length 0': 'terminal length 0\r\nR1#'})
+        self.assertEqual(result['status'], True)
+        self.assertEqual(sent, ['terminal length 0\r'])
+
+    def test_vendor_commands(self):
+        self.assertEqual(BASEHUAWEI('1.1.1.1', 'admin', 'admin').noPaging, ['screen-length 0 temporary'])
+        self.assertEqual(ASA('1.1.1.1', 'admin', 'admin').noPaging, ['terminal pager 0'])
+        result, sent = self.run_init(BASEFORTINET('1.1.1.1', 'admin', 'admin'), {
+            'config system console': 'config system console\r\nFW (console) # ',
+            'set output standard': 'set output standard\r\nFW (console) # ',
+            'end': 'end\r\nFW # ',
+        })
+        self.assertEqual(result['status'], True)
+        self.assertEqual(sent, ['config system console\r', 'set output standard\r', 'end\r'])
+
+    def test_failure_ignored(self):
+        # No answer, the More handling stays as the fallback.
+        dev = BASECISCO('1.1.1.1', 'admin', 'admin', timeout=1)
+        result, sent = self.run_init(dev, {})
+        self.assertEqual(result['status'], False)
+        self.assertTrue('terminal length 0' in result['errLog'])
@@ -0,0 +1,156 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import unittest
+from forward.utils.sessionPool import SessionPool
+from forward.utils.forwardError import ForwardError
+from forward.devclass.baseSSHV2 import BASESSHV2
+
+
+class FakeShell(object):
+    """Shell of a linux host, the prompt comes after every carriage return."""
+    def __init__(self):
+        self.pending = 'Last login: today\r\n[admin@host ~]$ '
+        self.closed = False
+
+    def send(self, data):
+        self.pending += '\r\n[admin@host ~]$ '
+
+    def recv(self, size):
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def recv_ready(self):
+        return bool(self.pending)
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTransport(object):
+    def __init__(self):
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+    def send_ignore(self):
+        if not self.active:
+            raise EOFError()
+
+    def set_keepalive(self, interval):
+        pass
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.shells = []
+        self.closed = False
+
+    def get_transport(self):
+        return self.transport
+
+    def invoke_shell(self, width, height):
+        self.shells.append(FakeShell())
+        return self.shells[-1]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnect(object):
+    def __init__(self):
+        self.clients = []
+
+    def __call__(self, ip, username, password, timeout, port):
+        self.clients.append(FakeClient())
+        return {'status': True, 'errLog': '', 'content': self.clients[-1]}
+
+
+class TestSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.connect = FakeConnect()
+        self.pool = SessionPool(idleTimeout=300, connect=self.connect)
+
+    def test_login_reuses_transport(self):
+        for i in range(3):
+            dev = BASESSHV2('1.1.1.1', 'admin', 'admin', sessionPool=self.pool)
+            self.assertEqual(dev.login()['status'], True)
+            self.assertEqual(dev.prompt, re.escape('[admin@host ~]$ '))
+            self.assertEqual(dev.logout()['status'], True)
+            # A second logout does not release the client again.
+            self.assertEqual(dev.logout()['status'], False)
+        self.assertEqual(len(self.connect.clients), 1)
+        client = self.connect.clients[0]
+        self.assertEqual(len(client.shells), 3)
+        self.assertTrue(all(shell.closed for shell in client.shells))
+        self.assertFalse(client.closed)
+        self.assertEqual((self.pool.opened, self.pool.reused), (1, 2))
+
+    def test_failed_shell_not_reused(self):
+        class BROKEN(BASESSHV2):
+            def sessionInit(self):
+                raise ForwardError('[Session Init Error]: timeout')
+        dev = BROKEN('1.1.1.1', 'admin', 'admin', sessionPool=self.pool)
+        self.assertEqual(dev.login()['status'], False)
+        client = self.connect.clients[0]
+        self.assertTrue(client.closed)
+        self.assertTrue(client.shells[0].closed)
+        self.assertEqual(self.pool.sessions, {})
+        dev = BASESSHV2('1.1.1.1', 'admin', 'admin', sessionPool=self.pool)
+        self.assertEqual(dev.login()['status'], True)
+        self.assertEqual(len(self.connect.clients), 2)
+        dev.logout()
+
+    def test_key(self):
+        first = self.pool.acquire('1.1.1.1', 'admin', 'admin')['content']
+        self.assertTrue(self.pool.acquire('1.1.1.1', 'admin', 'admin', port=22)['content'] is first)
+        self.assertFalse(self.pool.acquire('1.1.1.1', 'admin', 'admin', port=2222)['content'] is first)
+        self.assertFalse(self.pool.acquire('1.1.1.1', 'guest', 'admin')['content'] is first)
+        # Another password is never shared, the client is closed on release.
+        other = self.pool.acquire('1.1.1.1', 'admin', 'other')['content']
+        self.assertFalse(other is first)
+        self.pool.release(other)
+        self.assertTrue(other.closed)
+
+    def test_dead_transport(self):
+        first = self.pool.acquire('1.1.1.1', 'admin', 'admin')['content']
+        self.pool.release(first)
+        first.transport.active = False
+        second = self.pool.acquire('1.1.1.1', 'admin', 'admin')['content']
+        self.assertFalse(second is first)
+        self.assertTrue(first.closed)
+
+    def test_idle_timeout(self):
+        client = self.pool.acquire('1.1.1.1', 'admin', 'admin')['content']
+        self.pool.idleTimeout = 0
+        # In use, never expired.
+        self.assertEqual(self.pool.closeIdle(), 0)
+        self.pool.release(client)
+        self.assertEqual(self.pool.closeIdle(), 1)
+        self.assertTrue(client.closed)
+        self.assertEqual(self.pool.sessions, {})
+
+    def test_close_all(self):
+        client = self.pool.acquire('1.1.1.1', 'admin', 'admin')['content']
+        self.pool.closeAll()
+        self.assertTrue(client.closed)
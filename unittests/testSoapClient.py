@@ -0,0 +1,153 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import shutil
+import tempfile
+import unittest
+from forward.utils.fakeSoapServer import FakeSoapServer
+from forward.utils.soapClient import SoapClientCache
+from forward.devclass.baseDepp import BASEDEPP
+
+try:
+    import suds
+except ImportError:
+    suds = None
+
+POLICY = {'action': 'allow', 'sZone': 'trust', 'dZone': 'untrust', 'sIPType': 'single', 'sIPName': 'web',
+          'dIPType': 'group', 'dIPName': 'dmz', 'serviceType': 'single', 'serviceName': 'http'}
+
+
+@unittest.skipIf(suds is None, 'suds is not installed')
+class TestSoapClient(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeSoapServer(username='admin', password='admin')
+        self.server.start()
+        self.clients = SoapClientCache(cacheDir=None)
+        self.dev = BASEDEPP('127.0.0.1', 'admin', 'admin', soapBase=self.server.base, soapClients=self.clients)
+
+    def tearDown(self):
+        self.clients.close()
+        self.server.stop()
+
+    def test_client_reused(self):
+        for i in range(10):
+            self.assertTrue(self.dev.createIPObject('web%d' % i, '10.0.0.%d' % (i + 1))['status'])
+        self.assertTrue(self.dev.deleteIPObject('web0')['status'])
+        self.assertEqual(self.clients.created, 1)
+        self.assertEqual(self.server.wsdlRequests, 1)
+        # The WSDL and the 11 operations over one kept connection.
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.calls[0], ('addAddrObj', {'name': 'web0', 'ip': '10.0.0.1'}))
+        self.assertEqual(self.server.calls[-1], ('delAddrObj', {'name': 'web0'}))
+
+    def test_shared_by_instances(self):
+        other = BASEDEPP('127.0.0.1', 'admin', 'admin', soapBase=self.server.base, soapClients=self.clients)
+        self.assertTrue(self.dev.createIPObject('web', '10.0.0.1')['status'])
+        self.assertTrue(other.updateIPObject('web2', 'web', '10.0.0.2')['status'])
+        self.assertEqual(self.clients.created, 1)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_wsdl_disk_cache(self):
+        cacheDir = tempfile.mkdtemp()
+        try:
+            for i in range(2):
+                clients = SoapClientCache(cacheDir=cacheDir)
+                dev = BASEDEPP('127.0.0.1', 'admin', 'admin', soapBase=self.server.base, soapClients=clients)
+                self.assertTrue(dev.createIPObject('web', '10.0.0.1')['status'])
+                clients.close()
+            # The second process-like cache parses the WSDL kept on disk.
+            self.assertEqual(self.server.wsdlRequests, 1)
+        finally:
+            shutil.rmtree(cacheDir)
+
+    def test_idle_connection_closed(self):
+        self.server.stop()
+        self.server = FakeSoapServer(idleTimeout=0.2)
+        self.server.start()
+        self.dev.soapBase = self.server.base
+        self.assertTrue(self.dev.createIPObject('web', '10.0.0.1')['status'])
+        time.sleep(0.5)
+        # Sent again on a new connection, once.
+        self.assertTrue(self.dev.createIPObject('web2', '10.0.0.2')['status'])
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual([call[0] for call in self.server.calls], ['addAddrObj', 'addAddrObj'])
+
+    def test_timeout_not_retried(self):
+        clients = SoapClientCache(cacheDir=None, timeout=0.3)
+        dev = BASEDEPP('127.0.0.1', 'admin', 'admin', soapBase=self.server.base, soapClients=clients)
+        self.assertTrue(dev.createIPObject('web', '10.0.0.1')['status'])
+        self.server.latency = 0.6
+        self.assertFalse(dev.createIPObject('web2', '10.0.0.2')['status'])
+        time.sleep(0.7)
+        self.server.latency = 0
+        clients.close()
+        # The slow operation reached the device once.
+        self.assertEqual([call[1]['name'] for call in self.server.calls], ['web', 'web2'])
+
+    def test_fault(self):
+        self.server.faults['addAddrObj'] = 506
+        result = self.dev.createIPObject('web', '10.0.0.1')
+        self.assertFalse(result['status'])
+        self.assertIn('configuration-name already exist', result['errLog'])
+        bad = BASEDEPP('127.0.0.1', 'admin', 'wrong', soapBase=self.server.base, soapClients=self.clients)
+        result = bad.createIPObject('web', '10.0.0.1')
+        self.assertFalse(result['status'])
+        self.assertIn('Unauthorized', result['errLog'])
+
+    def test_batch(self):
+        result = self.dev.batch([
+            ('createIPObject', {'name': 'web', 'ip': '10.0.0.1'}),
+            ('createServiceObject', {'name': 'http', 'protocol': 'TCP', 'sRange': '1-65535', 'dRange': '80-80'}),
+            ('createSecurityPolicy', dict(POLICY, name='p1')),
+        ])
+        self.assertTrue(result['status'], result['errLog'])
+        self.assertEqual(len(result['content']), 3)
+        self.assertEqual([call[0] for call in self.server.calls],
+                         ['addAddrObj', 'createServerObject', 'createSecurityPolicy'])
+        policy = self.server.calls[-1][1]['p']
+        self.assertEqual(policy['sourceIpObjects'], {'type': '0', 'name': 'web'})
+        self.assertEqual(policy['destinationIpObjects'], {'type': '1', 'name': 'dmz'})
+        self.assertEqual(self.server.connections, 1)
+
+    def test_batch_errors(self):
+        self.server.faults['addAddrObj'] = 506
+        operations = [('createIPObject', {'name': 'web', 'ip': '10.0.0.1'}),
+                      ('showRun', {}),
+                      ('deleteIPObject', {'name': 'web'})]
+        result = self.dev.batch(operations)
+        self.assertFalse(result['status'])
+        self.assertEqual([item['status'] for item in result['content']], [False, False, True])
+        self.assertIn('unknown method showRun', result['errLog'])
+        result = self.dev.batch(operations, stopOnError=True)
+        self.assertEqual(len(result['content']), 1)
+
+    def test_batch_exception(self):
+        # updateServiceObject raises IOError without protocol.
+        operations = [('createIPObject', {'name': 'web', 'ip': '10.0.0.1'}),
+                      ('updateServiceObject', {'name': 'http'}),
+                      ('deleteIPObject', {'name': 'web'})]
+        result = self.dev.batch(operations)
+        self.assertFalse(result['status'])
+        self.assertEqual([item['status'] for item in result['content']], [True, False, True])
+        self.assertIn('operation 1 updateServiceObject', result['errLog'])
+        result = self.dev.batch(operations, stopOnError=True)
+        self.assertEqual([item['status'] for item in result['content']], [True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
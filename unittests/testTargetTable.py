@@ -0,0 +1,110 @@
+# (c) 2015-2018, Wang Zhe <azrael-ex@139.com>, Zhang Qi Chuan <zhangqc@fits.com.cn>
+#
+# This file is part of Ansible
+#
+# Forward is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Forward is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import unittest
+from forward.utils.targetTable import TargetTable
+from forward.utils.ipRange import IpRanges, numToIp
+from forward.utils.forwardError import ForwardError
+
+
+class TestTargetTable(unittest.TestCase):
+    def test_rows(self):
+        table = TargetTable([['10.0.0.1', 's9312', 'admin', 'pw', {'port': 22}],
+                             ['router1', 'c6506', 'admin', 'pw'],
+                             ['10.0.0.2', 's9312', 'admin', 'pw', {'port': 22}]])
+        self.assertEqual(len(table), 3)
+        self.assertEqual(len(table.profiles), 2)
+        self.assertEqual(table, [['10.0.0.1', 's9312', 'admin', 'pw', {'port': 22}],
+                                 ['router1', 'c6506', 'admin', 'pw'],
+                                 ['10.0.0.2', 's9312', 'admin', 'pw', {'port': 22}]])
+        self.assertEqual(table[1], ['router1', 'c6506', 'admin', 'pw'])
+        self.assertEqual(table.get('router1'), ['router1', 'c6506', 'admin', 'pw'])
+        self.assertEqual(table.get('10.0.0.3'), None)
+        self.assertTrue('10.0.0.2' in table)
+
+    def test_duplicates_and_remove(self):
+        table = TargetTable()
+        table.add('10.0.0.1', 's9312', 'admin', 'pw', {})
+        table.add('10.0.0.2', 's9312', 'admin', 'pw', {})
+        self.assertEqual(table.get('10.0.0.1'), ['10.0.0.1', 's9312', 'admin', 'pw', {}])
+        table.add('10.0.0.1', 'c6506', 'admin', 'pw', {})
+        # The last target of an ip wins, like the instances of getInstances.
+        self.assertEqual(table.get('10.0.0.1')[1], 'c6506')
+        self.assertEqual(table.remove('10.0.0.1'), 2)
+        self.assertEqual(table.remove('10.0.0.1'), 0)
+        self.assertEqual(list(table), [['10.0.0.2', 's9312', 'admin', 'pw', {}]])
+        self.assertEqual(table[0][0], '10.0.0.2')
+        table.add('10.0.0.1', 's9312', 'admin', 'pw', {})
+        self.assertEqual(table[-1][0], '10.0.0.1')
+
+    def test_ranges(self):
+        table = TargetTable()
+        table.addRanges(IpRanges(['10.0.0.0/16']), 's9312', 'admin', 'pw', {'timeout': 10})
+        self.assertEqual(len(table), 255 * 256)
+        self.assertEqual(len(table.profiles), 1)
+        self.assertEqual(table.get('10.0.200.7'), ['10.0.200.7', 's9312', 'admin', 'pw', {'timeout': 10}])
+        self.assertFalse('10.0.200.0' in table)
+
+    def test_index(self):
+        # Random adds and removals against a dict.
+        random.seed(7)
+        table, expected = TargetTable(), {}
+        for i in range(20000):
+            ip = numToIp(random.randint(0x0a000001, 0x0a000fff))
+            if not ip.endswith('.0') and random.random() < 0.7:
+                table.add(ip, 's9312', 'admin', 'pw', {})
+                expected[ip] = expected.get(ip, 0) + 1
+            else:
+                self.assertEqual(table.remove(ip), expected.pop(ip, 0))
+        self.assertEqual(len(table), sum(expected.values()))
+        self.assertEqual(sorted(set(target[0] for target in table)), sorted(expected))
+        for ip in expected:
+            self.assertTrue(ip in table)
+
+    def test_index_ranges(self):
+        # Random lookups, range adds and removals against a list, the adds rebuild the index midway.
+        random.seed(11)
+        table, expected = TargetTable(), []
+        for i in range(300):
+            start = random.randint(0x0a000001, 0x0a0003ff)
+            ip = numToIp(random.randint(0x0a000001, 0x0a0003ff))
+            if expected and random.random() < 0.5:
+                ip = random.choice(expected[-40:])
+            action = random.random()
+            if action < 0.4:
+                ranges = IpRanges(['%s-%s' % (numToIp(start), numToIp(start + random.randint(0, 40)))])
+                table.addRanges(ranges, 's9312', 'admin', 'pw', {})
+                expected.extend(numToIp(num) for num in ranges.toArray())
+            elif action < 0.7:
+                self.assertEqual(table.get(ip) is not None, ip in expected)
+            else:
+                self.assertEqual(table.remove(ip), expected.count(ip))
+                expected = [item for item in expected if item != ip]
+        self.assertEqual([target[0] for target in table], expected)
+
+    def test_validation(self):
+        self.assertRaises(ForwardError, TargetTable, [['10.0.0.1', 's9312', 'admin', 234]])
+        self.assertRaises(ForwardError, TargetTable, [['10.0.0.1', 's9312', 'admin']])
+        self.assertRaises(ForwardError, TargetTable, [['10.0.0.1', 's9312', 'admin', 'pw', 22]])
+        table = TargetTable([['10.0.0.1', 's9312', 'admin', 'pw']])
+        # Nothing of a wrong batch is added.
+        self.assertRaises(ForwardError, table.extend, [['10.0.0.2', 's9312', 'admin', 'pw'], [1, 2, 3, 4]])
+        self.assertEqual(len(table), 1)
+        # Unicode strings, [ex] of json on py2.
+        table.extend([[u'10.0.0.3', u's9312', u'admin', u'pw']])
+        self.assertEqual(len(table), 2)